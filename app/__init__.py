@@ -6,7 +6,7 @@ from dotenv import load_dotenv
 from datetime import date
 
 from config import DevelopmentConfig
-from app.extensions import db, migrate, login_manager
+from app.extensions import db, login_manager
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,8 +14,8 @@ logger = logging.getLogger(__name__)
 
 @login_manager.user_loader
 def load_user(user_id):
-    from app.models.usuario import Usuario
-    return db.session.get(Usuario, int(user_id))
+    from app.utils.identidad import cargar_identidad
+    return cargar_identidad(int(user_id))
 
 
 @login_manager.unauthorized_handler
@@ -36,18 +36,33 @@ MODULO_URL_MAP = {
 }
 
 
+def _en_cli():
+    """``flask ...`` carga la app dentro de un contexto de click; gunicorn no."""
+    import click
+    return click.get_current_context(silent=True) is not None
+
+
 def create_app(config_object=DevelopmentConfig):
     load_dotenv()
     app = Flask(__name__)
     app.config.from_object(config_object)
+    if app.config["PROXY_SALTOS"]:
+        # Render (y cualquier balanceador) agrega X-Forwarded-For; solo se confía en esos saltos
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config["PROXY_SALTOS"])
     if not app.config["SQLALCHEMY_DATABASE_URI"]:
         raise RuntimeError("DATABASE_URL es obligatoria. Copie .env.example a .env y configure PostgreSQL.")
 
+    from app.utils.pool import opciones_motor
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", opciones_motor(app.config, limitar=not _en_cli()))
     db.init_app(app)
-    migrate.init_app(app, db)
+    if _en_cli():
+        # Alembic solo lo usan ``flask db`` y ``release``; importarlo cuesta ~150 ms por worker
+        from flask_migrate import Migrate
+        Migrate(app, db)
     login_manager.init_app(app)
 
-    from app.models import arqueo, auditoria, cliente, conduce, cobro_informal, factura, pago, permiso, usuario  # noqa: F401
+    from app.models import arqueo, auditoria, cliente, conduce, cobro_informal, factura, pago, permiso, resumen_cartera, usuario  # noqa: F401
     from app.auth.routes import auth_bp
     from app.config_admin.routes import config_admin_bp
     from app.dashboard.routes import dashboard_bp
@@ -69,7 +84,14 @@ def create_app(config_object=DevelopmentConfig):
     app.register_blueprint(reportes_bp, url_prefix="/reportes")
 
     from app.seed_admin import seed_admin
+    from app.conciliar_saldos import conciliar_saldos, reconstruir_cartera
+    from app.importar_cobros import importar_cobros
+    from app.release import release
     app.cli.add_command(seed_admin)
+    app.cli.add_command(conciliar_saldos)
+    app.cli.add_command(reconstruir_cartera)
+    app.cli.add_command(importar_cobros)
+    app.cli.add_command(release)
 
     @app.template_filter("currency")
     def currency(value):
@@ -80,7 +102,7 @@ def create_app(config_object=DevelopmentConfig):
         from flask_login import current_user
         modulos_usuario = []
         if current_user.is_authenticated:
-            modulos_usuario = current_user.modulos_permitidos() if current_user.is_admin else current_user.modulos_permitidos()
+            modulos_usuario = current_user.modulos_permitidos()
         return {
             "today": date.today().isoformat(),
             "modulos_usuario": modulos_usuario,
@@ -99,6 +121,15 @@ def create_app(config_object=DevelopmentConfig):
         logger.error("500 error: %s", traceback.format_exc())
         return render_template("errores/500.html"), 500
 
+    from sqlalchemy.exc import TimeoutError as PoolAgotado
+
+    @app.errorhandler(PoolAgotado)
+    def pool_agotado(e):
+        from app.utils.pool import registrar_agotamiento
+        registrar_agotamiento()
+        logger.warning("Pool de conexiones agotado: %s", db.engine.pool.status())
+        return render_template("errores/500.html"), 503
+
     @app.errorhandler(Exception)
     def handle_exception(e):
         logger.error("Unhandled exception: %s", traceback.format_exc())
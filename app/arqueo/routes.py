@@ -1,30 +1,20 @@
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
 import io
-from flask import Blueprint, current_app, jsonify, flash, redirect, render_template, request, send_file, url_for
+from flask import Blueprint, current_app, jsonify, flash, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.lib.colors import Color, HexColor, white, black
-from reportlab.pdfgen import canvas
 from sqlalchemy import func, select
 
 from app.extensions import db
 from app.models import Arqueo
+from app.utils.cache_pdf import enviar_pdf
+from app.utils.paginacion import enlazar_siguiente, paginar_keyset
+from app.utils.permisos import proteger
 
 arqueo_bp = Blueprint("arqueo", __name__)
+proteger(arqueo_bp, "arqueo")
 DENOMINACIONES = [2000, 1000, 500, 200, 100, 50, 25, 10, 5, 1]
 
-# ── Colores corporativos ────────────────────────────────────────────
-_C_PRIMARY    = HexColor("#1B3A5C")
-_C_HEADER_BG  = HexColor("#E8EDF2")
-_C_ZEBRA      = HexColor("#F4F6F8")
-_C_BORDER     = HexColor("#C5CED6")
-_C_GREEN      = HexColor("#27AE60")
-_C_YELLOW     = HexColor("#F39C12")
-_C_RED        = HexColor("#E74C3C")
-_C_CARD_BG    = HexColor("#F8F9FA")
-
 
 def calcular_totales(conteos, no_efectivo, contado, credito, vales):
     efectivo = sum(Decimal(str(d)) * Decimal(str(c or 0)) for d, c in conteos.items())
@@ -146,7 +136,7 @@ def api_arqueos():
     fecha_fin = request.args.get("fecha_fin", "").strip()
     usuario_q = request.args.get("usuario", "").strip()
 
-    stmt = select(Arqueo).order_by(Arqueo.fecha.desc(), Arqueo.id.desc())
+    stmt = select(Arqueo)
     if not current_user.is_admin:
         stmt = stmt.where(Arqueo.cajero == current_user.username)
     if fecha_ini:
@@ -156,14 +146,14 @@ def api_arqueos():
     if usuario_q and current_user.is_admin:
         stmt = stmt.where(Arqueo.cajero.ilike(f"%{usuario_q}%"))
 
-    arqueos = db.session.scalars(stmt.limit(50)).all()
-    return jsonify([{
+    arqueos = paginar_keyset(stmt, [Arqueo.fecha, Arqueo.id], request.args.get("cursor"), 50)
+    return enlazar_siguiente(jsonify([{
         "id": a.id,
         "fecha": a.fecha.isoformat(),
         "cajero": a.cajero,
         "turno": a.turno,
         "totales": a.totales,
-    } for a in arqueos])
+    } for a in arqueos]), arqueos)
 
 
 @arqueo_bp.get("/api/arqueo/<int:arqueo_id>")
@@ -199,5 +189,7 @@ def reporte(arqueo_id):
         "email": current_app.config.get("COMPANY_EMAIL", ""),
     }
     from app.utils.pdf_arqueo import generar_arqueo_pdf
-    buffer = generar_arqueo_pdf(arqueo, empresa, username, ahora)
-    return send_file(buffer, as_attachment=True, download_name=f"arqueo_{arqueo.id}.pdf", mimetype="application/pdf")
+    # Los arqueos no se editan; usuario y día cubren el pie "Impreso", que en caché va sin hora.
+    version = [arqueo.creado_en, username, ahora.date()]
+    return enviar_pdf("arqueo", arqueo.id, version, empresa,
+                      lambda: generar_arqueo_pdf(arqueo, empresa, username, ahora, con_hora=False), f"arqueo_{arqueo.id}.pdf")
@@ -1,12 +1,30 @@
 from datetime import datetime, timezone
 
 from flask import flash, jsonify, redirect, render_template, request, url_for
-from flask_login import current_user, login_user, logout_user
+from flask_login import current_user, login_required, login_user, logout_user
 
 from app.auth import auth_bp
 from app.extensions import db
 from app.models.usuario import Usuario
 from app.utils.auditoria import registrar_accion
+from app.utils.claves import Ocupado, bloqueado, limpiar_fallos, registrar_fallo, verificar
+from app.utils.identidad import guardar_identidad, olvidar_identidad
+
+
+def _comprobar_clave(user, password):
+    """Devuelve ``None`` si la clave es correcta, o ``(mensaje, status)``."""
+    espera = bloqueado(user.id)
+    if espera:
+        return f"Demasiados intentos fallidos. Intente de nuevo en {(espera + 59) // 60} min.", 429
+    try:
+        correcta = verificar(user, password)
+    except Ocupado:
+        return "Hay muchos inicios de sesión en curso. Intente de nuevo en unos segundos.", 429
+    if not correcta:
+        registrar_fallo(user.id)
+        return "Contraseña incorrecta.", 401
+    limpiar_fallos(user.id)
+    return None
 
 
 @auth_bp.route("/login", methods=["GET", "POST"])
@@ -26,13 +44,15 @@ def login():
                         db.select(Usuario).where(Usuario.is_active == True).order_by(Usuario.nombre_completo)
                     ).all()
                     return render_template("auth/login.html", usuarios=usuarios, focus_user=user.id)
-                if not user.check_password(password):
-                    flash("Contraseña incorrecta.", "danger")
+                error = _comprobar_clave(user, password)
+                if error:
+                    flash(error[0], "danger")
                     usuarios = db.session.scalars(
                         db.select(Usuario).where(Usuario.is_active == True).order_by(Usuario.nombre_completo)
                     ).all()
                     return render_template("auth/login.html", usuarios=usuarios, focus_user=user.id)
             login_user(user, remember=True)
+            guardar_identidad(user)
             user.touch_login()
             registrar_accion("inicio_sesion", "auth", f"Sesión iniciada: {user.username}")
             db.session.commit()
@@ -60,9 +80,11 @@ def verificar_clave():
     if not user or not user.is_active:
         return jsonify({"ok": False, "error": "Usuario no encontrado o desactivado."}), 404
 
-    if not user.check_password(password):
-        return jsonify({"ok": False, "error": "Contraseña incorrecta."}), 401
+    error = _comprobar_clave(user, password)
+    if error:
+        return jsonify({"ok": False, "error": error[0]}), error[1]
 
+    db.session.commit()  # por si se rehízo el hash
     return jsonify({"ok": True})
 
 
@@ -72,9 +94,12 @@ def logout():
         registrar_accion("cierre_sesion", "auth", f"Sesión cerrada: {current_user.username}")
         db.session.commit()
     logout_user()
+    olvidar_identidad()
     return redirect(url_for("auth.login"))
 
 
 @auth_bp.route("/mi-cuenta")
+@login_required
 def mi_cuenta():
-    return render_template("auth/mi_cuenta.html")
+    usuario = db.session.get(Usuario, current_user.id)
+    return render_template("auth/mi_cuenta.html", usuario=usuario)
@@ -5,10 +5,16 @@ from flask_login import login_required
 from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError
 
+from app.cobros.fifo import invalidar_pendientes
+from app.dashboard.metricas import invalidar_metricas
 from app.extensions import db
-from app.models import Cliente, DetallePago, Factura
+from app.models import Cliente, DetallePago, Factura, ResumenCartera
+from app.utils.busqueda import buscar_clientes_json, condicion_clientes, estadisticas_busqueda, invalidar_busqueda
+from app.utils.paginacion import paginar_keyset
+from app.utils.permisos import proteger
 
 clientes_bp = Blueprint("clientes", __name__)
+proteger(clientes_bp, "clientes", {"buscar_api": ("cobros_informales",)})
 
 
 def _cliente_desde_form(cliente):
@@ -25,12 +31,10 @@ def _cliente_desde_form(cliente):
 @login_required
 def listado():
     q = request.args.get("q", "").strip()
-    page = request.args.get("page", 1, type=int)
-    stmt = select(Cliente).order_by(Cliente.nombre)
+    stmt = select(Cliente)
     if q:
-        patron = f"%{q}%"
-        stmt = stmt.where(or_(Cliente.nombre.ilike(patron), Cliente.telefono.ilike(patron), Cliente.rnc_cedula.ilike(patron)))
-    clientes = db.paginate(stmt, page=page, per_page=12, error_out=False)
+        stmt = stmt.where(condicion_clientes(q))
+    clientes = paginar_keyset(stmt, [Cliente.nombre, Cliente.id], request.args.get("cursor"), 12, descendente=False)
     return render_template("clientes/listado.html", clientes=clientes, q=q)
 
 
@@ -43,6 +47,8 @@ def nuevo():
             _cliente_desde_form(cliente)
             db.session.add(cliente)
             db.session.commit()
+            invalidar_busqueda()
+            invalidar_metricas()
             flash("Cliente creado correctamente.", "success")
             return redirect(url_for("clientes.detalle", cliente_id=cliente.id))
         except (ValueError, IntegrityError) as exc:
@@ -59,6 +65,7 @@ def editar(cliente_id):
         try:
             _cliente_desde_form(cliente)
             db.session.commit()
+            invalidar_busqueda()
             flash("Cliente actualizado.", "success")
             return redirect(url_for("clientes.detalle", cliente_id=cliente.id))
         except (ValueError, IntegrityError) as exc:
@@ -72,7 +79,11 @@ def editar(cliente_id):
 def eliminar(cliente_id):
     cliente = db.get_or_404(Cliente, cliente_id)
     db.session.delete(cliente)
+    ResumenCartera.recalcular(cliente_id)
     db.session.commit()
+    invalidar_busqueda()
+    invalidar_metricas()
+    invalidar_pendientes(cliente_id)
     flash("Cliente eliminado.", "success")
     return redirect(url_for("clientes.listado"))
 
@@ -90,8 +101,7 @@ def detalle(cliente_id):
 def facturas_listado():
     q = request.args.get("q", "").strip()
     estado = request.args.get("estado", "").strip()
-    page = request.args.get("page", 1, type=int)
-    stmt = select(Factura).join(Cliente).order_by(Factura.fecha.desc(), Factura.id.desc())
+    stmt = select(Factura).join(Cliente)
     if q:
         patron = f"%{q}%"
         stmt = stmt.where(or_(Factura.numero.ilike(patron), Factura.concepto.ilike(patron), Cliente.nombre.ilike(patron)))
@@ -101,7 +111,7 @@ def facturas_listado():
             stmt = stmt.where(Factura.estado == EstadoFactura(estado))
         except ValueError:
             pass
-    facturas = db.paginate(stmt, page=page, per_page=15, error_out=False)
+    facturas = paginar_keyset(stmt, [Factura.fecha, Factura.id], request.args.get("cursor"), 15)
     return render_template("clientes/facturas.html", facturas=facturas, q=q, estado=estado)
 
 
@@ -125,7 +135,11 @@ def crear_facturas(cliente_id):
         if not facturas:
             raise ValueError("Agregue al menos una factura válida.")
         db.session.add_all(facturas)
+        Cliente.ajustar_saldo(cliente.id, sum(f.saldo for f in facturas))
+        ResumenCartera.recalcular(cliente.id)
         db.session.commit()
+        invalidar_metricas()
+        invalidar_pendientes(cliente.id)
         flash(f"{len(facturas)} factura(s) registrada(s).", "success")
     except (ValueError, InvalidOperation, IntegrityError) as exc:
         db.session.rollback()
@@ -152,8 +166,12 @@ def editar_factura(cliente_id, factura_id):
             if nuevo_monto < pagado:
                 raise ValueError(f"El monto no puede ser menor al ya pagado ({pagado}).")
             factura.monto = nuevo_monto
+            Cliente.ajustar_saldo(cliente.id, nuevo_monto - pagado - factura.saldo)
             factura.saldo = nuevo_monto - pagado
+            ResumenCartera.recalcular(cliente.id)
             db.session.commit()
+            invalidar_metricas()
+            invalidar_pendientes(cliente.id)
             flash("Factura actualizada.", "success")
             return redirect(url_for("clientes.detalle", cliente_id=cliente.id))
         except (ValueError, InvalidOperation, IntegrityError) as exc:
@@ -174,7 +192,11 @@ def eliminar_factura(cliente_id, factura_id):
         flash("No se puede eliminar una factura que tiene pagos aplicados.", "danger")
         return redirect(url_for("clientes.detalle", cliente_id=cliente.id))
     db.session.delete(factura)
+    Cliente.ajustar_saldo(cliente.id, -factura.saldo)
+    ResumenCartera.recalcular(cliente.id)
     db.session.commit()
+    invalidar_metricas()
+    invalidar_pendientes(cliente.id)
     flash("Factura eliminada.", "success")
     return redirect(url_for("clientes.detalle", cliente_id=cliente.id))
 
@@ -185,9 +207,13 @@ def buscar_api():
     q = request.form.get("q", "").strip() if request.method == "POST" else request.args.get("q", "").strip()
     if len(q) < 2:
         return jsonify([])
-    patron = f"%{q}%"
-    clientes = db.session.scalars(select(Cliente).where(or_(Cliente.nombre.ilike(patron), Cliente.telefono.ilike(patron), Cliente.rnc_cedula.ilike(patron))).order_by(Cliente.nombre).limit(10)).all()
-    return jsonify([{"id": c.id, "nombre": c.nombre, "telefono": c.telefono, "rnc_cedula": c.rnc_cedula} for c in clientes])
+    return jsonify(buscar_clientes_json(q))
+
+
+@clientes_bp.get("/api/buscar/estadisticas")
+@login_required
+def buscar_estadisticas():
+    return jsonify(estadisticas_busqueda())
 
 
 @clientes_bp.post("/api/crear")
@@ -202,6 +228,8 @@ def crear_cliente_api():
         )
         db.session.add(cliente)
         db.session.commit()
+        invalidar_busqueda()
+        invalidar_metricas()
         return jsonify({"id": cliente.id, "nombre": cliente.nombre, "telefono": cliente.telefono, "rnc_cedula": cliente.rnc_cedula})
     except (ValueError, IntegrityError):
         db.session.rollback()
@@ -0,0 +1,123 @@
+"""Aplicación FIFO de cobros sobre las facturas pendientes de un cliente."""
+from bisect import bisect_left
+from decimal import Decimal
+from itertools import accumulate
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+
+from app.extensions import db
+from app.models import Cliente, DetallePago, EstadoFactura, Factura, ResumenCartera
+from app.utils.cache import CacheLRU
+
+_instantaneas = CacheLRU()
+
+
+def distribuir(saldos, monto, acumulado=None):
+    """Reparte ``monto`` en orden sobre ``saldos``.
+
+    Devuelve ``(asignaciones, restante)``, con ``asignaciones`` como pares
+    ``(indice, aplicado)``. Una búsqueda binaria sobre la suma acumulada
+    encuentra la factura que queda parcial; las anteriores se saldan
+    completas. Es la única implementación del FIFO: la usan la simulación,
+    el cobro individual y la importación por lotes.
+    """
+    if acumulado is None:
+        acumulado = list(accumulate(saldos))
+    if monto <= 0 or not acumulado:
+        return [], max(monto, Decimal("0"))
+    corte = bisect_left(acumulado, monto)
+    asignaciones = [(i, saldos[i]) for i in range(min(corte, len(saldos))) if saldos[i] > 0]
+    if corte == len(saldos):
+        return asignaciones, monto - acumulado[-1]
+    asignaciones.append((corte, monto - (acumulado[corte - 1] if corte else 0)))
+    return asignaciones, Decimal("0")
+
+
+class Pendientes:
+    """Facturas pendientes de un cliente como arreglos paralelos en orden FIFO."""
+
+    __slots__ = ("ids", "numeros", "saldos", "acumulado")
+
+    def __init__(self, filas):
+        self.ids = tuple(f.id for f in filas)
+        self.numeros = tuple(f.numero for f in filas)
+        self.saldos = tuple(f.saldo for f in filas)
+        self.acumulado = tuple(accumulate(self.saldos))
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def total(self):
+        return self.acumulado[-1] if self.acumulado else Decimal("0")
+
+    def distribuir(self, monto):
+        return distribuir(self.saldos, monto, self.acumulado)
+
+
+def estado_para(saldo):
+    return EstadoFactura.PAGADA if saldo == 0 else EstadoFactura.PARCIAL
+
+
+def facturas_pendientes(cliente_ids, bloquear=False):
+    """Filas ``(id, cliente_id, numero, saldo)`` pendientes en orden FIFO por cliente.
+
+    Con ``bloquear`` toma ``FOR UPDATE`` sobre esas facturas: un segundo cobro
+    al mismo cliente espera el commit del primero y relee los saldos ya
+    rebajados. No se usa ``SKIP LOCKED`` porque saltaría las facturas más
+    antiguas y rompería el orden FIFO.
+    """
+    stmt = (
+        select(Factura.id, Factura.cliente_id, Factura.numero, Factura.saldo)
+        .where(Factura.cliente_id.in_(cliente_ids), Factura.estado != EstadoFactura.PAGADA)
+        .order_by(Factura.cliente_id, Factura.fecha, Factura.id)
+    )
+    if bloquear:
+        stmt = stmt.with_for_update(of=Factura)
+    return db.session.execute(stmt).all()
+
+
+def pendientes_cliente(cliente_id):
+    """Instantánea cacheada de ``Pendientes`` para simular mientras el cajero escribe.
+
+    Solo sirve para mostrar; ``aplicar_pago`` siempre relee las facturas con bloqueo.
+    """
+    pendientes = _instantaneas.obtener(cliente_id, current_app.config["FIFO_CACHE_TTL"])
+    if pendientes is None:
+        generacion = _instantaneas.generacion
+        pendientes = Pendientes(facturas_pendientes([cliente_id]))
+        _instantaneas.guardar(cliente_id, pendientes, current_app.config["FIFO_CACHE_SIZE"], generacion)
+    return pendientes
+
+
+def invalidar_pendientes(*cliente_ids):
+    """Descarta las instantáneas de esos clientes (o todas); llamar tras cada commit que toque facturas."""
+    _instantaneas.invalidar(*cliente_ids)
+
+
+def aplicar_pago(pago, monto):
+    """Distribuye ``monto`` sobre las facturas de ``pago.cliente_id`` y registra los detalles.
+
+    Las facturas se rebajan con un UPDATE por lotes y los ``DetallePago`` se
+    insertan en bloque, sin cargar objetos ``Factura``. Devuelve
+    ``(total_aplicado, total_pendiente)``; el caller hace el commit.
+    """
+    db.session.flush()
+    pendientes = Pendientes(facturas_pendientes([pago.cliente_id], bloquear=True))
+    if not pendientes:
+        raise ValueError("El cliente no tiene facturas pendientes.")
+
+    asignaciones, restante = pendientes.distribuir(monto)
+    cambios, detalles = [], []
+    for indice, aplicado in asignaciones:
+        saldo = pendientes.saldos[indice] - aplicado
+        cambios.append({"id": pendientes.ids[indice], "saldo": saldo, "estado": estado_para(saldo)})
+        detalles.append({"pago_id": pago.id, "factura_id": pendientes.ids[indice], "monto_aplicado": aplicado})
+
+    total_aplicado = monto - restante
+    db.session.execute(update(Factura), cambios)
+    db.session.execute(insert(DetallePago), detalles)
+    Cliente.ajustar_saldo(pago.cliente_id, -total_aplicado)
+    ResumenCartera.recalcular(pago.cliente_id)
+    return total_aplicado, pendientes.total
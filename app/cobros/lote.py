@@ -0,0 +1,194 @@
+"""Importación de cobros por lotes, p. ej. un estado de cuenta de transferencias.
+
+Cada fila identifica al cliente con ``cliente_id`` o con ``rnc_cedula``, nunca
+ambos, y trae ``monto``, ``forma_pago`` y ``referencia``. Todo el lote se aplica en una transacción con el mismo FIFO de
+``registrar_cobro``; si alguna fila falla no se escribe nada.
+"""
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import insert, or_, select, update
+
+from app.cobros.fifo import distribuir, estado_para, facturas_pendientes
+from app.extensions import db
+from app.models import Cliente, DetallePago, Factura, Pago, ResumenCartera, TipoCobro
+from app.models.pago import FormaPago
+from app.utils.auditoria import registrar_accion
+
+
+def leer_lote(contenido, formato):
+    """Filas ``dict`` desde un CSV con encabezado o una lista JSON de objetos."""
+    if formato == "json":
+        filas = json.loads(contenido)
+        if not isinstance(filas, list):
+            raise ValueError("El JSON debe ser una lista de cobros.")
+        return filas
+    return list(csv.DictReader(io.StringIO(contenido)))
+
+
+def _texto(fila, campo):
+    return str(fila.get(campo) or "").strip()
+
+
+def _monto(valor):
+    try:
+        monto = Decimal(valor.replace(",", ""))
+    except InvalidOperation:
+        raise ValueError(f"Monto inválido: {valor or '(vacío)'}.") from None
+    if not monto.is_finite() or monto <= 0:
+        raise ValueError("El monto debe ser mayor que cero.")
+    return monto.quantize(Decimal("0.01"))
+
+
+def _forma_pago(valor):
+    if not valor:
+        return FormaPago.EFECTIVO
+    for forma in FormaPago:
+        if valor.casefold() in (forma.value.casefold(), forma.name.casefold()):
+            return forma
+    raise ValueError(f"Forma de pago desconocida: {valor}.")
+
+
+def _clave_cliente(fila):
+    """``("cliente_id", id)`` o ``("rnc_cedula", texto)``, según la columna que traiga la fila."""
+    cliente_id, rnc_cedula = _texto(fila, "cliente_id"), _texto(fila, "rnc_cedula")
+    if cliente_id and rnc_cedula:
+        raise ValueError("Indique cliente_id o rnc_cedula, no ambos.")
+    if cliente_id:
+        if not cliente_id.isdigit():
+            raise ValueError(f"cliente_id inválido: {cliente_id}.")
+        return "cliente_id", int(cliente_id)
+    if rnc_cedula:
+        return "rnc_cedula", rnc_cedula
+    raise ValueError("Falta el cliente: indique cliente_id o rnc_cedula.")
+
+
+def _clientes(claves):
+    """Resuelve las claves de ``_clave_cliente`` a ``Cliente`` en una sola consulta."""
+    ids = {valor for columna, valor in claves if columna == "cliente_id"}
+    rncs = {valor for columna, valor in claves if columna == "rnc_cedula"}
+    encontrados = {}
+    for cliente in db.session.scalars(select(Cliente).where(or_(Cliente.id.in_(ids), Cliente.rnc_cedula.in_(rncs)))):
+        encontrados["cliente_id", cliente.id] = cliente
+        if cliente.rnc_cedula:
+            encontrados["rnc_cedula", cliente.rnc_cedula] = cliente
+    return encontrados
+
+
+def procesar_lote(filas, usuario, simular=False):
+    """Valida y distribuye ``filas`` en orden; devuelve ``(resultados, errores)``.
+
+    Con ``simular`` solo calcula la distribución, como ``simular_fifo``. Si no,
+    y no hubo errores, inserta pagos y detalles en bloque y rebaja las
+    facturas con un único executemany. El caller hace commit o rollback.
+    """
+    if not filas:
+        raise ValueError("El lote está vacío.")
+    filas = [f if isinstance(f, dict) else {} for f in filas]
+    claves, errores = [], []
+    for linea, fila in enumerate(filas, start=1):
+        try:
+            claves.append(_clave_cliente(fila))
+        except ValueError as exc:
+            claves.append(None)
+            errores.append({"linea": linea, "error": str(exc)})
+    clientes = _clientes({c for c in claves if c})
+    validas = []
+    for linea, (fila, clave) in enumerate(zip(filas, claves), start=1):
+        if clave is None:
+            continue
+        try:
+            if clave not in clientes:
+                raise ValueError(f"Cliente no encontrado: {clave[0]} {clave[1]}.")
+            validas.append((
+                linea, clientes[clave], _monto(_texto(fila, "monto")),
+                _forma_pago(_texto(fila, "forma_pago")), _texto(fila, "referencia") or None,
+            ))
+        except ValueError as exc:
+            errores.append({"linea": linea, "error": str(exc)})
+
+    pendientes = facturas_pendientes({v[1].id for v in validas}, bloquear=not simular)
+    facturas, saldos = {}, {}
+    for factura in pendientes:
+        facturas.setdefault(factura.cliente_id, []).append(factura)
+        saldos.setdefault(factura.cliente_id, []).append(factura.saldo)
+
+    resultados = []
+    for linea, cliente, monto, forma_pago, referencia in validas:
+        asignaciones, restante = distribuir(saldos.get(cliente.id, []), monto)
+        if not asignaciones:
+            errores.append({"linea": linea, "error": f"{cliente.nombre} no tiene facturas pendientes."})
+            continue
+        distribucion = []
+        for indice, aplicado in asignaciones:
+            distribucion.append((facturas[cliente.id][indice], saldos[cliente.id][indice], aplicado))
+            saldos[cliente.id][indice] -= aplicado
+        resultados.append({
+            "linea": linea, "cliente": cliente, "monto": monto, "forma_pago": forma_pago,
+            "referencia": referencia, "aplicado": monto - restante, "excedente": restante,
+            "distribucion": distribucion,
+        })
+
+    if errores or simular:
+        errores.sort(key=lambda e: e["linea"])
+        return resultados, errores
+
+    pago_ids = db.session.scalars(
+        insert(Pago).returning(Pago.id, sort_by_parameter_order=True),
+        [
+            {
+                "cliente_id": r["cliente"].id, "usuario": usuario, "monto_pagado": r["aplicado"],
+                "tipo": TipoCobro.FACTURA, "forma_pago": r["forma_pago"], "numero_referencia": r["referencia"],
+                "observaciones": f"[Excedente RD$ {r['excedente']:,.2f} registrado como crédito]" if r["excedente"] > 0 else None,
+            }
+            for r in resultados
+        ],
+    ).all()
+    db.session.execute(insert(DetallePago), [
+        {"pago_id": pago_id, "factura_id": factura.id, "monto_aplicado": aplicado}
+        for pago_id, r in zip(pago_ids, resultados)
+        for factura, _, aplicado in r["distribucion"]
+    ])
+    db.session.execute(update(Factura), [
+        {"id": factura.id, "saldo": saldo, "estado": estado_para(saldo)}
+        for cliente_id, lista in facturas.items()
+        for factura, saldo in zip(lista, saldos[cliente_id])
+        if saldo != factura.saldo
+    ])
+
+    aplicado, credito = {}, {}
+    for pago_id, r in zip(pago_ids, resultados):
+        r["pago_id"] = pago_id
+        cliente_id = r["cliente"].id
+        aplicado[cliente_id] = aplicado.get(cliente_id, Decimal("0")) - r["aplicado"]
+        if r["excedente"] > 0:
+            credito[cliente_id] = credito.get(cliente_id, Decimal("0")) + r["excedente"]
+    Cliente.ajustar_saldos(aplicado)
+    ResumenCartera.recalcular(*aplicado)
+    for cliente_id, excedente in credito.items():
+        clientes["cliente_id", cliente_id].saldo_a_favor = Cliente.saldo_a_favor + excedente
+
+    total = sum((r["aplicado"] for r in resultados), Decimal("0"))
+    registrar_accion("importar_cobros", "cobros", f"Lote de {len(resultados)} cobros - RD$ {total:,.2f}")
+    return resultados, errores
+
+
+def resumen(resultado):
+    """Versión serializable de un resultado de ``procesar_lote``."""
+    return {
+        "linea": resultado["linea"],
+        "pago_id": resultado.get("pago_id"),
+        "cliente_id": resultado["cliente"].id,
+        "cliente": resultado["cliente"].nombre,
+        "forma_pago": resultado["forma_pago"].value,
+        "referencia": resultado["referencia"],
+        "monto": float(resultado["monto"]),
+        "aplicado": float(resultado["aplicado"]),
+        "excedente": float(resultado["excedente"]),
+        "distribucion": [
+            {"id": f.id, "numero": f.numero, "saldo": float(saldo), "aplicado": float(aplicado)}
+            for f, saldo, aplicado in resultado["distribucion"]
+        ],
+    }
@@ -1,37 +1,42 @@
 from datetime import date
 from decimal import Decimal, InvalidOperation
-from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, send_file, url_for
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
-from sqlalchemy import func, or_, select
+from sqlalchemy import select
+from sqlalchemy.orm import contains_eager
 
+from app.dashboard.metricas import invalidar_metricas
 from app.extensions import db
-from app.models import Cliente, DetallePago, EstadoFactura, Factura, FormaPago, Pago, TipoCobro
+from app.cobros.fifo import aplicar_pago, invalidar_pendientes, pendientes_cliente
+from app.cobros.lote import leer_lote, procesar_lote, resumen
+from app.models import Cliente, EstadoFactura, Factura, Pago, ResumenCartera, TipoCobro
+from app.models.pago import FormaPago
 from app.utils.auditoria import registrar_accion
-from app.utils.pdf import recibo_pdf as generar_recibo_pdf
+from app.utils.busqueda import condicion_clientes
+from app.utils.cache_pdf import enviar_pdf
+from app.utils.paginacion import enlazar_siguiente, paginar_keyset
+from app.utils.permisos import proteger
 
 cobros_bp = Blueprint("cobros", __name__)
+proteger(cobros_bp, "cobros", {"recibo_pdf": ("reportes",)})
+
+
+def _clientes_pendientes():
+    """Clientes con saldo leídos de ``resumen_cartera`` en lugar de agrupar facturas."""
+    return select(
+        Cliente.id, Cliente.nombre, Cliente.telefono, Cliente.rnc_cedula,
+        ResumenCartera.facturas_pendientes, ResumenCartera.total_pendiente, ResumenCartera.fecha_mas_antigua,
+    ).join(ResumenCartera, ResumenCartera.cliente_id == Cliente.id)
 
 
 @cobros_bp.get("/")
 @login_required
 def listar_clientes():
     q = request.args.get("q", "").strip()
-    stmt = (
-        db.session.query(
-            Cliente.id, Cliente.nombre, Cliente.telefono, Cliente.rnc_cedula,
-            func.count(Factura.id).label("facturas_pendientes"),
-            func.coalesce(func.sum(Factura.saldo), 0).label("total_pendiente"),
-            func.min(Factura.fecha).label("fecha_mas_antigua"),
-        )
-        .join(Factura, Factura.cliente_id == Cliente.id)
-        .filter(Factura.estado != EstadoFactura.PAGADA)
-        .group_by(Cliente.id, Cliente.nombre, Cliente.telefono, Cliente.rnc_cedula)
-        .order_by(Cliente.nombre)
-    )
+    stmt = _clientes_pendientes().order_by(Cliente.nombre)
     if q:
-        patron = f"%{q}%"
-        stmt = stmt.filter(or_(Cliente.nombre.ilike(patron), Cliente.telefono.ilike(patron), Cliente.rnc_cedula.ilike(patron)))
-    clientes = stmt.all()
+        stmt = stmt.where(condicion_clientes(q))
+    clientes = db.session.execute(stmt).all()
     return render_template("cobros/listar_clientes.html", clientes=clientes, q=q)
 
 
@@ -39,22 +44,11 @@ def listar_clientes():
 @login_required
 def api_clientes_pendientes():
     q = request.args.get("q", "").strip()
-    stmt = (
-        db.session.query(
-            Cliente.id, Cliente.nombre, Cliente.telefono, Cliente.rnc_cedula,
-            func.count(Factura.id).label("facturas_pendientes"),
-            func.coalesce(func.sum(Factura.saldo), 0).label("total_pendiente"),
-        )
-        .join(Factura, Factura.cliente_id == Cliente.id)
-        .filter(Factura.estado != EstadoFactura.PAGADA)
-        .group_by(Cliente.id, Cliente.nombre, Cliente.telefono, Cliente.rnc_cedula)
-        .order_by(Cliente.nombre)
-    )
+    stmt = _clientes_pendientes()
     if q:
-        patron = f"%{q}%"
-        stmt = stmt.filter(or_(Cliente.nombre.ilike(patron), Cliente.telefono.ilike(patron), Cliente.rnc_cedula.ilike(patron)))
-    rows = stmt.limit(50).all()
-    return jsonify([{"id": r.id, "nombre": r.nombre, "telefono": r.telefono, "rnc_cedula": r.rnc_cedula, "facturas_pendientes": r.facturas_pendientes, "total_pendiente": float(r.total_pendiente)} for r in rows])
+        stmt = stmt.where(condicion_clientes(q))
+    rows = paginar_keyset(stmt, [Cliente.nombre, Cliente.id], request.args.get("cursor"), 50, descendente=False, scalars=False)
+    return enlazar_siguiente(jsonify([{"id": r.id, "nombre": r.nombre, "telefono": r.telefono, "rnc_cedula": r.rnc_cedula, "facturas_pendientes": r.facturas_pendientes, "total_pendiente": float(r.total_pendiente)} for r in rows]), rows)
 
 
 @cobros_bp.get("/<int:cliente_id>")
@@ -82,19 +76,14 @@ def facturas_cliente(cliente_id):
 def simular_fifo(cliente_id):
     """Simula la distribución FIFO de un monto dado sobre las facturas pendientes."""
     monto = Decimal(request.args.get("monto", "0"))
-    facturas = db.session.scalars(
-        select(Factura).where(Factura.cliente_id == cliente_id, Factura.estado != EstadoFactura.PAGADA).order_by(Factura.fecha)
-    ).all()
-    distribucion = []
-    restante = monto
-    for f in facturas:
-        if restante <= 0:
-            break
-        aplicar = min(restante, f.saldo)
-        distribucion.append({"id": f.id, "numero": f.numero, "saldo": float(f.saldo), "aplicado": float(aplicar)})
-        restante -= aplicar
+    pendientes = pendientes_cliente(cliente_id)
+    asignaciones, restante = pendientes.distribuir(monto)
+    distribucion = [
+        {"id": pendientes.ids[i], "numero": pendientes.numeros[i], "saldo": float(pendientes.saldos[i]), "aplicado": float(aplicado)}
+        for i, aplicado in asignaciones
+    ]
     excedente = float(restante) if restante > 0 else 0
-    return jsonify({"distribucion": distribucion, "excedente": excedente, "total_pendiente": float(sum(f.saldo for f in facturas))})
+    return jsonify({"distribucion": distribucion, "excedente": excedente, "total_pendiente": float(pendientes.total)})
 
 
 @cobros_bp.post("/")
@@ -133,31 +122,13 @@ def registrar_cobro():
                 pago.fecha_transferencia = date.fromisoformat(fecha_str)
 
         db.session.add(pago)
-
-        facturas = db.session.scalars(
-            select(Factura).where(Factura.cliente_id == cliente.id, Factura.estado != EstadoFactura.PAGADA).order_by(Factura.fecha)
-        ).all()
-        total_pendiente = sum(f.saldo for f in facturas)
-
-        if not facturas:
-            raise ValueError("El cliente no tiene facturas pendientes.")
-
-        restante = monto_recibido
-        total_aplicado = Decimal("0")
-        for factura in facturas:
-            if restante <= 0:
-                break
-            aplicar = min(restante, factura.saldo)
-            factura.aplicar(aplicar)
-            pago.detalles.append(DetallePago(factura=factura, monto_aplicado=aplicar))
-            total_aplicado += aplicar
-            restante -= aplicar
+        total_aplicado, total_pendiente = aplicar_pago(pago, monto_recibido)
 
         excedente = monto_recibido - total_pendiente
         if excedente > 0:
             manejo = request.form.get("excedente_manejo", "credito")
             if manejo == "credito":
-                cliente.saldo_a_favor = getattr(cliente, 'saldo_a_favor', Decimal("0")) + excedente
+                cliente.saldo_a_favor = Cliente.saldo_a_favor + excedente
                 obs = (pago.observaciones or "") + f" [Excedente RD$ {excedente:,.2f} registrado como crédito]"
                 pago.observaciones = obs.strip()
             elif manejo == "devolver":
@@ -169,15 +140,58 @@ def registrar_cobro():
         pago.monto_pagado = total_aplicado
         registrar_accion("registrar_cobro", "cobros", f"Pago #{pago.id:06d} - {cliente.nombre} - RD$ {total_aplicado:,.2f}")
         db.session.commit()
+        invalidar_metricas()
+        invalidar_pendientes(cliente_id)
         return jsonify({"ok": True, "pago_id": pago.id, "recibo_url": url_for("cobros.recibo_pdf", pago_id=pago.id)})
     except (ValueError, InvalidOperation) as exc:
         db.session.rollback()
         return jsonify({"ok": False, "error": str(exc)}), 400
 
 
+@cobros_bp.post("/lote")
+@login_required
+def importar_lote():
+    """Aplica un lote de cobros desde un archivo CSV/JSON (``archivo``) o un cuerpo JSON.
+
+    Con ``simular=1`` devuelve la distribución sin escribir nada.
+    """
+    simular = request.values.get("simular", "").lower() in ("1", "true", "si")
+    try:
+        if request.is_json:
+            filas = request.get_json()
+            if not isinstance(filas, list):
+                raise ValueError("El JSON debe ser una lista de cobros.")
+        else:
+            archivo = request.files.get("archivo")
+            if not archivo or not archivo.filename:
+                raise ValueError("Adjunte un archivo CSV o JSON.")
+            formato = "json" if archivo.filename.lower().endswith(".json") else "csv"
+            filas = leer_lote(archivo.read().decode("utf-8-sig"), formato)
+        resultados, errores = procesar_lote(filas, current_user.username, simular=simular)
+    except (ValueError, UnicodeDecodeError) as exc:
+        db.session.rollback()
+        return jsonify({"ok": False, "error": str(exc)}), 400
+    if errores:
+        db.session.rollback()
+        return jsonify({"ok": False, "errores": errores}), 400
+    if simular:
+        db.session.rollback()
+    else:
+        db.session.commit()
+        invalidar_metricas()
+        invalidar_pendientes(*{r["cliente"].id for r in resultados})
+    return jsonify({
+        "ok": True,
+        "simulado": simular,
+        "total_aplicado": float(sum(r["aplicado"] for r in resultados)),
+        "cobros": [resumen(r) for r in resultados],
+    })
+
+
 @cobros_bp.get("/<int:pago_id>/recibo.pdf")
 @login_required
 def recibo_pdf(pago_id):
+    from app.utils.pdf import recibo_pdf as generar_recibo_pdf
     pago = db.get_or_404(Pago, pago_id)
     empresa = {
         "nombre": current_app.config["COMPANY_NAME"],
@@ -185,17 +199,18 @@ def recibo_pdf(pago_id):
         "rnc": current_app.config["COMPANY_RNC"],
         "direccion": current_app.config["COMPANY_ADDRESS"],
     }
-    return send_file(generar_recibo_pdf(pago, empresa), as_attachment=True, download_name=f"recibo_{pago.id:06d}.pdf", mimetype="application/pdf")
+    # El recibo imprime el balance actual del cliente y el número de cada factura, que se puede editar.
+    version = [pago.fecha, pago.cliente.nombre, pago.cliente.saldo_pendiente, pago.monto_pagado,
+               [(d.factura.numero, d.monto_aplicado) for d in pago.detalles]]
+    return enviar_pdf("recibo", pago.id, version, empresa, lambda: generar_recibo_pdf(pago, empresa), f"recibo_{pago.id:06d}.pdf")
 
 
 @cobros_bp.get("/historial")
 @login_required
 def historial():
     q = request.args.get("q", "").strip()
-    page = request.args.get("page", 1, type=int)
-    stmt = select(Pago).join(Cliente).order_by(Pago.fecha.desc())
+    stmt = select(Pago).join(Cliente).options(contains_eager(Pago.cliente))
     if q:
-        patron = f"%{q}%"
-        stmt = stmt.where(or_(Cliente.nombre.ilike(patron), Cliente.telefono.ilike(patron), Cliente.rnc_cedula.ilike(patron)))
-    pagos = db.paginate(stmt, page=page, per_page=15, error_out=False)
+        stmt = stmt.where(condicion_clientes(q))
+    pagos = paginar_keyset(stmt, [Pago.fecha, Pago.id], request.args.get("cursor"), 15)
     return render_template("cobros/historial.html", pagos=pagos, q=q)
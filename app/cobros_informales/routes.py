@@ -1,14 +1,19 @@
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
-from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, send_file, url_for
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, url_for
 from flask_login import login_required
 from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError
 
+from app.dashboard.metricas import invalidar_metricas
 from app.extensions import db
 from app.models import Cliente, CobroInformal, AbonoCobroInformal, EstadoCobroInformal, FormaPago
+from app.utils.cache_pdf import enviar_pdf
+from app.utils.paginacion import paginar_keyset
+from app.utils.permisos import proteger
 
 cobros_informales_bp = Blueprint("cobros_informales", __name__)
+proteger(cobros_informales_bp, "cobros_informales", {"recibo": ("reportes",)})
 
 
 @cobros_informales_bp.get("/")
@@ -17,8 +22,7 @@ def historial():
     q = request.args.get("q", "").strip()
     estado = request.args.get("estado", "").strip()
     forma = request.form.get("forma_pago", "").strip() if request.method == "POST" else request.args.get("forma_pago", "").strip()
-    page = request.args.get("page", 1, type=int)
-    stmt = select(CobroInformal).join(Cliente).order_by(CobroInformal.creado_en.desc())
+    stmt = select(CobroInformal).join(Cliente)
     if q:
         patron = f"%{q}%"
         stmt = stmt.where(or_(CobroInformal.concepto.ilike(patron), Cliente.nombre.ilike(patron), Cliente.telefono.ilike(patron)))
@@ -27,7 +31,7 @@ def historial():
             stmt = stmt.where(CobroInformal.estado == EstadoCobroInformal(estado))
         except ValueError:
             pass
-    cobros = db.paginate(stmt, page=page, per_page=15, error_out=False)
+    cobros = paginar_keyset(stmt, [CobroInformal.creado_en, CobroInformal.id], request.args.get("cursor"), 15)
     return render_template("cobros_informales/historial.html", cobros=cobros, q=q, estado=estado)
 
 
@@ -72,6 +76,7 @@ def nuevo():
             cobro.abonos.append(abono)
             db.session.add(cobro)
             db.session.commit()
+            invalidar_metricas()
             flash("Cobro informal registrado.", "success")
             return redirect(url_for("cobros_informales.detalle", cobro_id=cobro.id))
         except (ValueError, InvalidOperation, IntegrityError) as exc:
@@ -113,6 +118,7 @@ def abonar(cobro_id):
             cobro.registrar_abono(monto)
             cobro.abonos.append(abono)
             db.session.commit()
+            invalidar_metricas()
             flash("Abono registrado.", "success")
             return redirect(url_for("cobros_informales.detalle", cobro_id=cobro.id))
         except (ValueError, InvalidOperation) as exc:
@@ -127,6 +133,7 @@ def eliminar(cobro_id):
     cobro = db.get_or_404(CobroInformal, cobro_id)
     db.session.delete(cobro)
     db.session.commit()
+    invalidar_metricas()
     flash("Cobro informal eliminado.", "success")
     return redirect(url_for("cobros_informales.historial"))
 
@@ -134,6 +141,7 @@ def eliminar(cobro_id):
 @cobros_informales_bp.get("/<int:cobro_id>/recibo.pdf")
 @login_required
 def recibo(cobro_id):
+    from app.utils.pdf import recibo_informal_pdf
     cobro = db.get_or_404(CobroInformal, cobro_id)
     empresa = {
         "nombre": current_app.config["COMPANY_NAME"],
@@ -141,65 +149,6 @@ def recibo(cobro_id):
         "rnc": current_app.config["COMPANY_RNC"],
         "direccion": current_app.config["COMPANY_ADDRESS"],
     }
-    return send_file(_recibo_pdf(cobro, empresa), as_attachment=True, download_name=f"cobro_informal_{cobro.id:06d}.pdf", mimetype="application/pdf")
-
-
-def _recibo_pdf(cobro, empresa):
-    import io
-    from reportlab.lib.units import mm
-    from reportlab.pdfgen import canvas as cv
-
-    ancho, alto = 80 * mm, 200 * mm
-    buffer = io.BytesIO()
-    pdf = cv.Canvas(buffer, pagesize=(ancho, alto), pageCompression=1)
-
-    def copia(etiqueta):
-        y, margen = alto - 10 * mm, 7 * mm
-        pdf.setFont("Helvetica-Bold", 11)
-        pdf.drawCentredString(ancho / 2, y, empresa["nombre"]); y -= 5 * mm
-        pdf.setFont("Helvetica", 7)
-        pdf.drawCentredString(ancho / 2, y, f"Tel. {empresa['telefono']} · RNC {empresa['rnc']}"); y -= 4 * mm
-        pdf.drawCentredString(ancho / 2, y, empresa["direccion"][:55]); y -= 6 * mm
-        pdf.line(margen, y, ancho - margen, y); y -= 5 * mm
-        pdf.setFont("Helvetica-Bold", 9)
-        pdf.drawCentredString(ancho / 2, y, f"COBRO INFORMAL · {etiqueta}"); y -= 6 * mm
-        pdf.setFont("Helvetica", 8)
-        pdf.drawString(margen, y, f"No. {cobro.id:06d}"); pdf.drawRightString(ancho - margen, y, cobro.creado_en.strftime("%d/%m/%Y")); y -= 5 * mm
-        pdf.drawString(margen, y, f"Cliente: {cobro.cliente.nombre[:35]}"); y -= 5 * mm
-        pdf.drawString(margen, y, f"Concepto: {cobro.concepto[:38]}"); y -= 6 * mm
-        pdf.line(margen, y, ancho - margen, y); y -= 5 * mm
-
-        pdf.setFont("Helvetica-Bold", 7)
-        pdf.drawString(margen, y, "FORMA DE PAGO"); pdf.drawRightString(ancho - margen, y, "MONTO"); y -= 4 * mm
-        pdf.setFont("Helvetica", 8)
-        for abono in cobro.abonos:
-            fp = abono.forma_pago.value
-            if abono.banco:
-                fp += f" ({abono.banco})"
-            if abono.numero:
-                fp += f" #{abono.numero}"
-            pdf.drawString(margen, y, fp[:38])
-            pdf.drawRightString(ancho - margen, y, f"RD$ {abono.monto:,.2f}")
-            y -= 4.5 * mm
-
-        pdf.line(margen, y, ancho - margen, y); y -= 6 * mm
-        pdf.setFont("Helvetica-Bold", 9)
-        pdf.drawString(margen, y, "TOTAL ADEUDADO")
-        pdf.drawRightString(ancho - margen, y, f"RD$ {cobro.monto_total:,.2f}"); y -= 5 * mm
-        pdf.drawString(margen, y, "TOTAL PAGADO")
-        pdf.drawRightString(ancho - margen, y, f"RD$ {cobro.monto_pagado:,.2f}"); y -= 5 * mm
-        pdf.drawString(margen, y, "SALDO PENDIENTE")
-        pdf.drawRightString(ancho - margen, y, f"RD$ {cobro.saldo_pendiente:,.2f}"); y -= 8 * mm
-
-        pdf.setFont("Helvetica", 7)
-        pdf.drawString(margen, y, f"Estado: {cobro.estado.value}"); y -= 4 * mm
-        pdf.drawString(margen, y, f"Cobrado por: {cobro.abonos[0].usuario if cobro.abonos else 'N/A'}"); y -= 8 * mm
-
-        pdf.drawCentredString(ancho / 2, y, "Gracias por su pago")
-        pdf.showPage()
-
-    copia("ORIGINAL")
-    copia("COPIA")
-    pdf.save()
-    buffer.seek(0)
-    return buffer
+    # Cada abono rebaja el saldo, así que el saldo identifica los abonos impresos.
+    version = [cobro.creado_en, cobro.cliente.nombre, cobro.concepto, cobro.saldo_pendiente]
+    return enviar_pdf("cobro_informal", cobro.id, version, empresa, lambda: recibo_informal_pdf(cobro, empresa), f"cobro_informal_{cobro.id:06d}.pdf")
@@ -0,0 +1,57 @@
+"""Verifica ``clientes.saldo_pendiente`` contra la suma de saldos de sus facturas
+y reconstruye la tabla ``resumen_cartera``.
+
+Uso:
+    flask --app wsgi conciliar-saldos [--corregir]
+    flask --app wsgi reconstruir-cartera
+"""
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Cliente, Factura, ResumenCartera
+
+
+@click.command("conciliar-saldos")
+@click.option("--corregir", is_flag=True, help="Reescribe los saldos que no coinciden.")
+@with_appcontext
+def conciliar_saldos(corregir):
+    """Lista los clientes cuyo saldo guardado difiere de sus facturas."""
+    real = (
+        select(Factura.cliente_id, func.sum(Factura.saldo).label("saldo"))
+        .group_by(Factura.cliente_id)
+        .subquery()
+    )
+    esperado = func.coalesce(real.c.saldo, 0)
+    stmt = (
+        select(Cliente.id, Cliente.nombre, Cliente.saldo_pendiente, esperado.label("esperado"))
+        .outerjoin(real, real.c.cliente_id == Cliente.id)
+        .where(Cliente.saldo_pendiente != esperado)
+        .order_by(Cliente.id)
+    )
+    diferencias = db.session.execute(stmt).all()
+    for fila in diferencias:
+        click.echo(f"{fila.id:>6}  {fila.nombre[:40]:<40}  guardado {fila.saldo_pendiente:>12,.2f}  facturas {fila.esperado:>12,.2f}")
+    if not diferencias:
+        click.echo("Todos los saldos coinciden.")
+        return
+    click.echo(f"{len(diferencias)} cliente(s) con diferencias.")
+    if corregir:
+        correcto = select(func.coalesce(func.sum(Factura.saldo), 0)).where(Factura.cliente_id == Cliente.id).scalar_subquery()
+        db.session.execute(
+            update(Cliente).where(Cliente.id.in_([f.id for f in diferencias])).values(saldo_pendiente=correcto),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        click.echo("Saldos corregidos.")
+
+
+@click.command("reconstruir-cartera")
+@with_appcontext
+def reconstruir_cartera():
+    """Vuelve a generar ``resumen_cartera`` completa desde las facturas abiertas."""
+    ResumenCartera.recalcular()
+    db.session.commit()
+    total = db.session.scalar(select(func.count()).select_from(ResumenCartera))
+    click.echo(f"Resumen de cartera reconstruido: {total} cliente(s) con saldo pendiente.")
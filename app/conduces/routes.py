@@ -1,12 +1,19 @@
 from datetime import date
 from flask import Blueprint, current_app, flash, redirect, render_template, request, send_file, url_for
 from flask_login import login_required
+from sqlalchemy import select
 
 from app.extensions import db
 from app.models import Conduce
-from app.utils.pdf import conduce_pdf
+from app.utils.cache_pdf import enviar_pdf
+from app.utils.permisos import proteger
 
 conduces_bp = Blueprint("conduces", __name__)
+proteger(conduces_bp, "conduces")
+
+
+def _empresa():
+    return {"nombre": current_app.config["COMPANY_NAME"], "telefono": current_app.config["COMPANY_PHONE"], "rnc": current_app.config["COMPANY_RNC"], "direccion": current_app.config["COMPANY_ADDRESS"]}
 
 
 @conduces_bp.route("/", methods=["GET", "POST"])
@@ -26,9 +33,38 @@ def formulario():
     return render_template("conduces/formulario.html", hoy=date.today().isoformat())
 
 
+@conduces_bp.get("/lote.pdf")
+@login_required
+def lote():
+    """Conduces seleccionados (``sel``) o del rango de fechas y cliente, en un solo PDF."""
+    from app.utils.pdf import dibujar_conduce, lote_pdf
+    stmt = select(Conduce).order_by(Conduce.fecha, Conduce.id)
+    seleccion = [int(s) for s in request.args.getlist("sel") if s.isdigit()]
+    if seleccion:
+        stmt = stmt.where(Conduce.id.in_(seleccion))
+    try:
+        if request.args.get("fecha_ini"):
+            stmt = stmt.where(Conduce.fecha >= date.fromisoformat(request.args["fecha_ini"]))
+        if request.args.get("fecha_fin"):
+            stmt = stmt.where(Conduce.fecha <= date.fromisoformat(request.args["fecha_fin"]))
+    except ValueError:
+        flash("Fecha inválida; use el formato AAAA-MM-DD.", "warning")
+        return redirect(url_for("conduces.formulario"))
+    if request.args.get("cliente", "").strip():
+        stmt = stmt.where(Conduce.cliente.ilike(f"%{request.args['cliente'].strip()}%"))
+    maximo = current_app.config["LOTE_IMPRESION_MAX"]
+    conduces = db.session.scalars(stmt.limit(maximo + 1)).all()
+    if not conduces or len(conduces) > maximo:
+        flash("No hay conduces para imprimir." if not conduces else f"El lote supera {maximo} conduces; acote el rango de fechas.", "warning")
+        return redirect(url_for("conduces.formulario"))
+    archivo = lote_pdf(((dibujar_conduce, c) for c in conduces), _empresa())
+    return send_file(archivo, as_attachment=True, download_name="conduces.pdf", mimetype="application/pdf")
+
+
 @conduces_bp.get("/<int:conduce_id>/reporte.pdf")
 @login_required
 def reporte(conduce_id):
+    from app.utils.pdf import conduce_pdf
     conduce = db.get_or_404(Conduce, conduce_id)
-    empresa = {"nombre": current_app.config["COMPANY_NAME"], "telefono": current_app.config["COMPANY_PHONE"], "rnc": current_app.config["COMPANY_RNC"], "direccion": current_app.config["COMPANY_ADDRESS"]}
-    return send_file(conduce_pdf(conduce, empresa), as_attachment=True, download_name=f"conduce_{conduce.id:06d}.pdf", mimetype="application/pdf")
+    empresa = _empresa()
+    return enviar_pdf("conduce", conduce.id, [conduce.creado_en], empresa, lambda: conduce_pdf(conduce, empresa), f"conduce_{conduce.id:06d}.pdf")
@@ -1,4 +1,4 @@
-from flask import abort, flash, redirect, render_template, request, url_for
+from flask import abort, flash, jsonify, redirect, render_template, request, url_for
 from flask_login import current_user, login_required
 
 from app.config_admin import config_admin_bp
@@ -6,6 +6,9 @@ from app.extensions import db
 from app.models.permiso import Permiso
 from app.models.usuario import Usuario
 from app.utils.auditoria import registrar_accion
+from app.utils.identidad import invalidar_identidad
+from app.utils.permisos import proteger
+from app.utils.pool import estadisticas_pool
 
 MODULOS_SISTEMA = [
     ("dashboard", "Dashboard"),
@@ -18,6 +21,8 @@ MODULOS_SISTEMA = [
     ("configuracion", "Configuración"),
 ]
 
+proteger(config_admin_bp, "configuracion")
+
 
 def _admin_required():
     if not current_user.is_authenticated or not current_user.is_admin:
@@ -136,6 +141,7 @@ def editar_usuario(uid):
             Permiso.query.filter_by(usuario_id=user.id).delete()
             for m in request.form.getlist("modulos"):
                 db.session.add(Permiso(usuario_id=user.id, modulo=m))
+        user.invalidar_permisos()
 
         try:
             registrar_accion("editar_usuario", "configuracion", f"Usuario editado: {user.username}")
@@ -145,6 +151,7 @@ def editar_usuario(uid):
             flash("Error al guardar los cambios. Intente de nuevo.", "danger")
             return render_template("config_admin/usuario_form.html", usuario=user, modulos=MODULOS_SISTEMA, form_data=request.form)
 
+        invalidar_identidad(user.id)
         flash("Usuario actualizado correctamente.", "success")
         return redirect(url_for("config_admin.usuarios"))
 
@@ -165,6 +172,7 @@ def eliminar_usuario(uid):
     db.session.delete(user)
     registrar_accion("eliminar_usuario", "configuracion", f"Usuario eliminado: {username}")
     db.session.commit()
+    invalidar_identidad(uid)
     flash("Usuario eliminado.", "success")
     return redirect(url_for("config_admin.usuarios"))
 
@@ -179,9 +187,11 @@ def toggle_usuario(uid):
         flash("No puede desactivar su propio usuario.", "danger")
         return redirect(url_for("config_admin.usuarios"))
     user.is_active = not user.is_active
+    user.invalidar_permisos()
     estado = "activado" if user.is_active else "desactivado"
     registrar_accion("toggle_usuario", "configuracion", f"Usuario {estado}: {user.username}")
     db.session.commit()
+    invalidar_identidad(user.id)
     flash(f"Usuario {estado}.", "success")
     return redirect(url_for("config_admin.usuarios"))
 
@@ -198,3 +208,11 @@ def reset_password(uid):
     db.session.commit()
     flash("Contraseña restablecida correctamente.", "success")
     return redirect(url_for("config_admin.editar_usuario", uid=uid))
+
+
+# ---- Métricas del pool de conexiones ----
+@config_admin_bp.get("/api/pool")
+@login_required
+def pool_conexiones():
+    _admin_required()
+    return jsonify(estadisticas_pool(db.engine))
@@ -0,0 +1,81 @@
+"""Indicadores del dashboard calculados en una sola consulta con caché corta."""
+import threading
+import time
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import func, select, true
+
+from app.extensions import db
+from app.models import Cliente, CobroInformal, EstadoCobroInformal, EstadoFactura, Factura, Pago
+from app.utils.fechas import hoy_negocio, rango_fechas
+
+_cache = {}
+_lock = threading.Lock()
+_generacion = [0]
+
+
+def _consulta(hoy, inicio_mes):
+    clientes = select(func.count(Cliente.id).label("clientes")).subquery()
+    facturas = select(
+        func.count(Factura.id).filter(Factura.estado != EstadoFactura.PAGADA).label("pendientes"),
+        func.count(Factura.id).filter(Factura.estado == EstadoFactura.PAGADA).label("pagadas"),
+        func.coalesce(func.sum(Factura.saldo).filter(Factura.estado != EstadoFactura.PAGADA), 0).label("saldo_pendiente"),
+    ).subquery()
+    pagos = select(
+        func.coalesce(func.sum(Pago.monto_pagado).filter(*rango_fechas(Pago.fecha, hoy, hoy)), 0).label("cobrado_hoy"),
+        func.coalesce(func.sum(Pago.monto_pagado).filter(*rango_fechas(Pago.fecha, inicio_mes, hoy)), 0).label("cobrado_mes"),
+    ).where(*rango_fechas(Pago.fecha, inicio_mes, hoy)).subquery()
+    informales = select(
+        func.count(CobroInformal.id).filter(CobroInformal.estado != EstadoCobroInformal.PAGADO).label("cobros_informales"),
+        func.coalesce(func.sum(CobroInformal.saldo_pendiente).filter(CobroInformal.estado != EstadoCobroInformal.PAGADO), 0).label("saldo_informales"),
+    ).subquery()
+    return select(clientes, facturas, pagos, informales).select_from(
+        clientes.join(facturas, true()).join(pagos, true()).join(informales, true())
+    )
+
+
+def calcular_metricas(hoy):
+    """Ejecuta el único round trip que alimenta todas las tarjetas."""
+    fila = db.session.execute(_consulta(hoy, hoy.replace(day=1))).mappings().one()
+    return {
+        "clientes": fila["clientes"] or 0,
+        "pendientes": fila["pendientes"] or 0,
+        "pagadas": fila["pagadas"] or 0,
+        "saldo_pendiente": Decimal(fila["saldo_pendiente"] or 0),
+        "cobrado_hoy": Decimal(fila["cobrado_hoy"] or 0),
+        "cobrado_mes": Decimal(fila["cobrado_mes"] or 0),
+        "cobros_informales": fila["cobros_informales"] or 0,
+        "saldo_informales": Decimal(fila["saldo_informales"] or 0),
+    }
+
+
+def obtener_metricas():
+    """Devuelve las tarjetas del día, reutilizando el resultado durante ``DASHBOARD_CACHE_TTL`` segundos."""
+    hoy = hoy_negocio()
+    ttl = current_app.config.get("DASHBOARD_CACHE_TTL", 30)
+    ahora = time.monotonic()
+    with _lock:
+        entrada = _cache.get(hoy)
+        if entrada and ahora - entrada[0] < ttl:
+            return dict(entrada[1])
+        generacion = _generacion[0]
+    cards = calcular_metricas(hoy)
+    with _lock:
+        if generacion == _generacion[0]:
+            _cache.clear()
+            _cache[hoy] = (ahora, cards)
+    return dict(cards)
+
+
+def invalidar_metricas():
+    """Descarta la caché de este worker.
+
+    La llaman las vistas que crean, editan o eliminan clientes, facturas,
+    cobros o cobros informales. Los comandos de la CLI (``importar-cobros``,
+    ``conciliar-saldos``) corren en otro proceso: los workers web ven sus
+    cambios al vencer ``DASHBOARD_CACHE_TTL``.
+    """
+    with _lock:
+        _generacion[0] += 1
+        _cache.clear()
@@ -0,0 +1,50 @@
+"""Importa un lote de cobros desde un CSV o JSON.
+
+El CSV lleva encabezado ``cliente_id,rnc_cedula,monto,forma_pago,referencia``;
+cada fila llena ``cliente_id`` o ``rnc_cedula``, no ambos.
+
+Uso:
+    flask --app wsgi importar-cobros transferencias.csv [--simular] [--usuario admin]
+"""
+import click
+from flask.cli import with_appcontext
+
+from app.cobros.fifo import invalidar_pendientes
+from app.cobros.lote import leer_lote, procesar_lote
+from app.dashboard.metricas import invalidar_metricas
+from app.extensions import db
+
+
+@click.command("importar-cobros")
+@click.argument("archivo", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--simular", is_flag=True, help="Muestra la distribución sin guardar nada.")
+@click.option("--usuario", default="Sistema", show_default=True, help="Usuario que figura en los recibos.")
+@with_appcontext
+def importar_cobros(archivo, simular, usuario):
+    """Aplica todos los cobros del archivo en una sola transacción."""
+    formato = "json" if archivo.name.lower().endswith(".json") else "csv"
+    try:
+        resultados, errores = procesar_lote(leer_lote(archivo.read(), formato), usuario, simular=simular)
+    except ValueError as exc:
+        db.session.rollback()
+        raise click.ClickException(str(exc))
+    if errores:
+        db.session.rollback()
+        for error in errores:
+            click.echo(f"Línea {error['linea']}: {error['error']}", err=True)
+        raise click.ClickException(f"{len(errores)} error(es); no se aplicó ningún cobro.")
+
+    for r in resultados:
+        facturas = ", ".join(f"{f.numero} {aplicado:,.2f}" for f, _, aplicado in r["distribucion"])
+        click.echo(f"{r['linea']:>4}  {r['cliente'].nombre[:35]:<35}  {r['aplicado']:>12,.2f}  {facturas}")
+        if r["excedente"] > 0:
+            click.echo(f"      excedente {r['excedente']:,.2f} como crédito")
+    total = sum(r["aplicado"] for r in resultados)
+    if simular:
+        db.session.rollback()
+        click.echo(f"Simulación: {len(resultados)} cobro(s) por RD$ {total:,.2f}; no se guardó nada.")
+        return
+    db.session.commit()
+    invalidar_metricas()
+    invalidar_pendientes(*{r["cliente"].id for r in resultados})
+    click.echo(f"{len(resultados)} cobro(s) aplicados por RD$ {total:,.2f}.")
@@ -6,6 +6,7 @@ from app.models.cobro_informal import CobroInformal, AbonoCobroInformal, EstadoC
 from app.models.factura import Factura, EstadoFactura
 from app.models.pago import Pago, DetallePago, TipoCobro
 from app.models.permiso import Permiso
+from app.models.resumen_cartera import ResumenCartera
 from app.models.usuario import Usuario
 
 __all__ = [
@@ -13,5 +14,5 @@ __all__ = [
     "CobroInformal", "AbonoCobroInformal", "EstadoCobroInformal", "FormaPago",
     "Factura", "EstadoFactura",
     "Pago", "DetallePago", "TipoCobro",
-    "Permiso", "Usuario",
+    "Permiso", "ResumenCartera", "Usuario",
 ]
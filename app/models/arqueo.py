@@ -4,6 +4,7 @@ from app.extensions import db
 
 class Arqueo(db.Model):
     __tablename__ = "arqueos"
+    __table_args__ = (db.Index("ix_arqueos_fecha_id", "fecha", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     fecha = db.Column(db.Date, default=date.today, nullable=False, index=True)
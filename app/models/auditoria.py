@@ -14,7 +14,7 @@ class Auditoria(db.Model):
     descripcion = db.Column(db.Text, nullable=True)
     ip = db.Column(db.String(120), nullable=True)
 
-    usuario = db.relationship("Usuario", backref="auditorias", lazy="joined")
+    usuario = db.relationship("Usuario", backref="auditorias", lazy="select")
 
     def __repr__(self) -> str:
         return f"<Auditoria {self.accion} {self.modulo}>"
@@ -1,9 +1,12 @@
 from datetime import datetime, timezone
+from sqlalchemy import bindparam, update
+
 from app.extensions import db
 
 
 class Cliente(db.Model):
     __tablename__ = "clientes"
+    __table_args__ = (db.Index("ix_clientes_nombre_id", "nombre", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(160), nullable=False, index=True)
@@ -12,12 +15,30 @@ class Cliente(db.Model):
     rnc_cedula = db.Column(db.String(40), unique=True, nullable=True, index=True)
     observaciones = db.Column(db.Text, nullable=True)
     saldo_a_favor = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    # Suma de facturas.saldo, mantenida con ajustar_saldo(); ver `flask conciliar-saldos`
+    saldo_pendiente = db.Column(db.Numeric(12, 2), nullable=False, default=0, server_default="0")
     creado_en = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
 
     facturas = db.relationship("Factura", back_populates="cliente", cascade="all, delete-orphan")
     pagos = db.relationship("Pago", back_populates="cliente", cascade="all, delete-orphan")
     cobros_informales = db.relationship("CobroInformal", back_populates="cliente", cascade="all, delete-orphan")
 
-    @property
-    def saldo_pendiente(self):
-        return sum(f.saldo for f in self.facturas)
+    @classmethod
+    def ajustar_saldo(cls, cliente_id, delta):
+        """Suma ``delta`` al saldo pendiente con un UPDATE relativo, seguro frente a cobros concurrentes."""
+        if delta:
+            db.session.execute(
+                update(cls).where(cls.id == cliente_id).values(saldo_pendiente=cls.saldo_pendiente + delta)
+            )
+
+    @classmethod
+    def ajustar_saldos(cls, deltas):
+        """Versión por lotes de ``ajustar_saldo``: ``deltas`` es ``{cliente_id: delta}`` y va en un executemany."""
+        parametros = [{"b_id": cliente_id, "b_delta": delta} for cliente_id, delta in deltas.items() if delta]
+        if parametros:
+            tabla = cls.__table__
+            db.session.execute(
+                update(tabla).where(tabla.c.id == bindparam("b_id"))
+                .values(saldo_pendiente=tabla.c.saldo_pendiente + bindparam("b_delta")),
+                parametros,
+            )
@@ -18,6 +18,7 @@ class FormaPago(enum.StrEnum):
 
 class CobroInformal(db.Model):
     __tablename__ = "cobros_informales"
+    __table_args__ = (db.Index("ix_cobros_informales_creado_en_id", "creado_en", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     cliente_id = db.Column(db.Integer, db.ForeignKey("clientes.id", ondelete="RESTRICT"), nullable=False, index=True)
@@ -2,6 +2,7 @@ import enum
 from datetime import date, datetime, timezone
 from decimal import Decimal
 from app.extensions import db
+from app.models.cliente import Cliente
 
 
 class EstadoFactura(enum.StrEnum):
@@ -12,7 +13,15 @@ class EstadoFactura(enum.StrEnum):
 
 class Factura(db.Model):
     __tablename__ = "facturas"
-    __table_args__ = (db.UniqueConstraint("cliente_id", "numero", name="uq_factura_cliente_numero"),)
+    __table_args__ = (
+        db.UniqueConstraint("cliente_id", "numero", name="uq_factura_cliente_numero"),
+        db.Index("ix_facturas_fecha_id", "fecha", "id"),
+        db.Index(
+            "ix_facturas_pendientes_cliente_fecha", "cliente_id", "fecha",
+            postgresql_where=db.text("estado <> 'PAGADA'"), postgresql_include=["saldo"],
+            sqlite_where=db.text("estado <> 'PAGADA'"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     cliente_id = db.Column(db.Integer, db.ForeignKey("clientes.id", ondelete="CASCADE"), nullable=False, index=True)
@@ -32,4 +41,5 @@ class Factura(db.Model):
         if monto <= 0 or monto > self.saldo:
             raise ValueError("El monto aplicado debe ser mayor que cero y no superar el saldo pendiente.")
         self.saldo -= monto
+        Cliente.ajustar_saldo(self.cliente_id, -monto)
         self.estado = EstadoFactura.PAGADA if self.saldo == 0 else EstadoFactura.PARCIAL
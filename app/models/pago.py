@@ -17,6 +17,7 @@ class FormaPago(enum.StrEnum):
 
 class Pago(db.Model):
     __tablename__ = "pagos"
+    __table_args__ = (db.Index("ix_pagos_fecha_id", "fecha", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     cliente_id = db.Column(db.Integer, db.ForeignKey("clientes.id", ondelete="RESTRICT"), nullable=False, index=True)
@@ -0,0 +1,57 @@
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+from app.models.factura import EstadoFactura, Factura
+
+# Los dos dialectos soportados entienden INSERT ... ON CONFLICT
+_INSERT = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+_COLUMNAS = ("facturas_pendientes", "total_pendiente", "fecha_mas_antigua")
+
+
+class ResumenCartera(db.Model):
+    """Una fila por cliente con facturas abiertas; la mantiene ``recalcular()`` en cada transacción que las toca."""
+
+    __tablename__ = "resumen_cartera"
+
+    cliente_id = db.Column(db.Integer, db.ForeignKey("clientes.id", ondelete="CASCADE"), primary_key=True)
+    facturas_pendientes = db.Column(db.Integer, nullable=False)
+    total_pendiente = db.Column(db.Numeric(12, 2), nullable=False)
+    fecha_mas_antigua = db.Column(db.Date, nullable=False)
+
+    @classmethod
+    def _agregado(cls):
+        return (
+            select(
+                Factura.cliente_id,
+                func.count(Factura.id),
+                func.sum(Factura.saldo),
+                func.min(Factura.fecha),
+            )
+            .where(Factura.estado != EstadoFactura.PAGADA)
+            .group_by(Factura.cliente_id)
+        )
+
+    @classmethod
+    def recalcular(cls, *cliente_ids):
+        """Rehace las filas de esos clientes desde sus facturas abiertas; sin ids rehace toda la tabla.
+
+        La fecha más antigua no se puede ajustar por diferencias, así que se
+        vuelve a agregar solo lo de cada cliente afectado (usa el índice por
+        ``cliente_id``). Un upsert en vez de DELETE + INSERT: dos transacciones
+        que recalculan al mismo cliente se esperan en el bloqueo de su fila en
+        lugar de chocar con la clave primaria. Después se borran las filas de
+        los clientes que ya no tienen facturas abiertas. No hace commit.
+        """
+        agregado = cls._agregado()
+        sobrantes = delete(cls).where(~exists().where(
+            Factura.cliente_id == cls.cliente_id, Factura.estado != EstadoFactura.PAGADA,
+        ))
+        if cliente_ids:
+            agregado = agregado.where(Factura.cliente_id.in_(cliente_ids))
+            sobrantes = sobrantes.where(cls.cliente_id.in_(cliente_ids))
+        upsert = _INSERT[db.session.get_bind().dialect.name](cls).from_select(["cliente_id", *_COLUMNAS], agregado)
+        db.session.execute(upsert.on_conflict_do_update(
+            index_elements=[cls.cliente_id], set_={c: getattr(upsert.excluded, c) for c in _COLUMNAS},
+        ))
+        db.session.execute(sobrantes)
@@ -1,9 +1,19 @@
 from datetime import datetime, timezone
 
 import bcrypt
+from flask import current_app
 from flask_login import UserMixin
 
 from app.extensions import db
+from app.models.permiso import Permiso
+from app.utils.cache import CacheLRU
+
+MODULOS = ("dashboard", "clientes", "cobros", "cobros_informales", "arqueo", "conduces", "reportes", "configuracion")
+_TODOS = frozenset(MODULOS)
+
+# (usuario_id, permisos_version) -> frozenset; la versión en la clave hace
+# que un cambio guardado en cualquier worker invalide las copias de los demás.
+_permisos = CacheLRU()
 
 
 class Usuario(UserMixin, db.Model):
@@ -19,6 +29,8 @@ class Usuario(UserMixin, db.Model):
     is_admin = db.Column(db.Boolean, nullable=False, default=False)
     created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc))
     last_login = db.Column(db.DateTime(timezone=True), nullable=True)
+    # Se incrementa con cada cambio de permisos o de rol
+    permisos_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     permisos = db.relationship("Permiso", backref="usuario", lazy="dynamic", cascade="all, delete-orphan")
 
@@ -27,7 +39,7 @@ class Usuario(UserMixin, db.Model):
         return bool(self.password_hash)
 
     def set_password(self, raw: str) -> None:
-        self.password_hash = bcrypt.hashpw(raw.encode(), bcrypt.gensalt()).decode()
+        self.password_hash = bcrypt.hashpw(raw.encode(), bcrypt.gensalt(current_app.config["BCRYPT_ROUNDS"])).decode()
 
     def clear_password(self) -> None:
         self.password_hash = None
@@ -40,16 +52,36 @@ class Usuario(UserMixin, db.Model):
         except (ValueError, TypeError):
             return False
 
+    def necesita_rehash(self) -> bool:
+        """El hash se hizo con un costo distinto de ``BCRYPT_ROUNDS`` (``$2b$12$...``)."""
+        try:
+            return int(self.password_hash.split("$")[2]) != current_app.config["BCRYPT_ROUNDS"]
+        except (AttributeError, IndexError, ValueError):
+            return False
+
     # ---- permission helpers ----
-    def tiene_permiso(self, modulo: str) -> bool:
+    def permisos_efectivos(self) -> frozenset[str]:
+        """Módulos permitidos, consultados una vez por versión de permisos."""
         if self.is_admin:
-            return True
-        return self.permisos.filter_by(modulo=modulo).first() is not None
+            return _TODOS
+        clave = (self.id, self.permisos_version or 0)
+        modulos = _permisos.obtener(clave, current_app.config["PERMISOS_CACHE_TTL"])
+        if modulos is None:
+            generacion = _permisos.generacion
+            modulos = frozenset(db.session.scalars(db.select(Permiso.modulo).where(Permiso.usuario_id == self.id)))
+            _permisos.guardar(clave, modulos, current_app.config["PERMISOS_CACHE_SIZE"], generacion)
+        return modulos
+
+    def invalidar_permisos(self) -> None:
+        # Se incrementa en el UPDATE: dos ediciones simultáneas obtienen versiones distintas
+        self.permisos_version = Usuario.permisos_version + 1
+
+    def tiene_permiso(self, modulo: str) -> bool:
+        return modulo in self.permisos_efectivos()
 
     def modulos_permitidos(self) -> list[str]:
-        if self.is_admin:
-            return ["dashboard", "clientes", "cobros", "cobros_informales", "arqueo", "conduces", "reportes", "configuracion"]
-        return [p.modulo for p in self.permisos]
+        permisos = self.permisos_efectivos()
+        return [m for m in MODULOS if m in permisos]
 
     def touch_login(self) -> None:
         self.last_login = datetime.now(timezone.utc)
@@ -0,0 +1,42 @@
+"""Fase de despliegue: migraciones y usuario admin, una sola vez por arranque.
+
+Corre antes de levantar gunicorn (ver ``render.yaml`` y ``Procfile``), así los
+workers no compiten por migrar ni pagan bcrypt al importar ``wsgi``.
+
+Uso:
+    flask --app wsgi release [--stamp-si-falla] [--restablecer-admin]
+"""
+import click
+from flask.cli import with_appcontext
+
+from app.extensions import db
+from app.models.usuario import Usuario
+from app.seed_admin import asegurar_admin
+
+
+@click.command("release")
+@click.option("--stamp-si-falla", is_flag=True, help="Si la migración falla, marca la base en head en vez de abortar.")
+@click.option("--restablecer-admin", is_flag=True, help="Vuelve a poner admin123 como contraseña de admin.")
+@with_appcontext
+def release(stamp_si_falla, restablecer_admin):
+    """Aplica las migraciones pendientes y asegura el usuario admin."""
+    from flask_migrate import stamp, upgrade
+
+    try:
+        upgrade()
+    except Exception as e:
+        if not stamp_si_falla:
+            raise
+        click.echo(f"Migración falló ({e}), haciendo stamp a head...")
+        stamp()
+
+    if asegurar_admin():
+        click.echo("Usuario admin creado: admin / admin123")
+    elif restablecer_admin:
+        admin = db.session.scalar(db.select(Usuario).where(Usuario.username == "admin"))
+        admin.set_password("admin123")
+        admin.invalidar_permisos()
+        db.session.commit()
+        click.echo("Password del usuario admin reseteado.")
+    else:
+        click.echo("Usuario admin OK.")
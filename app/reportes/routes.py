@@ -1,32 +1,34 @@
+import csv
 import io
-from datetime import date, datetime
+import tempfile
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 
-from flask import Blueprint, abort, current_app, flash, jsonify, redirect, render_template, request, send_file, url_for
+from flask import (
+    Blueprint, Response, abort, current_app, flash, jsonify, redirect, render_template, request,
+    send_file, stream_with_context, url_for,
+)
 from flask_login import current_user, login_required
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.units import mm
-from reportlab.lib.colors import Color, HexColor, white, black
-from reportlab.pdfgen import canvas as pdf_canvas
-from sqlalchemy import func, or_, select
+from sqlalchemy import String, and_, cast, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from app.extensions import db
 from app.models import (
-    AbonoCobroInformal, Arqueo, Cliente, CobroInformal, EstadoCobroInformal,
+    AbonoCobroInformal, Arqueo, Cliente, CobroInformal, DetallePago, EstadoCobroInformal,
     EstadoFactura, Factura, FormaPago, Pago, TipoCobro,
 )
+from app.utils.fechas import hoy_negocio, rango_fechas
+from app.models.pago import FormaPago as FormaPagoCobro
+from app.reportes import trabajos
+from app.utils.busqueda import buscar_clientes_json, condicion_clientes
+from app.utils.cache_pdf import enviar_pdf
+from app.utils.paginacion import PaginaKeyset, paginar_keyset
+from app.utils.permisos import proteger
+from app.utils.pool import limitar_consultas
 
 reportes_bp = Blueprint("reportes", __name__)
-
-# ── Colores corporativos ────────────────────────────────────────────
-_C_PRIMARY    = HexColor("#1B3A5C")
-_C_HEADER_BG  = HexColor("#E8EDF2")
-_C_ZEBRA      = HexColor("#F4F6F8")
-_C_BORDER     = HexColor("#C5CED6")
-_C_GREEN      = HexColor("#27AE60")
-_C_YELLOW     = HexColor("#F39C12")
-_C_RED        = HexColor("#E74C3C")
-_C_CARD_BG    = HexColor("#F8F9FA")
+proteger(reportes_bp, "reportes")
+_POR_PAGINA = 50
 
 
 def _empresa():
@@ -46,6 +48,11 @@ def _usuario_actual():
     return current_user.username if current_user.is_authenticated else "Sistema"
 
 
+def _alcance():
+    """``(usuario, es_admin)`` de la petición, para reportes que se generan fuera de ella."""
+    return _usuario_actual(), _es_admin()
+
+
 # ── Helpers de permisos ──────────────────────────────────────────────
 
 def _filtrar_pagos_usuario(stmt):
@@ -77,7 +84,7 @@ def facturas():
     fecha_ini = request.args.get("fecha_ini", "").strip()
     fecha_fin = request.args.get("fecha_fin", "").strip()
 
-    stmt = select(Factura).join(Cliente).order_by(Factura.fecha.desc(), Factura.id.desc())
+    stmt = select(Factura).join(Cliente)
 
     if q:
         stmt = stmt.where(Factura.numero.ilike(f"%{q}%"))
@@ -93,162 +100,117 @@ def facturas():
     if fecha_fin:
         stmt = stmt.where(Factura.fecha <= date.fromisoformat(fecha_fin))
 
-    facturas = db.session.scalars(stmt).all()
+    facturas = paginar_keyset(stmt, [Factura.fecha, Factura.id], request.args.get("cursor"), _POR_PAGINA)
     return render_template("reportes/facturas.html", facturas=facturas, q=q, cliente_q=cliente_q, estado=estado, fecha_ini=fecha_ini, fecha_fin=fecha_fin)
 
 
 @reportes_bp.get("/facturas/<int:factura_id>/pdf")
 @login_required
 def factura_pdf(factura_id):
+    from app.utils.pdf import factura_pdf as generar_factura_pdf
     factura = db.get_or_404(Factura, factura_id)
-    empresa = _empresa()
-    buffer = io.BytesIO()
-    pdf = pdf_canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
-    ancho, alto = A4
-    y = alto - 50
-
-    pdf.setFont("Helvetica-Bold", 14)
-    pdf.drawCentredString(ancho / 2, y, empresa["nombre"])
-    y -= 20
-    pdf.setFont("Helvetica", 9)
-    pdf.drawCentredString(ancho / 2, y, f"Tel. {empresa['telefono']} · RNC {empresa['rnc']}")
-    y -= 14
-    pdf.drawCentredString(ancho / 2, y, empresa["direccion"])
-    y -= 20
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.drawCentredString(ancho / 2, y, f"FACTURA #{factura.numero}")
-    y -= 25
-
-    pdf.setFont("Helvetica", 10)
-    pdf.drawString(45, y, f"Cliente: {factura.cliente.nombre}")
-    pdf.drawRightString(ancho - 45, y, f"Fecha: {factura.fecha.strftime('%d/%m/%Y')}")
-    y -= 16
-    if factura.cliente.rnc_cedula:
-        pdf.drawString(45, y, f"RNC/Cédula: {factura.cliente.rnc_cedula}")
-        y -= 16
-    pdf.drawString(45, y, f"Concepto: {factura.concepto}")
-    y -= 20
-
-    pdf.line(45, y, ancho - 45, y)
-    y -= 20
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.drawString(45, y, "Detalle")
-    y -= 18
-
-    pdf.setFont("Helvetica", 10)
-    pdf.drawString(45, y, "Descripción")
-    pdf.drawRightString(ancho - 45, y, "Monto")
-    y -= 16
-    pdf.line(45, y, ancho - 45, y)
-    y -= 16
-
-    pdf.drawString(45, y, factura.concepto)
-    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.monto:,.2f}")
-    y -= 20
-
-    pdf.line(45, y, ancho - 45, y)
-    y -= 20
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.drawString(45, y, "Total:")
-    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.monto:,.2f}")
-    y -= 18
-    pdf.drawString(45, y, "Pagado:")
-    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.monto - factura.saldo:,.2f}")
-    y -= 18
-    pdf.drawString(45, y, "Pendiente:")
-    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.saldo:,.2f}")
-    y -= 30
+    empresa, usuario, hoy = _empresa(), _usuario_actual(), hoy_negocio()
+    # El pie lleva usuario y fecha: se reutiliza la copia del mismo usuario en el día.
+    version = [factura.numero, factura.concepto, factura.monto, factura.saldo, factura.fecha,
+               factura.cliente.nombre, factura.cliente.rnc_cedula, usuario, hoy]
+    return enviar_pdf("factura", factura.id, version, empresa,
+                      lambda: generar_factura_pdf(factura, empresa, usuario, hoy), f"factura_{factura.numero}.pdf")
 
-    pdf.setFont("Helvetica", 9)
-    pdf.drawCentredString(ancho / 2, y, f"Generado por {_usuario_actual()} · {datetime.now().strftime('%d/%m/%Y %H:%M')}")
 
-    pdf.save()
-    buffer.seek(0)
-    return send_file(buffer, as_attachment=True, download_name=f"factura_{factura.numero}.pdf", mimetype="application/pdf")
+# ── 2. Reporte de Cobros ─────────────────────────────────────────────
 
+_LOTE_EXPORTACION = 500
 
-# ── 2. Reporte de Cobros ─────────────────────────────────────────────
 
-@reportes_bp.get("/cobros")
-@login_required
-def cobros():
-    fecha_ini = request.args.get("fecha_ini", "").strip()
-    fecha_fin = request.args.get("fecha_fin", "").strip()
-    cliente_q = request.args.get("cliente", "").strip()
-    usuario_q = request.args.get("usuario", "").strip()
-    forma_pago = request.args.get("forma_pago", "").strip()
-    tipo_cobro = request.args.get("tipo_cobro", "").strip()
+def _filtros_cobros():
+    return {
+        "fecha_ini": request.args.get("fecha_ini", "").strip(),
+        "fecha_fin": request.args.get("fecha_fin", "").strip(),
+        "cliente_q": request.args.get("cliente", "").strip(),
+        "usuario_q": request.args.get("usuario", "").strip(),
+        "forma_pago": request.args.get("forma_pago", "").strip(),
+        "tipo_cobro": request.args.get("tipo_cobro", "").strip(),
+    }
 
-    stmt = select(Pago).join(Cliente).order_by(Pago.fecha.desc())
-    stmt = _filtrar_pagos_usuario(stmt)
 
-    if fecha_ini:
-        stmt = stmt.where(func.date(Pago.fecha) >= date.fromisoformat(fecha_ini))
-    if fecha_fin:
-        stmt = stmt.where(func.date(Pago.fecha) <= date.fromisoformat(fecha_fin))
-    if cliente_q:
-        stmt = stmt.where(Cliente.nombre.ilike(f"%{cliente_q}%"))
-    if usuario_q and _es_admin():
-        stmt = stmt.where(Pago.usuario.ilike(f"%{usuario_q}%"))
-    if forma_pago:
+def _filtrar_cobros(stmt, filtros, alcance=None):
+    """Aplica los filtros del reporte a una consulta que ya une ``Pago`` con ``Cliente``."""
+    usuario, es_admin = alcance or _alcance()
+    if not es_admin:
+        stmt = stmt.where(Pago.usuario == usuario)
+    stmt = stmt.where(*rango_fechas(Pago.fecha, filtros["fecha_ini"], filtros["fecha_fin"]))
+    if filtros["cliente_q"]:
+        stmt = stmt.where(Cliente.nombre.ilike(f"%{filtros['cliente_q']}%"))
+    if filtros["usuario_q"] and es_admin:
+        stmt = stmt.where(Pago.usuario.ilike(f"%{filtros['usuario_q']}%"))
+    if filtros["forma_pago"]:
         try:
-            stmt = stmt.where(Pago.forma_pago == FormaPago(forma_pago))
+            stmt = stmt.where(Pago.forma_pago == FormaPago(filtros["forma_pago"]))
         except ValueError:
             pass
-    if tipo_cobro:
+    if filtros["tipo_cobro"]:
         try:
-            stmt = stmt.where(Pago.tipo == TipoCobro(tipo_cobro))
+            stmt = stmt.where(Pago.tipo == TipoCobro(filtros["tipo_cobro"]))
         except ValueError:
             pass
+    return stmt
+
+
+def _consulta_cobros(filtros, alcance=None):
+    """Pagos del reporte con cliente, detalles y facturas precargados.
+
+    El cliente viaja en el mismo JOIN y los detalles con sus facturas en un
+    único SELECT ... IN adicional, así el número de consultas no depende de
+    cuántos recibos tenga el rango.
+    """
+    stmt = (
+        select(Pago).join(Cliente)
+        .options(contains_eager(Pago.cliente), selectinload(Pago.detalles).joinedload(DetallePago.factura))
+        .order_by(Pago.fecha.desc(), Pago.id.desc())
+    )
+    return _filtrar_cobros(stmt, filtros, alcance)
+
 
-    pagos = db.session.scalars(stmt).all()
+def _totales_cobros(filtros, alcance=None):
+    """Total, cantidad y subtotal por forma de pago en un solo ``GROUP BY``."""
+    stmt = _filtrar_cobros(
+        select(Pago.forma_pago, func.count(Pago.id), func.coalesce(func.sum(Pago.monto_pagado), 0)).join(Cliente),
+        filtros, alcance,
+    ).group_by(Pago.forma_pago)
+    por_forma = {fp.value: Decimal("0") for fp in FormaPago}
+    cantidad = 0
+    for forma, n, subtotal in db.session.execute(stmt):
+        por_forma[forma.value] = Decimal(subtotal)
+        cantidad += n
+    return sum(por_forma.values(), Decimal("0")), cantidad, por_forma
 
-    total_cobrado = sum(float(p.monto_pagado) for p in pagos)
-    cantidad = len(pagos)
-    por_forma = {}
-    for fp in FormaPago:
-        por_forma[fp.value] = sum(float(p.monto_pagado) for p in pagos if p.forma_pago == fp)
+
+@reportes_bp.get("/cobros")
+@login_required
+def cobros():
+    filtros = _filtros_cobros()
+    pagos = paginar_keyset(_consulta_cobros(filtros).order_by(None), [Pago.fecha, Pago.id], request.args.get("cursor"), _POR_PAGINA)
+    total_cobrado, cantidad, por_forma = _totales_cobros(filtros)
 
     return render_template("reportes/cobros.html",
         pagos=pagos, total_cobrado=total_cobrado, cantidad=cantidad, por_forma=por_forma,
-        fecha_ini=fecha_ini, fecha_fin=fecha_fin, cliente_q=cliente_q, usuario_q=usuario_q,
-        forma_pago=forma_pago, tipo_cobro=tipo_cobro, es_admin=_es_admin(),
+        es_admin=_es_admin(), **filtros,
     )
 
 
 @reportes_bp.get("/cobros/pdf")
 @login_required
 def cobros_pdf():
-    fecha_ini = request.args.get("fecha_ini", "").strip()
-    fecha_fin = request.args.get("fecha_fin", "").strip()
-    cliente_q = request.args.get("cliente", "").strip()
-    usuario_q = request.args.get("usuario", "").strip()
-    forma_pago = request.args.get("forma_pago", "").strip()
-    tipo_cobro = request.args.get("tipo_cobro", "").strip()
+    parametros = {"filtros": _filtros_cobros(), "alcance": _alcance(), "ahora": datetime.now()}
+    return _en_segundo_plano(_cobros_pdf, parametros, "reporte_cobros.pdf")
 
-    stmt = select(Pago).join(Cliente).order_by(Pago.fecha.desc())
-    stmt = _filtrar_pagos_usuario(stmt)
 
-    if fecha_ini:
-        stmt = stmt.where(func.date(Pago.fecha) >= date.fromisoformat(fecha_ini))
-    if fecha_fin:
-        stmt = stmt.where(func.date(Pago.fecha) <= date.fromisoformat(fecha_fin))
-    if cliente_q:
-        stmt = stmt.where(Cliente.nombre.ilike(f"%{cliente_q}%"))
-    if usuario_q and _es_admin():
-        stmt = stmt.where(Pago.usuario.ilike(f"%{usuario_q}%"))
-    if forma_pago:
-        try:
-            stmt = stmt.where(Pago.forma_pago == FormaPago(forma_pago))
-        except ValueError:
-            pass
-    if tipo_cobro:
-        try:
-            stmt = stmt.where(Pago.tipo == TipoCobro(tipo_cobro))
-        except ValueError:
-            pass
-
-    pagos = db.session.scalars(stmt).all()
+def _cobros_pdf(filtros, alcance, ahora):
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas as pdf_canvas
+    limitar_consultas(db.session)
+    total, cantidad, por_forma = _totales_cobros(filtros, alcance)
+    pagos = db.session.scalars(_consulta_cobros(filtros, alcance).execution_options(yield_per=_LOTE_EXPORTACION))
     empresa = _empresa()
     buffer = io.BytesIO()
     pdf = pdf_canvas.Canvas(buffer, pagesize=landscape(A4), pageCompression=1)
@@ -260,11 +222,11 @@ def cobros_pdf():
     y -= 16
     pdf.setFont("Helvetica", 9)
     rango = ""
-    if fecha_ini: rango += f"Desde: {fecha_ini}"
-    if fecha_fin: rango += f"  Hasta: {fecha_fin}"
+    if filtros["fecha_ini"]: rango += f"Desde: {filtros['fecha_ini']}"
+    if filtros["fecha_fin"]: rango += f"  Hasta: {filtros['fecha_fin']}"
     pdf.drawCentredString(ancho / 2, y, rango or "Todos los registros")
     y -= 14
-    pdf.drawCentredString(ancho / 2, y, f"Generado por {_usuario_actual()} · {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    pdf.drawCentredString(ancho / 2, y, f"Generado por {alcance[0]} · {ahora.strftime('%d/%m/%Y %H:%M')}")
     y -= 20
 
     headers = ["Fecha", "Cliente", "Concepto", "Forma", "Monto", "Usuario"]
@@ -293,65 +255,84 @@ def cobros_pdf():
     y -= 10
     pdf.line(30, y, ancho - 30, y)
     y -= 16
-    total = sum(float(p.monto_pagado) for p in pagos)
     pdf.setFont("Helvetica-Bold", 10)
     pdf.drawString(30, y, f"Total cobrado: RD$ {total:,.2f}")
-    pdf.drawRightString(ancho - 30, y, f"Cantidad: {len(pagos)}")
+    pdf.drawRightString(ancho - 30, y, f"Cantidad: {cantidad}")
     y -= 14
     pdf.setFont("Helvetica", 9)
-    for fp in FormaPago:
-        subtotal = sum(float(p.monto_pagado) for p in pagos if p.forma_pago == fp)
+    for forma, subtotal in por_forma.items():
         if subtotal > 0:
-            pdf.drawString(30, y, f"{fp.value}: RD$ {subtotal:,.2f}")
+            pdf.drawString(30, y, f"{forma}: RD$ {subtotal:,.2f}")
             y -= 12
 
     pdf.save()
     buffer.seek(0)
-    return send_file(buffer, as_attachment=True, download_name="reporte_cobros.pdf", mimetype="application/pdf")
+    return buffer
 
 
-@reportes_bp.get("/cobros/excel")
-@login_required
-def cobros_excel():
-    fecha_ini = request.args.get("fecha_ini", "").strip()
-    fecha_fin = request.args.get("fecha_fin", "").strip()
-    cliente_q = request.args.get("cliente", "").strip()
-    usuario_q = request.args.get("usuario", "").strip()
-    forma_pago = request.args.get("forma_pago", "").strip()
-    tipo_cobro = request.args.get("tipo_cobro", "").strip()
+_COLUMNAS_EXPORTACION = ["Fecha", "Cliente", "Concepto", "Forma de Pago", "Monto", "Usuario"]
 
-    stmt = select(Pago).join(Cliente).order_by(Pago.fecha.desc())
-    stmt = _filtrar_pagos_usuario(stmt)
 
-    if fecha_ini:
-        stmt = stmt.where(func.date(Pago.fecha) >= date.fromisoformat(fecha_ini))
-    if fecha_fin:
-        stmt = stmt.where(func.date(Pago.fecha) <= date.fromisoformat(fecha_fin))
-    if cliente_q:
-        stmt = stmt.where(Cliente.nombre.ilike(f"%{cliente_q}%"))
-    if usuario_q and _es_admin():
-        stmt = stmt.where(Pago.usuario.ilike(f"%{usuario_q}%"))
-    if forma_pago:
-        try:
-            stmt = stmt.where(Pago.forma_pago == FormaPago(forma_pago))
-        except ValueError:
-            pass
-    if tipo_cobro:
-        try:
-            stmt = stmt.where(Pago.tipo == TipoCobro(tipo_cobro))
-        except ValueError:
-            pass
+def _fila_exportacion(p):
+    concepto = p.concepto_manual or ", ".join(d.factura.numero for d in p.detalles if d.factura)
+    return [p.fecha.strftime("%d/%m/%Y"), p.cliente.nombre, concepto, p.forma_pago.value, p.monto_pagado, p.usuario]
 
-    pagos = db.session.scalars(stmt).all()
 
-    output = io.StringIO()
-    output.write("Fecha,Cliente,Concepto,Forma de Pago,Monto,Usuario\n")
-    for p in pagos:
-        concepto = p.concepto_manual or ", ".join(d.factura.numero for d in p.detalles if d.factura)
-        output.write(f'{p.fecha.strftime("%d/%m/%Y")},"{p.cliente.nombre}","{concepto}","{p.forma_pago.value}",{p.monto_pagado},"{p.usuario}"\n')
+@reportes_bp.get("/cobros/excel")
+@login_required
+def cobros_excel():
+    limitar_consultas(db.session)
+    filtros = _filtros_cobros()
+    stmt = _consulta_cobros(filtros).execution_options(yield_per=_LOTE_EXPORTACION)
+    if request.args.get("formato") == "xlsx":
+        return _cobros_xlsx(stmt)
+
+    def generar():
+        salida = io.StringIO()
+        writer = csv.writer(salida)
+        salida.write("\ufeff")
+        writer.writerow(_COLUMNAS_EXPORTACION)
+        for i, p in enumerate(db.session.scalars(stmt), start=1):
+            writer.writerow(_fila_exportacion(p))
+            if i % _LOTE_EXPORTACION == 0:
+                yield salida.getvalue()
+                salida.seek(0)
+                salida.truncate()
+        yield salida.getvalue()
+
+    return Response(
+        stream_with_context(generar()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=reporte_cobros.csv"},
+    )
+
 
-    buffer = io.BytesIO(output.getvalue().encode("utf-8-sig"))
-    return send_file(buffer, as_attachment=True, download_name="reporte_cobros.csv", mimetype="text/csv")
+def _cobros_xlsx(stmt):
+    """Escribe el reporte en .xlsx fila por fila (``constant_memory``) sobre un archivo temporal."""
+    try:
+        import xlsxwriter
+    except ImportError:
+        flash("La exportación a Excel (.xlsx) no está disponible en este servidor.", "warning")
+        return redirect(url_for("reportes.cobros", **request.args))
+
+    archivo = tempfile.TemporaryFile()
+    # Nombres y conceptos los escribe el usuario: un "=" al inicio es texto, no una fórmula
+    libro = xlsxwriter.Workbook(archivo, {"constant_memory": True, "strings_to_formulas": False})
+    hoja = libro.add_worksheet("Cobros")
+    negrita = libro.add_format({"bold": True})
+    moneda = libro.add_format({"num_format": "#,##0.00"})
+    hoja.write_row(0, 0, _COLUMNAS_EXPORTACION, negrita)
+    for fila, p in enumerate(db.session.scalars(stmt), start=1):
+        fecha, cliente, concepto, forma, monto, usuario = _fila_exportacion(p)
+        hoja.write_row(fila, 0, [fecha, cliente, concepto, forma])
+        hoja.write_number(fila, 4, float(monto), moneda)
+        hoja.write_string(fila, 5, usuario)
+    libro.close()
+    archivo.seek(0)
+    return send_file(
+        archivo, as_attachment=True, download_name="reporte_cobros.xlsx",
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
 
 
 # ── 3. Estado de Cuenta ──────────────────────────────────────────────
@@ -387,6 +368,15 @@ def estado_cuenta():
 @login_required
 def estado_cuenta_pdf(cliente_id):
     cliente = db.get_or_404(Cliente, cliente_id)
+    parametros = {"cliente_id": cliente.id, "ahora": datetime.now()}
+    return _en_segundo_plano(_estado_cuenta_pdf, parametros, f"estado_cuenta_{cliente.nombre[:20]}.pdf")
+
+
+def _estado_cuenta_pdf(cliente_id, ahora):
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas as pdf_canvas
+    limitar_consultas(db.session)
+    cliente = db.session.get(Cliente, cliente_id)
     facturas = db.session.scalars(
         select(Factura).where(Factura.cliente_id == cliente.id).order_by(Factura.fecha.desc())
     ).all()
@@ -422,7 +412,7 @@ def estado_cuenta_pdf(cliente_id):
     if cliente.direccion:
         pdf.drawString(45, y, f"Dirección: {cliente.direccion}")
         y -= 14
-    pdf.drawString(45, y, f"Fecha: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    pdf.drawString(45, y, f"Fecha: {ahora.strftime('%d/%m/%Y %H:%M')}")
     y -= 20
 
     pdf.line(45, y, ancho - 45, y)
@@ -463,7 +453,7 @@ def estado_cuenta_pdf(cliente_id):
 
     pdf.save()
     buffer.seek(0)
-    return send_file(buffer, as_attachment=True, download_name=f"estado_cuenta_{cliente.nombre[:20]}.pdf", mimetype="application/pdf")
+    return buffer
 
 
 # ── 4. Historial de Arqueos ──────────────────────────────────────────
@@ -475,8 +465,7 @@ def historial_arqueos():
     fecha_fin = request.args.get("fecha_fin", "").strip()
     usuario_q = request.args.get("usuario", "").strip()
 
-    stmt = select(Arqueo).order_by(Arqueo.fecha.desc(), Arqueo.id.desc())
-    stmt = _filtrar_arqueos_usuario(stmt)
+    stmt = _filtrar_arqueos_usuario(select(Arqueo))
 
     if fecha_ini:
         stmt = stmt.where(Arqueo.fecha >= date.fromisoformat(fecha_ini))
@@ -485,7 +474,7 @@ def historial_arqueos():
     if usuario_q and _es_admin():
         stmt = stmt.where(Arqueo.cajero.ilike(f"%{usuario_q}%"))
 
-    arqueos = db.session.scalars(stmt).all()
+    arqueos = paginar_keyset(stmt, [Arqueo.fecha, Arqueo.id], request.args.get("cursor"), _POR_PAGINA)
     return render_template("reportes/historial_arqueos.html",
         arqueos=arqueos, fecha_ini=fecha_ini, fecha_fin=fecha_fin, usuario_q=usuario_q, es_admin=_es_admin(),
     )
@@ -495,13 +484,15 @@ def historial_arqueos():
 @login_required
 def arqueo_pdf(arqueo_id):
     arqueo = db.get_or_404(Arqueo, arqueo_id)
+    parametros = {"arqueo_id": arqueo.id, "username": _usuario_actual(), "ahora": datetime.now()}
+    return _en_segundo_plano(_arqueo_pdf, parametros, f"arqueo_{arqueo.id}.pdf")
+
+
+def _arqueo_pdf(arqueo_id, username, ahora):
+    from app.utils.pdf_arqueo import generar_arqueo_pdf
     empresa = _empresa()
     empresa["email"] = current_app.config.get("COMPANY_EMAIL", "")
-    ahora = datetime.now()
-    username = _usuario_actual()
-    from app.utils.pdf_arqueo import generar_arqueo_pdf
-    buffer = generar_arqueo_pdf(arqueo, empresa, username, ahora)
-    return send_file(buffer, as_attachment=True, download_name=f"arqueo_{arqueo.id}.pdf", mimetype="application/pdf")
+    return generar_arqueo_pdf(db.session.get(Arqueo, arqueo_id), empresa, username, ahora)
 
 
 # ── API: buscar clientes para autocompletado ─────────────────────────
@@ -512,105 +503,352 @@ def api_clientes():
     q = request.args.get("q", "").strip()
     if len(q) < 2:
         return jsonify([])
-    patron = f"%{q}%"
-    clientes = db.session.scalars(
-        select(Cliente).where(or_(Cliente.nombre.ilike(patron), Cliente.telefono.ilike(patron), Cliente.rnc_cedula.ilike(patron))).order_by(Cliente.nombre).limit(10)
-    ).all()
-    return jsonify([{"id": c.id, "nombre": c.nombre, "telefono": c.telefono, "rnc_cedula": c.rnc_cedula} for c in clientes])
+    return jsonify(buscar_clientes_json(q))
 
 
 # ── 5. Reimpresión de Recibos ────────────────────────────────────────
 
+def _consulta_recibos(q, cliente_q, fecha_ini, fecha_fin, usuario_q, tipo_cobro):
+    """``UNION ALL`` de recibos de facturas y cobros informales con columnas homogéneas.
+
+    El usuario y la forma de pago de un cobro informal son los de su primer
+    abono, resueltos con subconsultas correlacionadas.
+    """
+    partes = []
+    if tipo_cobro != "Informal":
+        stmt = (
+            select(
+                literal_column("'Factura'", String).label("tipo"),
+                Pago.id.label("clave"),
+                Pago.fecha.label("fecha"),
+                Cliente.nombre.label("cliente"),
+                Pago.monto_pagado.label("monto"),
+                Pago.usuario.label("usuario"),
+                cast(Pago.forma_pago, String).label("forma_pago"),
+                Pago.concepto_manual.label("concepto"),
+            )
+            .join(Cliente, Pago.cliente_id == Cliente.id)
+            .where(*rango_fechas(Pago.fecha, fecha_ini, fecha_fin))
+        )
+        stmt = _filtrar_pagos_usuario(stmt)
+        if q:
+            stmt = stmt.where(or_(func.cast(Pago.id, db.String).ilike(f"%{q}%"), Pago.concepto_manual.ilike(f"%{q}%")))
+        if cliente_q:
+            stmt = stmt.where(Cliente.nombre.ilike(f"%{cliente_q}%"))
+        if usuario_q and _es_admin():
+            stmt = stmt.where(Pago.usuario.ilike(f"%{usuario_q}%"))
+        partes.append(stmt)
+
+    if tipo_cobro != "Factura":
+        primer_abono = (
+            select(AbonoCobroInformal)
+            .where(AbonoCobroInformal.cobro_informal_id == CobroInformal.id)
+            .order_by(AbonoCobroInformal.fecha, AbonoCobroInformal.id)
+            .limit(1)
+        )
+        stmt = (
+            select(
+                literal_column("'Informal'", String).label("tipo"),
+                CobroInformal.id.label("clave"),
+                CobroInformal.creado_en.label("fecha"),
+                Cliente.nombre.label("cliente"),
+                (CobroInformal.monto_total - CobroInformal.saldo_pendiente).label("monto"),
+                func.coalesce(primer_abono.with_only_columns(AbonoCobroInformal.usuario).scalar_subquery(), "Sistema").label("usuario"),
+                cast(primer_abono.with_only_columns(AbonoCobroInformal.forma_pago).scalar_subquery(), String).label("forma_pago"),
+                CobroInformal.concepto.label("concepto"),
+            )
+            .join(Cliente, CobroInformal.cliente_id == Cliente.id)
+            .where(*rango_fechas(CobroInformal.creado_en, fecha_ini, fecha_fin))
+        )
+        if not _es_admin():
+            # Admin sees all; cajero sees only their own via abonos
+            stmt = stmt.where(CobroInformal.abonos.any(AbonoCobroInformal.usuario == _usuario_actual()))
+        if q:
+            stmt = stmt.where(or_(func.cast(CobroInformal.id, db.String).ilike(f"%{q}%"), CobroInformal.concepto.ilike(f"%{q}%")))
+        if cliente_q:
+            stmt = stmt.where(Cliente.nombre.ilike(f"%{cliente_q}%"))
+        partes.append(stmt)
+
+    return (union_all(*partes) if len(partes) > 1 else partes[0]).subquery("recibos")
+
+
+_FORMA_PAGO_POR_TIPO = {"Factura": FormaPagoCobro, "Informal": FormaPago}
+
+
+def _filtros_recibos():
+    return tuple(request.args.get(campo, "").strip() for campo in ("q", "cliente", "fecha_ini", "fecha_fin", "usuario", "tipo_cobro"))
+
+
 @reportes_bp.get("/recibos")
 @login_required
 def recibos():
-    q = request.args.get("q", "").strip()
-    cliente_q = request.args.get("cliente", "").strip()
-    fecha_ini = request.args.get("fecha_ini", "").strip()
-    fecha_fin = request.args.get("fecha_fin", "").strip()
-    usuario_q = request.args.get("usuario", "").strip()
-    tipo_cobro = request.args.get("tipo_cobro", "").strip()
+    q, cliente_q, fecha_ini, fecha_fin, usuario_q, tipo_cobro = filtros = _filtros_recibos()
+
+    union = _consulta_recibos(*filtros)
+    pagina = paginar_keyset(
+        select(union), [union.c.fecha, union.c.tipo, union.c.clave], request.args.get("cursor"), _POR_PAGINA, scalars=False,
+    )
+
+    # Números de factura de los recibos de esta página que no tienen concepto manual
+    sin_concepto = [r.clave for r in pagina if r.tipo == "Factura" and not r.concepto]
+    numeros = {}
+    if sin_concepto:
+        for pago_id, numero in db.session.execute(
+            select(DetallePago.pago_id, Factura.numero).join(Factura)
+            .where(DetallePago.pago_id.in_(sin_concepto)).order_by(DetallePago.id)
+        ):
+            numeros.setdefault(pago_id, []).append(numero)
 
     recibos = []
+    for r in pagina:
+        if r.tipo == "Factura":
+            concepto = r.concepto or ", ".join(numeros.get(r.clave, []))
+            numero, url_pdf = f"R-{r.clave:05d}", url_for("cobros.recibo_pdf", pago_id=r.clave)
+        else:
+            concepto = r.concepto
+            numero, url_pdf = f"CI-{r.clave:05d}", url_for("cobros_informales.recibo", cobro_id=r.clave)
+        recibos.append({
+            "id": r.clave if r.tipo == "Factura" else f"inf-{r.clave}",
+            "numero": numero,
+            "fecha": r.fecha,
+            "cliente": r.cliente,
+            "tipo_cobro": r.tipo,
+            "monto": r.monto,
+            "usuario": r.usuario,
+            "forma_pago": _FORMA_PAGO_POR_TIPO[r.tipo][r.forma_pago].value if r.forma_pago else "N/A",
+            "concepto": concepto,
+            "url_pdf": url_pdf,
+        })
+    recibos = PaginaKeyset(recibos, pagina.cursor, pagina.siguiente)
 
-    # Cobros por Facturas (model Pago)
-    stmt_pagos = select(Pago).join(Cliente).order_by(Pago.fecha.desc())
-    stmt_pagos = _filtrar_pagos_usuario(stmt_pagos)
+    return render_template("reportes/recibos.html",
+        recibos=recibos, q=q, cliente_q=cliente_q, fecha_ini=fecha_ini, fecha_fin=fecha_fin,
+        usuario_q=usuario_q, tipo_cobro=tipo_cobro, es_admin=_es_admin(),
+    )
 
-    if q:
-        stmt_pagos = stmt_pagos.where(or_(
-            func.cast(Pago.id, db.String).ilike(f"%{q}%"),
-            Pago.concepto_manual.ilike(f"%{q}%"),
+
+@reportes_bp.get("/recibos/lote.pdf")
+@login_required
+def recibos_lote():
+    """Todos los recibos seleccionados (``sel``) o que cumplen los filtros, en un solo PDF.
+
+    La selección usa los ids de la tabla (``123`` o ``inf-45``) y pasa por la
+    misma consulta que el listado, así un cajero solo imprime sus recibos.
+    """
+    from app.utils.pdf import lote_pdf
+    try:
+        union = _consulta_recibos(*_filtros_recibos())
+    except ValueError:
+        flash("Fecha inválida; use el formato AAAA-MM-DD.", "warning")
+        return redirect(url_for("reportes.recibos"))
+    stmt = select(union.c.tipo, union.c.clave).order_by(union.c.fecha, union.c.tipo, union.c.clave)
+    seleccion = request.args.getlist("sel")
+    if seleccion:
+        pagos = [int(s) for s in seleccion if s.isdigit()]
+        informales = [int(s[4:]) for s in seleccion if s.startswith("inf-") and s[4:].isdigit()]
+        stmt = stmt.where(or_(
+            and_(union.c.tipo == "Factura", union.c.clave.in_(pagos)),
+            and_(union.c.tipo == "Informal", union.c.clave.in_(informales)),
         ))
-    if cliente_q:
-        stmt_pagos = stmt_pagos.where(Cliente.nombre.ilike(f"%{cliente_q}%"))
-    if fecha_ini:
-        stmt_pagos = stmt_pagos.where(func.date(Pago.fecha) >= date.fromisoformat(fecha_ini))
-    if fecha_fin:
-        stmt_pagos = stmt_pagos.where(func.date(Pago.fecha) <= date.fromisoformat(fecha_fin))
-    if usuario_q and _es_admin():
-        stmt_pagos = stmt_pagos.where(Pago.usuario.ilike(f"%{usuario_q}%"))
+    maximo = current_app.config["LOTE_IMPRESION_MAX"]
+    claves = db.session.execute(stmt.limit(maximo + 1)).all()
+    if not claves or len(claves) > maximo:
+        flash("No hay recibos para imprimir." if not claves else f"El lote supera {maximo} recibos; acote el rango de fechas.", "warning")
+        return redirect(url_for("reportes.recibos", **request.args))
+    archivo = lote_pdf(_documentos_recibos(claves), _empresa())
+    return send_file(archivo, as_attachment=True, download_name="recibos.pdf", mimetype="application/pdf")
+
+
+def _documentos_recibos(claves):
+    """Pares ``(dibujar, documento)`` en el orden de ``claves``, cargados por bloques."""
+    from app.utils.pdf import dibujar_recibo, dibujar_recibo_informal
+    for inicio in range(0, len(claves), _LOTE_EXPORTACION):
+        bloque = claves[inicio:inicio + _LOTE_EXPORTACION]
+        pagos = {p.id: p for p in db.session.scalars(
+            select(Pago).where(Pago.id.in_([c for t, c in bloque if t == "Factura"]))
+            .options(joinedload(Pago.cliente), selectinload(Pago.detalles).joinedload(DetallePago.factura))
+        )}
+        informales = {c.id: c for c in db.session.scalars(
+            select(CobroInformal).where(CobroInformal.id.in_([c for t, c in bloque if t == "Informal"]))
+            .options(joinedload(CobroInformal.cliente), selectinload(CobroInformal.abonos))
+        )}
+        for tipo, clave in bloque:
+            yield (dibujar_recibo, pagos[clave]) if tipo == "Factura" else (dibujar_recibo_informal, informales[clave])
+
+
+# ── 6. Antigüedad de Saldos ──────────────────────────────────────────
+
+_TRAMOS_ANTIGUEDAD = [("d0_30", "0–30 días"), ("d31_60", "31–60 días"), ("d61_90", "61–90 días"), ("d90", "Más de 90 días")]
+
+
+def _antiguedad(q):
+    """Saldo abierto por cliente repartido en tramos de antigüedad, en una sola consulta.
+
+    Los tramos son ``SUM(saldo) FILTER`` contra fechas de corte calculadas en
+    Python, así la consulta recorre solo el índice parcial de facturas
+    pendientes; ``SUM(SUM(saldo)) OVER ()`` trae el total de la cartera para
+    el porcentaje de cada cliente.
+    """
+    hoy = hoy_negocio()
+    c30, c60, c90 = (hoy - timedelta(days=d) for d in (30, 60, 90))
+    condiciones = [
+        Factura.fecha >= c30,
+        and_(Factura.fecha < c30, Factura.fecha >= c60),
+        and_(Factura.fecha < c60, Factura.fecha >= c90),
+        Factura.fecha < c90,
+    ]
+    total = func.sum(Factura.saldo)
+    stmt = (
+        select(
+            Cliente.id, Cliente.nombre, Cliente.telefono,
+            *(func.coalesce(func.sum(Factura.saldo).filter(c), 0).label(n) for c, (n, _) in zip(condiciones, _TRAMOS_ANTIGUEDAD)),
+            total.label("total"),
+            func.sum(total).over().label("cartera"),
+            func.min(Factura.fecha).label("fecha_mas_antigua"),
+        )
+        .join(Cliente, Cliente.id == Factura.cliente_id)
+        # En línea y no como parámetro, para que coincida con el predicado del índice parcial
+        .where(Factura.estado != literal(EstadoFactura.PAGADA, Factura.estado.type, literal_execute=True))
+        .group_by(Cliente.id, Cliente.nombre, Cliente.telefono)
+        .order_by(total.desc(), Cliente.nombre)
+    )
+    if q:
+        stmt = stmt.where(condicion_clientes(q))
+    limitar_consultas(db.session)
+    filas = db.session.execute(stmt).all()
+    totales = {n: sum((Decimal(f._mapping[n]) for f in filas), Decimal("0")) for n, _ in _TRAMOS_ANTIGUEDAD + [("total", "")]}
+    return filas, totales, hoy
 
-    if tipo_cobro != "Informal":
-        for p in db.session.scalars(stmt_pagos).all():
-            concepto = p.concepto_manual or ", ".join(d.factura.numero for d in p.detalles if d.factura)
-            recibos.append({
-                "id": p.id,
-                "numero": f"R-{p.id:05d}",
-                "fecha": p.fecha,
-                "cliente": p.cliente.nombre,
-                "tipo_cobro": "Factura",
-                "monto": p.monto_pagado,
-                "usuario": p.usuario,
-                "forma_pago": p.forma_pago.value,
-                "concepto": concepto,
-                "url_pdf": url_for("cobros.recibo_pdf", pago_id=p.id),
-            })
-
-    # Cobros Informales (model CobroInformal)
-    stmt_inf = select(CobroInformal).join(Cliente).order_by(CobroInformal.creado_en.desc())
-    if not _es_admin():
-        # Admin sees all; cajero sees only their own via abonos
-        stmt_inf = stmt_inf.join(AbonoCobroInformal).where(AbonoCobroInformal.usuario == _usuario_actual())
 
-    if q:
-        stmt_inf = stmt_inf.where(or_(
-            func.cast(CobroInformal.id, db.String).ilike(f"%{q}%"),
-            CobroInformal.concepto.ilike(f"%{q}%"),
-        ))
-    if cliente_q:
-        stmt_inf = stmt_inf.where(Cliente.nombre.ilike(f"%{cliente_q}%"))
-    if fecha_ini:
-        stmt_inf = stmt_inf.where(func.date(CobroInformal.creado_en) >= date.fromisoformat(fecha_ini))
-    if fecha_fin:
-        stmt_inf = stmt_inf.where(func.date(CobroInformal.creado_en) <= date.fromisoformat(fecha_fin))
+@reportes_bp.get("/antiguedad")
+@login_required
+def antiguedad():
+    q = request.args.get("q", "").strip()
+    filas, totales, hoy = _antiguedad(q)
+    return render_template("reportes/antiguedad.html", filas=filas, totales=totales, tramos=_TRAMOS_ANTIGUEDAD, hoy=hoy, q=q)
 
-    if tipo_cobro != "Factura":
-        seen_inf = set()
-        for ci in db.session.scalars(stmt_inf).all():
-            if ci.id in seen_inf:
-                continue
-            seen_inf.add(ci.id)
-            monto_pagado = ci.monto_total - ci.saldo_pendiente
-            primer_abono = ci.abonos[0] if ci.abonos else None
-            usuario = primer_abono.usuario if primer_abono else "Sistema"
-            forma_pago = primer_abono.forma_pago.value if primer_abono else "N/A"
-            recibos.append({
-                "id": f"inf-{ci.id}",
-                "numero": f"CI-{ci.id:05d}",
-                "fecha": ci.creado_en,
-                "cliente": ci.cliente.nombre,
-                "tipo_cobro": "Informal",
-                "monto": monto_pagado,
-                "usuario": usuario,
-                "forma_pago": forma_pago,
-                "concepto": ci.concepto,
-                "url_pdf": url_for("cobros_informales.recibo", cobro_id=ci.id),
-            })
-
-    recibos.sort(key=lambda r: r["fecha"], reverse=True)
 
-    return render_template("reportes/recibos.html",
-        recibos=recibos, q=q, cliente_q=cliente_q, fecha_ini=fecha_ini, fecha_fin=fecha_fin,
-        usuario_q=usuario_q, tipo_cobro=tipo_cobro, es_admin=_es_admin(),
+@reportes_bp.get("/antiguedad/pdf")
+@login_required
+def antiguedad_pdf():
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.pdfgen import canvas as pdf_canvas
+    q = request.args.get("q", "").strip()
+    filas, totales, hoy = _antiguedad(q)
+    empresa = _empresa()
+    buffer = io.BytesIO()
+    pdf = pdf_canvas.Canvas(buffer, pagesize=landscape(A4), pageCompression=1)
+    ancho, alto = landscape(A4)
+    y = alto - 30
+
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawCentredString(ancho / 2, y, f"{empresa['nombre']} — Antigüedad de Saldos")
+    y -= 16
+    pdf.setFont("Helvetica", 9)
+    pdf.drawCentredString(ancho / 2, y, f"Al {hoy.strftime('%d/%m/%Y')} · Generado por {_usuario_actual()} · {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    y -= 24
+
+    headers = ["Cliente", "Teléfono"] + [etiqueta for _, etiqueta in _TRAMOS_ANTIGUEDAD] + ["Total", "% cartera"]
+    col_x = [30, 230, 390, 470, 550, 630, 710, 790]
+    pdf.setFont("Helvetica-Bold", 8)
+    pdf.drawString(col_x[0], y, headers[0])
+    pdf.drawString(col_x[1], y, headers[1])
+    for i, h in enumerate(headers[2:], start=2):
+        pdf.drawRightString(col_x[i], y, h)
+    y -= 12
+    pdf.line(30, y, ancho - 30, y)
+    y -= 12
+
+    pdf.setFont("Helvetica", 8)
+    for f in filas:
+        if y < 40:
+            pdf.showPage()
+            pdf.setFont("Helvetica", 8)
+            y = alto - 30
+        pdf.drawString(col_x[0], y, f.nombre[:38])
+        pdf.drawString(col_x[1], y, (f.telefono or "")[:20])
+        for i, (n, _) in enumerate(_TRAMOS_ANTIGUEDAD, start=2):
+            pdf.drawRightString(col_x[i], y, f"{f._mapping[n]:,.2f}")
+        pdf.drawRightString(col_x[6], y, f"{f.total:,.2f}")
+        pdf.drawRightString(col_x[7], y, f"{f.total * 100 / f.cartera:.1f}%" if f.cartera else "—")
+        y -= 12
+
+    y -= 6
+    pdf.line(30, y, ancho - 30, y)
+    y -= 14
+    pdf.setFont("Helvetica-Bold", 9)
+    pdf.drawString(col_x[0], y, f"Totales ({len(filas)} clientes)")
+    for i, (n, _) in enumerate(_TRAMOS_ANTIGUEDAD, start=2):
+        pdf.drawRightString(col_x[i], y, f"{totales[n]:,.2f}")
+    pdf.drawRightString(col_x[6], y, f"{totales['total']:,.2f}")
+
+    pdf.save()
+    buffer.seek(0)
+    return send_file(buffer, as_attachment=True, download_name=f"antiguedad_{hoy.isoformat()}.pdf", mimetype="application/pdf")
+
+
+@reportes_bp.get("/antiguedad/csv")
+@login_required
+def antiguedad_csv():
+    q = request.args.get("q", "").strip()
+    filas, _, hoy = _antiguedad(q)
+    salida = io.StringIO()
+    salida.write("\ufeff")
+    writer = csv.writer(salida)
+    writer.writerow(["Cliente", "Teléfono"] + [etiqueta for _, etiqueta in _TRAMOS_ANTIGUEDAD] + ["Total", "Factura más antigua"])
+    for f in filas:
+        writer.writerow([f.nombre, f.telefono] + [f._mapping[n] for n, _ in _TRAMOS_ANTIGUEDAD] + [f.total, f.fecha_mas_antigua.strftime("%d/%m/%Y")])
+    return Response(
+        salida.getvalue(),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename=antiguedad_{hoy.isoformat()}.csv"},
     )
+
+
+# ── 7. Reportes en segundo plano ─────────────────────────────────────
+
+def _en_segundo_plano(funcion, parametros, nombre):
+    """Genera el PDF en el pool de reportes; si no termina a tiempo, muestra la página de espera."""
+    trabajo_id, estado = trabajos.encolar(funcion, parametros, nombre, _usuario_actual())
+    if estado["estado"] == trabajos.LISTO:
+        return _descargar_trabajo(trabajo_id, estado)
+    return redirect(url_for("reportes.trabajo", trabajo_id=trabajo_id))
+
+
+def _trabajo(trabajo_id):
+    estado = trabajos.leer_estado(trabajos.directorio(), trabajo_id)
+    if not estado or estado["usuario"] != _usuario_actual():
+        abort(404)
+    return estado
+
+
+def _descargar_trabajo(trabajo_id, estado):
+    ruta = trabajos.ruta_pdf(trabajos.directorio(), trabajo_id)
+    return send_file(ruta, as_attachment=True, download_name=estado["nombre"], mimetype="application/pdf")
+
+
+@reportes_bp.get("/trabajos/<trabajo_id>")
+@login_required
+def trabajo(trabajo_id):
+    return render_template("reportes/trabajo.html", trabajo_id=trabajo_id, estado=_trabajo(trabajo_id))
+
+
+@reportes_bp.get("/trabajos/<trabajo_id>/estado")
+@login_required
+def trabajo_estado(trabajo_id):
+    estado = _trabajo(trabajo_id)
+    listo = estado["estado"] == trabajos.LISTO
+    return jsonify({
+        "ok": estado["estado"] != trabajos.ERROR,
+        "estado": estado["estado"],
+        "descarga": url_for("reportes.trabajo_pdf", trabajo_id=trabajo_id) if listo else None,
+    })
+
+
+@reportes_bp.get("/trabajos/<trabajo_id>/pdf")
+@login_required
+def trabajo_pdf(trabajo_id):
+    estado = _trabajo(trabajo_id)
+    if estado["estado"] != trabajos.LISTO:
+        abort(404)
+    return _descargar_trabajo(trabajo_id, estado)
@@ -0,0 +1,153 @@
+"""Generación de reportes PDF pesados fuera del worker web.
+
+``encolar`` registra el trabajo en disco y lo envía a un ``ProcessPoolExecutor``
+con su propia app y conexión a la base; la petición espera a lo sumo
+``REPORTES_ESPERA`` segundos antes de responder con la página de espera. El
+estado vive en ``<id>.json`` junto al ``<id>.pdf``, así cualquier worker de
+gunicorn puede contestar la consulta o la descarga. Los archivos se borran
+pasados ``REPORTES_EXPIRACION`` minutos.
+
+Cada worker de gunicorn tiene su propio pool de ``REPORTES_WORKERS`` procesos
+y cada proceso, un reporte a la vez, abre una sola conexión. El máximo de
+conexiones a la base queda en
+``workers × (DB_POOL_SIZE + DB_MAX_OVERFLOW + REPORTES_WORKERS)``.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as TiempoAgotado
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from types import SimpleNamespace
+
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+PENDIENTE, LISTO, ERROR = "pendiente", "listo", "error"
+
+_pool = None
+_app = None
+_lock = threading.Lock()
+
+
+def directorio():
+    ruta = current_app.config["REPORTES_DIR"] or os.path.join(current_app.instance_path, "reportes")
+    os.makedirs(ruta, exist_ok=True)
+    return ruta
+
+
+def _escribir(ruta, contenido):
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix=".tmp")
+    with os.fdopen(descriptor, "wb") as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, ruta)
+
+
+def _guardar_estado(carpeta, trabajo_id, **campos):
+    ruta = os.path.join(carpeta, f"{trabajo_id}.json")
+    estado = leer_estado(carpeta, trabajo_id) or {}
+    estado.update(campos)
+    _escribir(ruta, json.dumps(estado).encode())
+
+
+def leer_estado(carpeta, trabajo_id):
+    if not trabajo_id.isalnum():
+        return None
+    try:
+        with open(os.path.join(carpeta, f"{trabajo_id}.json"), encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return None
+
+
+def ruta_pdf(carpeta, trabajo_id):
+    return os.path.join(carpeta, f"{trabajo_id}.pdf")
+
+
+def _purgar(carpeta, segundos):
+    limite = time.time() - segundos
+    for entrada in os.scandir(carpeta):
+        try:
+            if entrada.stat().st_mtime < limite:
+                os.remove(entrada.path)
+        except FileNotFoundError:
+            continue
+
+
+def _generar(carpeta, trabajo_id, funcion, parametros):
+    """Corre ``funcion(**parametros)`` dentro de un app context y guarda el PDF."""
+    try:
+        _escribir(ruta_pdf(carpeta, trabajo_id), funcion(**parametros).getvalue())
+        _guardar_estado(carpeta, trabajo_id, estado=LISTO)
+    except Exception:
+        logger.exception("Falló el reporte %s", trabajo_id)
+        _guardar_estado(carpeta, trabajo_id, estado=ERROR)
+
+
+def _iniciar_proceso(config):
+    global _app
+    from app import create_app
+    _app = create_app(SimpleNamespace(**config))
+
+
+def _ejecutar(carpeta, trabajo_id, funcion, parametros):
+    # Al cerrar el app context Flask-SQLAlchemy devuelve la conexión del hijo;
+    # en línea (``REPORTES_WORKERS = 0``) la sesión es la de la petición y no se toca.
+    with _app.app_context():
+        _generar(carpeta, trabajo_id, funcion, parametros)
+
+
+def _config_hijo():
+    """Configuración del proceso hijo: la de la app, con un pool de una sola conexión."""
+    config = {k: v for k, v in current_app.config.items() if k.isupper()}
+    opciones = config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}
+    if "pool_size" in opciones:
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {**opciones, "pool_size": 1, "max_overflow": 0}
+    return config
+
+
+def _executor():
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=current_app.config["REPORTES_WORKERS"], mp_context=get_context("spawn"),
+                initializer=_iniciar_proceso, initargs=(_config_hijo(),),
+            )
+        return _pool
+
+
+def encolar(funcion, parametros, nombre, usuario):
+    """Registra y lanza el trabajo; devuelve ``(trabajo_id, estado)``.
+
+    ``funcion`` debe ser una función de módulo (se importa por nombre en el
+    proceso hijo) y ``parametros`` solo datos simples: ids, filtros y fechas.
+    """
+    carpeta = directorio()
+    _purgar(carpeta, current_app.config["REPORTES_EXPIRACION"] * 60)
+    trabajo_id = uuid.uuid4().hex
+    _guardar_estado(carpeta, trabajo_id, estado=PENDIENTE, nombre=nombre, usuario=usuario, creado=time.time())
+
+    if not current_app.config["REPORTES_WORKERS"]:
+        _generar(carpeta, trabajo_id, funcion, parametros)
+        return trabajo_id, leer_estado(carpeta, trabajo_id)
+
+    global _pool
+    try:
+        futuro = _executor().submit(_ejecutar, carpeta, trabajo_id, funcion, parametros)
+    except BrokenProcessPool:
+        _pool = None
+        futuro = _executor().submit(_ejecutar, carpeta, trabajo_id, funcion, parametros)
+    futuro.add_done_callback(lambda f: f.exception() and _guardar_estado(carpeta, trabajo_id, estado=ERROR))
+    try:
+        futuro.result(timeout=current_app.config["REPORTES_ESPERA"])
+    except TiempoAgotado:
+        pass
+    except Exception:
+        logger.exception("El proceso de reportes terminó con error")
+    return trabajo_id, leer_estado(carpeta, trabajo_id)
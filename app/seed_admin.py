@@ -10,13 +10,10 @@ from app.extensions import db
 from app.models.usuario import Usuario
 
 
-@click.command("seed-admin")
-@with_appcontext
-def seed_admin():
-    """Crea un usuario admin si no existe ninguno."""
+def asegurar_admin():
+    """Crea el usuario ``admin`` si no existe; devuelve ``True`` si lo creó."""
     if db.session.scalar(db.select(Usuario).where(Usuario.username == "admin")):
-        click.echo("El usuario 'admin' ya existe.")
-        return
+        return False
 
     admin = Usuario(
         nombre_completo="Administrador",
@@ -28,4 +25,14 @@ def seed_admin():
     admin.set_password("admin123")
     db.session.add(admin)
     db.session.commit()
-    click.echo("Usuario admin creado: admin / admin123")
+    return True
+
+
+@click.command("seed-admin")
+@with_appcontext
+def seed_admin():
+    """Crea un usuario admin si no existe ninguno."""
+    if asegurar_admin():
+        click.echo("Usuario admin creado: admin / admin123")
+    else:
+        click.echo("El usuario 'admin' ya existe.")
@@ -1,4 +1,4 @@
-from flask import request
+from flask import has_request_context, request
 from flask_login import current_user
 
 from app.extensions import db
@@ -10,7 +10,10 @@ def registrar_accion(accion: str, modulo: str, descripcion: str = "") -> None:
 
     *No* ejecuta commit; el caller debe encargarse.
     """
-    uid = current_user.id if current_user.is_authenticated else None
-    ip = request.remote_addr if request else None
+    if has_request_context():
+        uid = current_user.id if current_user.is_authenticated else None
+        ip = request.remote_addr
+    else:
+        uid, ip = None, None
     entry = Auditoria(usuario_id=uid, accion=accion, modulo=modulo, descripcion=descripcion, ip=ip)
     db.session.add(entry)
@@ -0,0 +1,123 @@
+"""Búsqueda de clientes por nombre, teléfono o RNC/cédula.
+
+En PostgreSQL se apoya en índices GIN ``pg_trgm`` sobre ``f_unaccent(nombre)``,
+``telefono`` y ``rnc_cedula`` (ver la migración ``b7e41c09d2a3``), de modo que
+"Hector" encuentra "Héctor" y los ``ILIKE '%q%'`` no recorren toda la tabla.
+Otros motores (SQLite en desarrollo) usan un índice en memoria equivalente.
+"""
+import threading
+import unicodedata
+
+from flask import current_app
+from sqlalchemy import func, or_, select
+
+from app.extensions import db
+from app.models import Cliente
+from app.utils.cache import CacheLRU
+
+
+def normalizar(texto):
+    """Minúsculas y sin acentos, igual que ``lower(f_unaccent(...))`` en la base."""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+
+def _es_postgres():
+    return db.session.get_bind().dialect.name == "postgresql"
+
+
+class _IndiceMemoria:
+    """Copia normalizada de (id, nombre, teléfono, RNC) que se reconstruye tras cada invalidación."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filas = None
+
+    def invalidar(self):
+        with self._lock:
+            self._filas = None
+
+    def _cargar(self):
+        with self._lock:
+            if self._filas is None:
+                self._filas = [
+                    (id_, normalizar(nombre), normalizar(telefono), normalizar(rnc))
+                    for id_, nombre, telefono, rnc in db.session.execute(
+                        select(Cliente.id, Cliente.nombre, Cliente.telefono, Cliente.rnc_cedula)
+                    )
+                ]
+            return self._filas
+
+    def buscar(self, q):
+        """Ids coincidentes ordenados por relevancia: prefijo del nombre, palabra, subcadena, otros campos."""
+        q = normalizar(q)
+        encontrados = []
+        for id_, nombre, telefono, rnc in self._cargar():
+            if nombre.startswith(q):
+                rango = 0
+            elif f" {q}" in nombre:
+                rango = 1
+            elif q in nombre:
+                rango = 2
+            elif q in telefono or q in rnc:
+                rango = 3
+            else:
+                continue
+            encontrados.append((rango, nombre, id_))
+        encontrados.sort()
+        return [id_ for _, _, id_ in encontrados]
+
+
+_indice = _IndiceMemoria()
+_cache = CacheLRU()
+
+
+def condicion_clientes(q):
+    """Expresión booleana que filtra ``Cliente`` por el texto ``q``."""
+    if _es_postgres():
+        patron = f"%{q}%"
+        return or_(
+            func.f_unaccent(Cliente.nombre).ilike(func.f_unaccent(patron)),
+            Cliente.telefono.ilike(patron),
+            Cliente.rnc_cedula.ilike(patron),
+        )
+    return Cliente.id.in_(_indice.buscar(q))
+
+
+def buscar_clientes(q, limite=10):
+    """Clientes para autocompletado, ordenados por relevancia."""
+    if _es_postgres():
+        stmt = (
+            select(Cliente).where(condicion_clientes(q))
+            .order_by(func.similarity(func.f_unaccent(Cliente.nombre), func.f_unaccent(q)).desc(), Cliente.nombre)
+            .limit(limite)
+        )
+        return db.session.scalars(stmt).all()
+    ids = _indice.buscar(q)[:limite]
+    clientes = {c.id: c for c in db.session.scalars(select(Cliente).where(Cliente.id.in_(ids)))}
+    return [clientes[id_] for id_ in ids if id_ in clientes]
+
+
+def buscar_clientes_json(q, limite=10):
+    """Resultado serializable de ``buscar_clientes`` servido desde la caché LRU cuando es posible."""
+    clave = (normalizar(q.strip()), limite)
+    resultado = _cache.obtener(clave, current_app.config["BUSQUEDA_CACHE_TTL"])
+    if resultado is None:
+        generacion = _cache.generacion
+        resultado = [
+            {"id": c.id, "nombre": c.nombre, "telefono": c.telefono, "rnc_cedula": c.rnc_cedula}
+            for c in buscar_clientes(q, limite)
+        ]
+        _cache.guardar(clave, resultado, current_app.config["BUSQUEDA_CACHE_SIZE"], generacion)
+    return resultado
+
+
+def estadisticas_busqueda():
+    """Contadores de la caché de autocompletado de este proceso."""
+    return _cache.estadisticas()
+
+
+def invalidar_busqueda():
+    """Descarta la caché y los índices en memoria; llamar tras crear, editar o eliminar clientes."""
+    _cache.invalidar()
+    _indice.invalidar()
@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """LRU en memoria con TTL, contadores de aciertos y guarda de generación.
+
+    Cada worker de gunicorn tiene la suya: las escrituras la invalidan en el
+    worker que las atiende y el TTL acota lo que los demás pueden servir viejo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = OrderedDict()
+        self.generacion = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, ttl):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada and time.monotonic() - entrada[0] < ttl:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor, capacidad, generacion):
+        """Descarta ``valor`` si hubo una invalidación mientras se calculaba."""
+        with self._lock:
+            if generacion != self.generacion:
+                return
+            self._datos[clave] = (time.monotonic(), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > capacidad:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, *claves):
+        """Descarta ``claves``, o todo si no se indica ninguna."""
+        with self._lock:
+            self.generacion += 1
+            if not claves:
+                self._datos.clear()
+            for clave in claves:
+                self._datos.pop(clave, None)
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0,
+            }
@@ -0,0 +1,97 @@
+"""Caché en disco de PDF generados, direccionada por contenido.
+
+La clave es el SHA-256 de ``(tipo, documento_id, version, empresa)``.
+``version`` debe reunir todo dato mutable que el PDF imprime (p. ej. el
+balance del cliente en un recibo), de modo que un cambio produzca otra clave
+y nunca haga falta invalidar. Por lo mismo, los PDF en caché no imprimen la
+hora de generación. El mismo hash es el ETag: un ``If-None-Match`` que
+coincide se responde con 304 sin ReportLab ni disco, aunque el caller ya
+leyó de la base las filas con que arma ``version``. Al superar
+``PDF_CACHE_MAX_MB`` se borran los archivos usados hace más tiempo; cada
+acierto actualiza el mtime del archivo.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from flask import current_app, request, send_file
+
+# Súbase al cambiar el diseño de cualquier PDF para no servir copias viejas.
+FORMATO = 2
+
+_lock = threading.Lock()
+_ocupado = None
+
+
+def _directorio():
+    directorio = current_app.config["PDF_CACHE_DIR"] or os.path.join(current_app.instance_path, "pdf_cache")
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def clave_pdf(tipo, documento_id, version, empresa):
+    datos = json.dumps([FORMATO, tipo, documento_id, version, empresa], sort_keys=True, default=str)
+    return hashlib.sha256(datos.encode()).hexdigest()
+
+
+def _archivos(directorio):
+    for entrada in os.scandir(directorio):
+        if entrada.is_file() and entrada.name.endswith(".pdf"):
+            yield entrada
+
+
+def _podar(directorio, nuevo):
+    """Suma ``nuevo`` al tamaño ocupado y, si pasa el límite, borra por LRU hasta el 90 %."""
+    global _ocupado
+    limite = current_app.config["PDF_CACHE_MAX_MB"] * 1024 * 1024
+    with _lock:
+        if _ocupado is None:
+            _ocupado = sum(e.stat().st_size for e in _archivos(directorio))
+        else:
+            _ocupado += nuevo
+        if _ocupado <= limite:
+            return
+        # Se vuelve a medir: otros workers escriben en el mismo directorio.
+        entradas = sorted(((e.stat(), e.path) for e in _archivos(directorio)), key=lambda e: e[0].st_mtime)
+        _ocupado = sum(st.st_size for st, _ in entradas)
+        for st, ruta in entradas:
+            if _ocupado <= limite * 0.9:
+                break
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                continue
+            _ocupado -= st.st_size
+
+
+def enviar_pdf(tipo, documento_id, version, empresa, generar, nombre):
+    """Responde el PDF de ``generar()`` pasando por la caché; ``nombre`` es el de descarga."""
+    clave = clave_pdf(tipo, documento_id, version, empresa)
+    if clave in request.if_none_match:
+        return _respuesta_304(clave)
+
+    directorio = _directorio()
+    ruta = os.path.join(directorio, f"{clave}.pdf")
+    try:
+        os.utime(ruta)
+    except FileNotFoundError:
+        contenido = generar().getvalue()
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, ruta)
+        _podar(directorio, len(contenido))
+
+    respuesta = send_file(ruta, as_attachment=True, download_name=nombre, mimetype="application/pdf", etag=clave, conditional=True, max_age=0)
+    respuesta.cache_control.private = True
+    return respuesta
+
+
+def _respuesta_304(clave):
+    respuesta = current_app.response_class(status=304)
+    respuesta.set_etag(clave)
+    respuesta.cache_control.private = True
+    respuesta.cache_control.max_age = 0
+    return respuesta
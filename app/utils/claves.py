@@ -0,0 +1,119 @@
+"""Verificación de contraseñas fuera del hilo de la petición y límite de intentos.
+
+gunicorn corre con workers ``gthread`` (ver ``Procfile``). bcrypt libera el
+GIL, así que un ``ThreadPoolExecutor`` de ``BCRYPT_HILOS`` hilos acota cuánta
+CPU pueden ocupar los logins simultáneos (p. ej. en el cambio de turno). Si ya
+hay ``BCRYPT_EN_ESPERA`` verificaciones pendientes, las nuevas se rechazan en
+el acto en lugar de encolarse; con ``BCRYPT_HILOS + BCRYPT_EN_ESPERA`` menor
+que ``--threads`` siempre quedan hilos para el resto de las peticiones.
+
+Los fallos se cuentan en una ventana deslizante de ``LOGIN_VENTANA``
+segundos por usuario e IP: al llegar a ``LOGIN_MAX_INTENTOS`` ese usuario
+queda bloqueado desde esa IP sin llegar a bcrypt. La IP es la del cliente que
+reporta el proxy (``ProxyFix`` con ``PROXY_SALTOS`` saltos), así que las cajas
+de una sucursal no se bloquean entre sí por compartir la del balanceador.
+``LOGIN_MAX_INTENTOS_USUARIO``, mucho mayor, bloquea al usuario desde
+cualquier IP y frena un ataque repartido entre muchas. Los contadores son por
+worker.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from flask import current_app, request
+
+_pool = None
+_cupos = None
+_lock = threading.Lock()
+_fallos = {}
+
+
+class Ocupado(Exception):
+    """Demasiadas verificaciones pendientes."""
+
+
+def _executor():
+    global _pool, _cupos
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=current_app.config["BCRYPT_HILOS"], thread_name_prefix="bcrypt")
+            _cupos = threading.BoundedSemaphore(current_app.config["BCRYPT_HILOS"] + current_app.config["BCRYPT_EN_ESPERA"])
+    return _pool
+
+
+def _checkpw(raw, hashed):
+    try:
+        return bcrypt.checkpw(raw.encode(), hashed.encode())
+    except (ValueError, TypeError):
+        return False
+
+
+def verificar(usuario, raw):
+    """``check_password`` en el pool; rehace el hash si cambió ``BCRYPT_ROUNDS``.
+
+    El rehash queda en la sesión de la base: el caller hace commit.
+    """
+    if not usuario.password_hash:
+        return False
+    pool = _executor()
+    if not _cupos.acquire(blocking=False):
+        raise Ocupado
+    try:
+        correcta = pool.submit(_checkpw, raw, usuario.password_hash).result()
+        if correcta and usuario.necesita_rehash():
+            sal = bcrypt.gensalt(current_app.config["BCRYPT_ROUNDS"])
+            usuario.password_hash = pool.submit(bcrypt.hashpw, raw.encode(), sal).result().decode()
+    finally:
+        _cupos.release()
+    return correcta
+
+
+def _recientes(clave, ahora):
+    intentos = _fallos.get(clave)
+    if intentos is None:
+        return 0
+    while intentos and intentos[0] <= ahora - current_app.config["LOGIN_VENTANA"]:
+        intentos.popleft()
+    if not intentos:
+        del _fallos[clave]
+        return 0
+    return len(intentos)
+
+
+def _limites(usuario_id):
+    """Pares ``(clave, máximo)``: el usuario desde esta IP y, como respaldo, el usuario."""
+    return (
+        ((usuario_id, request.remote_addr), current_app.config["LOGIN_MAX_INTENTOS"]),
+        (usuario_id, current_app.config["LOGIN_MAX_INTENTOS_USUARIO"]),
+    )
+
+
+def bloqueado(usuario_id):
+    """Segundos que faltan para poder reintentar, o 0."""
+    ahora = time.monotonic()
+    espera = 0
+    with _lock:
+        for clave, maximo in _limites(usuario_id):
+            if _recientes(clave, ahora) >= maximo:
+                espera = max(espera, _fallos[clave][0] + current_app.config["LOGIN_VENTANA"] - ahora)
+    return int(espera) + 1 if espera else 0
+
+
+def registrar_fallo(usuario_id):
+    ahora = time.monotonic()
+    with _lock:
+        if len(_fallos) > 10_000:
+            for clave in list(_fallos):
+                _recientes(clave, ahora)
+        for clave, maximo in _limites(usuario_id):
+            _recientes(clave, ahora)
+            _fallos.setdefault(clave, deque(maxlen=maximo)).append(ahora)
+
+
+def limpiar_fallos(usuario_id):
+    """Tras un acceso correcto."""
+    with _lock:
+        for clave, _ in _limites(usuario_id):
+            _fallos.pop(clave, None)
@@ -0,0 +1,37 @@
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from flask import current_app
+
+
+def zona_negocio():
+    return ZoneInfo(current_app.config["BUSINESS_TZ"])
+
+
+def hoy_negocio():
+    """Fecha actual en la zona horaria del negocio (no la del servidor)."""
+    return datetime.now(zona_negocio()).date()
+
+
+def inicio_dia(fecha):
+    """Primer instante de ``fecha`` en la zona del negocio, expresado en UTC."""
+    return datetime.combine(fecha, time.min, tzinfo=zona_negocio()).astimezone(timezone.utc)
+
+
+def _como_fecha(valor):
+    return valor if isinstance(valor, date) else date.fromisoformat(valor)
+
+
+def rango_fechas(columna, fecha_ini=None, fecha_fin=None):
+    """Condiciones ``[fecha_ini 00:00, fecha_fin + 1 día 00:00)`` sobre una columna timestamp.
+
+    Compara la columna desnuda contra límites calculados en Python para que
+    PostgreSQL pueda usar su índice B-tree, en lugar de ``func.date(columna)``.
+    Acepta fechas o cadenas ISO; los valores vacíos se ignoran.
+    """
+    condiciones = []
+    if fecha_ini:
+        condiciones.append(columna >= inicio_dia(_como_fecha(fecha_ini)))
+    if fecha_fin:
+        condiciones.append(columna < inicio_dia(_como_fecha(fecha_fin) + timedelta(days=1)))
+    return condiciones
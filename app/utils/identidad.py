@@ -0,0 +1,82 @@
+"""Identidad del usuario autenticado guardada en la sesión firmada.
+
+``load_user`` reconstruye ``current_user`` desde ``session["identidad"]`` sin
+leer la fila completa de ``usuarios``. Solo consulta ``permisos_version`` e
+``is_active``, a lo sumo una vez cada ``IDENTIDAD_TTL`` segundos por usuario y
+worker, y recarga el usuario cuando la versión de la sesión quedó atrás.
+"""
+from flask import current_app, session
+from flask_login import UserMixin
+
+from app.extensions import db
+from app.models.usuario import MODULOS, Usuario
+from app.utils.cache import CacheLRU
+
+_CLAVE = "identidad"
+
+# usuario_id -> (permisos_version, is_active)
+_vigentes = CacheLRU()
+
+
+class Identidad(UserMixin):
+    """Lo que las vistas y plantillas leen de ``current_user``."""
+
+    def __init__(self, datos):
+        self.id = datos["id"]
+        self.username = datos["username"]
+        self.nombre_completo = datos["nombre_completo"]
+        self.is_admin = datos["is_admin"]
+        self.permisos_version = datos["version"]
+        self._modulos = frozenset(datos["modulos"])
+
+    def tiene_permiso(self, modulo: str) -> bool:
+        return modulo in self._modulos
+
+    def modulos_permitidos(self) -> list[str]:
+        return [m for m in MODULOS if m in self._modulos]
+
+
+def guardar_identidad(usuario):
+    session[_CLAVE] = {
+        "id": usuario.id,
+        "username": usuario.username,
+        "nombre_completo": usuario.nombre_completo,
+        "is_admin": usuario.is_admin,
+        "version": usuario.permisos_version or 0,
+        "modulos": sorted(usuario.permisos_efectivos()),
+    }
+    return Identidad(session[_CLAVE])
+
+
+def olvidar_identidad():
+    session.pop(_CLAVE, None)
+
+
+def invalidar_identidad(usuario_id):
+    """Para que este worker vea un cambio recién guardado sin esperar el TTL."""
+    _vigentes.invalidar(usuario_id)
+
+
+def _vigente(usuario_id):
+    estado = _vigentes.obtener(usuario_id, current_app.config["IDENTIDAD_TTL"])
+    if estado is None:
+        generacion = _vigentes.generacion
+        fila = db.session.execute(
+            db.select(Usuario.permisos_version, Usuario.is_active).where(Usuario.id == usuario_id)
+        ).first()
+        estado = (fila.permisos_version or 0, fila.is_active) if fila else (None, False)
+        _vigentes.guardar(usuario_id, estado, current_app.config["PERMISOS_CACHE_SIZE"], generacion)
+    return estado
+
+
+def cargar_identidad(usuario_id):
+    """``user_loader``: usuarios eliminados o desactivados quedan sin sesión."""
+    version, activo = _vigente(usuario_id)
+    if not activo:
+        olvidar_identidad()
+        return None
+    datos = session.get(_CLAVE)
+    if datos and datos.get("id") == usuario_id and datos.get("version") == version:
+        return Identidad(datos)
+    usuario = db.session.get(Usuario, usuario_id)
+    return guardar_identidad(usuario) if usuario else None
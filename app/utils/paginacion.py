@@ -0,0 +1,106 @@
+import base64
+import json
+from datetime import date, datetime
+
+from flask import request, url_for
+from sqlalchemy import tuple_
+
+from app.extensions import db
+
+
+def _codificar_valor(valor):
+    if isinstance(valor, datetime):
+        return {"t": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    return valor
+
+
+def _decodificar_valor(valor):
+    if isinstance(valor, dict):
+        if "t" in valor:
+            return datetime.fromisoformat(valor["t"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+    return valor
+
+
+def codificar_cursor(valores):
+    crudo = json.dumps([_codificar_valor(v) for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def _valor_valido(valor, columna):
+    """``True`` si ``valor`` es del tipo python de ``columna`` (un booleano no pasa por entero)."""
+    try:
+        tipo = columna.type.python_type
+    except NotImplementedError:
+        return True
+    if isinstance(valor, bool) and tipo is not bool:
+        return False
+    return isinstance(valor, tipo) and (tipo is not date or not isinstance(valor, datetime))
+
+
+def decodificar_cursor(token, columnas):
+    """Devuelve la tupla del cursor o ``None`` si el token falta o no corresponde a ``columnas``.
+
+    Se valida el tipo de cada valor para que un cursor manipulado vuelva a la
+    primera página en vez de llegar a la base de datos y terminar en un 500.
+    """
+    if not token:
+        return None
+    try:
+        crudo = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        valores = tuple(_decodificar_valor(v) for v in crudo) if isinstance(crudo, list) else ()
+    except (ValueError, TypeError):
+        return None
+    if len(valores) != len(columnas) or not all(map(_valor_valido, valores, columnas)):
+        return None
+    return valores
+
+
+class PaginaKeyset:
+    """Página obtenida por keyset; expone ``items`` como ``Pagination`` de Flask-SQLAlchemy."""
+
+    def __init__(self, items, cursor, siguiente):
+        self.items = items
+        self.cursor = cursor
+        self.siguiente = siguiente
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def paginar_keyset(stmt, columnas, cursor, per_page, descendente=True, scalars=True):
+    """Pagina ``stmt`` comparando la tupla ``columnas`` con el último registro visto.
+
+    ``stmt`` no debe traer ``order_by``: se ordena por ``columnas`` (la última
+    debe ser única, normalmente el id) para que el orden sea estable y cada
+    página cueste lo mismo que la primera, a diferencia de OFFSET.
+    """
+    valores = decodificar_cursor(cursor, columnas)
+    if valores is not None:
+        clave = tuple_(*columnas)
+        stmt = stmt.where(clave < tuple_(*valores) if descendente else clave > tuple_(*valores))
+    else:
+        cursor = None
+    stmt = stmt.order_by(*(c.desc() if descendente else c.asc() for c in columnas)).limit(per_page + 1)
+    resultado = db.session.execute(stmt)
+    filas = resultado.scalars().all() if scalars else resultado.all()
+    siguiente = None
+    if len(filas) > per_page:
+        filas = filas[:per_page]
+        ultimo = filas[-1]
+        siguiente = codificar_cursor([getattr(ultimo, c.key) for c in columnas])
+    return PaginaKeyset(filas, cursor, siguiente)
+
+
+def enlazar_siguiente(respuesta, pagina):
+    """Agrega ``Link: <...>; rel="next"`` a una respuesta JSON paginada por keyset."""
+    if pagina.siguiente:
+        args = dict(request.args.to_dict(), **request.view_args, cursor=pagina.siguiente)
+        respuesta.headers["Link"] = f'<{url_for(request.endpoint, **args)}>; rel="next"'
+    return respuesta
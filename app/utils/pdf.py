@@ -1,23 +1,118 @@
 import io
+import tempfile
+import zlib
+from datetime import date
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
 from reportlab.pdfgen import canvas
 
+RECIBO = (80 * mm, 180 * mm)
+RECIBO_INFORMAL = (80 * mm, 200 * mm)
 
-def recibo_pdf(pago, empresa):
-    """Genera un recibo profesional de dos copias en formato térmico."""
-    ancho, alto = 80 * mm, 180 * mm
+
+class Plantilla:
+    """Parte fija de un documento (encabezado, recuadros, etiquetas, firmas).
+
+    En un canvas de lote ``fijo(pdf, empresa)`` se graba una sola vez como
+    form XObject y cada página lo reutiliza con ``doForm``; solo los campos
+    variables se dibujan por documento. En un documento suelto se traza
+    directo: con dos copias el form cuesta más bytes de los que ahorra
+    (ver ``benchmarks/plantillas_pdf.py``).
+    """
+
+    def __init__(self, nombre, fijo):
+        self.nombre = nombre
+        self.fijo = fijo
+        self._nombres = {}
+
+    def _nombre_forma(self, empresa):
+        clave = tuple(sorted(empresa.items()))
+        if clave not in self._nombres:
+            self._nombres[clave] = f"{self.nombre}{zlib.crc32(repr(clave).encode()):08x}"
+        return self._nombres[clave]
+
+    def dibujar(self, pdf, empresa, dy=0):
+        """Pone la parte fija en la página actual, desplazada ``dy`` puntos en vertical."""
+        pdf.saveState()
+        pdf.translate(0, dy)
+        if not (isinstance(pdf, _CanvasLote) and pdf.usar_formas):
+            self.fijo(pdf, empresa)
+        else:
+            nombre = self._nombre_forma(empresa)
+            if not pdf.hasForm(nombre):
+                pdf.beginForm(nombre)
+                self.fijo(pdf, empresa)
+                pdf.endForm()
+            pdf.doForm(nombre)
+        pdf.restoreState()
+
+
+class _CanvasLote(canvas.Canvas):
+    """Canvas con muchos documentos, donde las plantillas se comparten como form XObject."""
+
+    def __init__(self, *args, usar_formas=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.usar_formas = usar_formas
+
+
+def _documento(dibujar, objeto, empresa, pagesize, **extra):
     buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=(ancho, alto), pageCompression=1)
+    pdf = canvas.Canvas(buffer, pagesize=pagesize, pageCompression=1)
+    dibujar(pdf, objeto, empresa, **extra)
+    pdf.save()
+    buffer.seek(0)
+    return buffer
 
-    def copia(etiqueta):
-        y, margen = alto - 10 * mm, 7 * mm
+
+def lote_pdf(documentos, empresa, usar_formas=True):
+    """Une varios documentos en un solo PDF dibujado sobre un único canvas.
+
+    ``documentos`` produce pares ``(dibujar, objeto)`` con las funciones
+    ``dibujar_*`` de este módulo; cada página fija su propio tamaño, así que
+    se pueden mezclar recibos térmicos y hojas A4. Las fuentes y las partes
+    fijas de cada ``Plantilla`` se escriben una sola vez (``usar_formas=False``
+    las traza en cada página, para comparar). El resultado va a un temporal
+    que pasa a disco si crece.
+    """
+    archivo = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+    pdf = _CanvasLote(archivo, pageCompression=1, usar_formas=usar_formas)
+    for dibujar, objeto in documentos:
+        dibujar(pdf, objeto, empresa)
+    pdf.save()
+    archivo.seek(0)
+    return archivo
+
+
+def _encabezado_termico(alto):
+    """Nombre, teléfono/RNC, dirección y separador de un recibo de 80 mm."""
+    def fijo(pdf, empresa):
+        ancho, y, margen = 80 * mm, alto - 10 * mm, 7 * mm
         pdf.setFont("Helvetica-Bold", 11)
         pdf.drawCentredString(ancho / 2, y, empresa["nombre"]); y -= 5 * mm
         pdf.setFont("Helvetica", 7)
         pdf.drawCentredString(ancho / 2, y, f"Tel. {empresa['telefono']} · RNC {empresa['rnc']}"); y -= 4 * mm
         pdf.drawCentredString(ancho / 2, y, empresa["direccion"][:55]); y -= 6 * mm
-        pdf.line(margen, y, ancho - margen, y); y -= 5 * mm
+        pdf.line(margen, y, ancho - margen, y)
+    return fijo
+
+
+_PLANTILLA_RECIBO = Plantilla("Recibo", _encabezado_termico(RECIBO[1]))
+_PLANTILLA_RECIBO_INFORMAL = Plantilla("ReciboInformal", _encabezado_termico(RECIBO_INFORMAL[1]))
+
+
+def recibo_pdf(pago, empresa):
+    """Genera un recibo profesional de dos copias en formato térmico."""
+    return _documento(dibujar_recibo, pago, empresa, RECIBO)
+
+
+def dibujar_recibo(pdf, pago, empresa):
+    """Agrega las dos copias del recibo de ``pago`` al canvas."""
+    ancho, alto = RECIBO
+
+    def copia(etiqueta):
+        pdf.setPageSize(RECIBO)
+        _PLANTILLA_RECIBO.dibujar(pdf, empresa)
+        y, margen = alto - 30 * mm, 7 * mm
         pdf.setFont("Helvetica-Bold", 9)
         pdf.drawCentredString(ancho / 2, y, f"RECIBO DE COBRO · {etiqueta}"); y -= 6 * mm
         pdf.setFont("Helvetica", 8)
@@ -74,52 +169,201 @@ def recibo_pdf(pago, empresa):
 
     copia("ORIGINAL")
     copia("COPIA")
-    pdf.save()
-    buffer.seek(0)
-    return buffer
+
+
+def recibo_informal_pdf(cobro, empresa):
+    """Recibo de dos copias de un cobro informal con el detalle de sus abonos."""
+    return _documento(dibujar_recibo_informal, cobro, empresa, RECIBO_INFORMAL)
+
+
+def dibujar_recibo_informal(pdf, cobro, empresa):
+    """Agrega las dos copias del recibo del cobro informal al canvas."""
+    ancho, alto = RECIBO_INFORMAL
+
+    def copia(etiqueta):
+        pdf.setPageSize(RECIBO_INFORMAL)
+        _PLANTILLA_RECIBO_INFORMAL.dibujar(pdf, empresa)
+        y, margen = alto - 30 * mm, 7 * mm
+        pdf.setFont("Helvetica-Bold", 9)
+        pdf.drawCentredString(ancho / 2, y, f"COBRO INFORMAL · {etiqueta}"); y -= 6 * mm
+        pdf.setFont("Helvetica", 8)
+        pdf.drawString(margen, y, f"No. {cobro.id:06d}"); pdf.drawRightString(ancho - margen, y, cobro.creado_en.strftime("%d/%m/%Y")); y -= 5 * mm
+        pdf.drawString(margen, y, f"Cliente: {cobro.cliente.nombre[:35]}"); y -= 5 * mm
+        pdf.drawString(margen, y, f"Concepto: {cobro.concepto[:38]}"); y -= 6 * mm
+        pdf.line(margen, y, ancho - margen, y); y -= 5 * mm
+
+        pdf.setFont("Helvetica-Bold", 7)
+        pdf.drawString(margen, y, "FORMA DE PAGO"); pdf.drawRightString(ancho - margen, y, "MONTO"); y -= 4 * mm
+        pdf.setFont("Helvetica", 8)
+        for abono in cobro.abonos:
+            fp = abono.forma_pago.value
+            if abono.banco:
+                fp += f" ({abono.banco})"
+            if abono.numero:
+                fp += f" #{abono.numero}"
+            pdf.drawString(margen, y, fp[:38])
+            pdf.drawRightString(ancho - margen, y, f"RD$ {abono.monto:,.2f}")
+            y -= 4.5 * mm
+
+        pdf.line(margen, y, ancho - margen, y); y -= 6 * mm
+        pdf.setFont("Helvetica-Bold", 9)
+        pdf.drawString(margen, y, "TOTAL ADEUDADO")
+        pdf.drawRightString(ancho - margen, y, f"RD$ {cobro.monto_total:,.2f}"); y -= 5 * mm
+        pdf.drawString(margen, y, "TOTAL PAGADO")
+        pdf.drawRightString(ancho - margen, y, f"RD$ {cobro.monto_pagado:,.2f}"); y -= 5 * mm
+        pdf.drawString(margen, y, "SALDO PENDIENTE")
+        pdf.drawRightString(ancho - margen, y, f"RD$ {cobro.saldo_pendiente:,.2f}"); y -= 8 * mm
+
+        pdf.setFont("Helvetica", 7)
+        pdf.drawString(margen, y, f"Estado: {cobro.estado.value}"); y -= 4 * mm
+        pdf.drawString(margen, y, f"Cobrado por: {cobro.abonos[0].usuario if cobro.abonos else 'N/A'}"); y -= 8 * mm
+
+        pdf.drawCentredString(ancho / 2, y, "Gracias por su pago")
+        pdf.showPage()
+
+    copia("ORIGINAL")
+    copia("COPIA")
+
+
+def _fijo_conduce(pdf, empresa):
+    """Recuadro superior del conduce; la copia es el mismo form desplazado."""
+    ancho, alto = A4
+    superior = alto - 25
+    x, y, w, h = 42, superior - 280, ancho - 84, 250
+    pdf.setLineWidth(1)
+    pdf.roundRect(x, y, w, h, 8)
+    cursor = superior - 25
+    pdf.setFont("Helvetica-Bold", 13)
+    pdf.drawString(x + 14, cursor, empresa["nombre"]); cursor -= 17
+    pdf.setFont("Helvetica", 9)
+    pdf.drawString(x + 14, cursor, f"Tel. {empresa['telefono']} · RNC {empresa['rnc']}"); cursor -= 14
+    pdf.drawString(x + 14, cursor, empresa["direccion"]); cursor -= 18
+    pdf.line(x, cursor, x + w, cursor); cursor -= 18
+    pdf.setFont("Helvetica-Bold", 9)
+    pdf.drawString(x + 14, cursor, "CLIENTE:"); pdf.drawString(x + w - 170, cursor, "FECHA:"); cursor -= 18
+    pdf.drawString(x + 14, cursor, "DIRECCIÓN:"); pdf.drawString(x + w - 170, cursor, "FACTURA:"); cursor -= 22
+    pdf.drawString(x + 14, cursor, "DESCRIPCIÓN DEL CONTENIDO")
+    firma = y + 25
+    pdf.line(x + 50, firma, x + 210, firma); pdf.line(x + w - 210, firma, x + w - 50, firma)
+    pdf.setFont("Helvetica", 8)
+    pdf.drawCentredString(x + 130, firma - 12, "RECIBIDO POR")
+    pdf.drawCentredString(x + w - 130, firma - 12, "ENTREGADO POR")
+
+
+_PLANTILLA_CONDUCE = Plantilla("Conduce", _fijo_conduce)
 
 
 def conduce_pdf(conduce, empresa):
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
+    return _documento(dibujar_conduce, conduce, empresa, A4)
+
+
+def dibujar_conduce(pdf, conduce, empresa):
+    """Agrega una hoja A4 con original y copia del conduce al canvas."""
     ancho, alto = A4
+    pdf.setPageSize(A4)
+
+    descripcion = _wrap(conduce.descripcion, 92)[:4]
+    observaciones = _wrap(conduce.observaciones or "", 105)[:2]
 
     def cuadro(superior, etiqueta):
-        x, y, w, h = 42, superior - 280, ancho - 84, 250
-        pdf.setLineWidth(1)
-        pdf.roundRect(x, y, w, h, 8)
+        _PLANTILLA_CONDUCE.dibujar(pdf, empresa, superior - (alto - 25))
+        x, w = 42, ancho - 84
         cursor = superior - 25
         pdf.setFont("Helvetica-Bold", 13)
-        pdf.drawString(x + 14, cursor, empresa["nombre"])
-        pdf.drawRightString(x + w - 14, cursor, f"CONDUCE DE ENVÍO · {etiqueta}"); cursor -= 17
+        pdf.drawRightString(x + w - 14, cursor, f"CONDUCE DE ENVÍO · {etiqueta}"); cursor -= 67
         pdf.setFont("Helvetica", 9)
-        pdf.drawString(x + 14, cursor, f"Tel. {empresa['telefono']} · RNC {empresa['rnc']}"); cursor -= 14
-        pdf.drawString(x + 14, cursor, empresa["direccion"]); cursor -= 18
-        pdf.line(x, cursor, x + w, cursor); cursor -= 18
-        pdf.setFont("Helvetica-Bold", 9)
-        pdf.drawString(x + 14, cursor, "CLIENTE:"); pdf.setFont("Helvetica", 9); pdf.drawString(x + 70, cursor, conduce.cliente)
-        pdf.setFont("Helvetica-Bold", 9); pdf.drawString(x + w - 170, cursor, "FECHA:"); pdf.setFont("Helvetica", 9); pdf.drawRightString(x + w - 14, cursor, conduce.fecha.strftime("%d/%m/%Y")); cursor -= 18
-        pdf.setFont("Helvetica-Bold", 9); pdf.drawString(x + 14, cursor, "DIRECCIÓN:"); pdf.setFont("Helvetica", 9); pdf.drawString(x + 78, cursor, conduce.direccion[:55])
-        pdf.setFont("Helvetica-Bold", 9); pdf.drawString(x + w - 170, cursor, "FACTURA:"); pdf.setFont("Helvetica", 9); pdf.drawRightString(x + w - 14, cursor, conduce.factura or "—"); cursor -= 22
-        pdf.setFont("Helvetica-Bold", 9); pdf.drawString(x + 14, cursor, "DESCRIPCIÓN DEL CONTENIDO"); cursor -= 15
-        pdf.setFont("Helvetica", 9)
-        for linea in _wrap(conduce.descripcion, 92)[:4]:
+        pdf.drawString(x + 70, cursor, conduce.cliente)
+        pdf.drawRightString(x + w - 14, cursor, conduce.fecha.strftime("%d/%m/%Y")); cursor -= 18
+        pdf.drawString(x + 78, cursor, conduce.direccion[:55])
+        pdf.drawRightString(x + w - 14, cursor, conduce.factura or "—"); cursor -= 37
+        for linea in descripcion:
             pdf.drawString(x + 18, cursor, linea); cursor -= 13
         cursor -= 4
         pdf.setFont("Helvetica-Bold", 9); pdf.drawString(x + 14, cursor, "OBSERVACIONES:"); cursor -= 13
         pdf.setFont("Helvetica", 8)
-        for linea in _wrap(conduce.observaciones or "", 105)[:2]:
+        for linea in observaciones:
             pdf.drawString(x + 14, cursor, linea); cursor -= 11
-        firma = y + 25
-        pdf.line(x + 50, firma, x + 210, firma); pdf.line(x + w - 210, firma, x + w - 50, firma)
-        pdf.setFont("Helvetica", 8)
-        pdf.drawCentredString(x + 130, firma - 12, "RECIBIDO POR")
-        pdf.drawCentredString(x + w - 130, firma - 12, "ENTREGADO POR")
 
     cuadro(alto - 25, "ORIGINAL")
     cuadro(alto - 310, "COPIA")
-    pdf.save(); buffer.seek(0)
-    return buffer
+    pdf.showPage()
+
+
+def _fijo_factura(pdf, empresa):
+    ancho, alto = A4
+    y = alto - 50
+    pdf.setFont("Helvetica-Bold", 14)
+    pdf.drawCentredString(ancho / 2, y, empresa["nombre"]); y -= 20
+    pdf.setFont("Helvetica", 9)
+    pdf.drawCentredString(ancho / 2, y, f"Tel. {empresa['telefono']} · RNC {empresa['rnc']}"); y -= 14
+    pdf.drawCentredString(ancho / 2, y, empresa["direccion"])
+
+
+_PLANTILLA_FACTURA = Plantilla("Factura", _fijo_factura)
+
+
+def factura_pdf(factura, empresa, usuario, fecha):
+    """Reimpresión A4 de una factura con lo pagado y lo pendiente.
+
+    El pie lleva solo la fecha de ``fecha``, sin hora: el PDF se guarda en
+    caché y una hora quedaría congelada en la primera copia.
+    """
+    return _documento(dibujar_factura, factura, empresa, A4, usuario=usuario, fecha=fecha)
+
+
+def dibujar_factura(pdf, factura, empresa, usuario="Sistema", fecha=None):
+    ancho, alto = A4
+    pdf.setPageSize(A4)
+    _PLANTILLA_FACTURA.dibujar(pdf, empresa)
+    y = alto - 104
+
+    pdf.setFont("Helvetica-Bold", 12)
+    pdf.drawCentredString(ancho / 2, y, f"FACTURA #{factura.numero}")
+    y -= 25
+
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(45, y, f"Cliente: {factura.cliente.nombre}")
+    pdf.drawRightString(ancho - 45, y, f"Fecha: {factura.fecha.strftime('%d/%m/%Y')}")
+    y -= 16
+    if factura.cliente.rnc_cedula:
+        pdf.drawString(45, y, f"RNC/Cédula: {factura.cliente.rnc_cedula}")
+        y -= 16
+    pdf.drawString(45, y, f"Concepto: {factura.concepto}")
+    y -= 20
+
+    pdf.line(45, y, ancho - 45, y)
+    y -= 20
+    pdf.setFont("Helvetica-Bold", 11)
+    pdf.drawString(45, y, "Detalle")
+    y -= 18
+
+    pdf.setFont("Helvetica", 10)
+    pdf.drawString(45, y, "Descripción")
+    pdf.drawRightString(ancho - 45, y, "Monto")
+    y -= 16
+    pdf.line(45, y, ancho - 45, y)
+    y -= 16
+
+    pdf.drawString(45, y, factura.concepto)
+    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.monto:,.2f}")
+    y -= 20
+
+    pdf.line(45, y, ancho - 45, y)
+    y -= 20
+    pdf.setFont("Helvetica-Bold", 11)
+    pdf.drawString(45, y, "Total:")
+    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.monto:,.2f}")
+    y -= 18
+    pdf.drawString(45, y, "Pagado:")
+    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.monto - factura.saldo:,.2f}")
+    y -= 18
+    pdf.drawString(45, y, "Pendiente:")
+    pdf.drawRightString(ancho - 45, y, f"RD$ {factura.saldo:,.2f}")
+    y -= 30
+
+    pdf.setFont("Helvetica", 9)
+    pdf.drawCentredString(ancho / 2, y, f"Generado por {usuario} · {(fecha or date.today()).strftime('%d/%m/%Y')}")
+    pdf.showPage()
 
 
 def _wrap(text, max_chars):
@@ -39,7 +39,8 @@ def _wrap(text, max_chars):
     return lines + ([current] if current else [])
 
 
-def generar_arqueo_pdf(arqueo, empresa, username, ahora):
+def generar_arqueo_pdf(arqueo, empresa, username, ahora, con_hora=True):
+    """PDF A4 del arqueo; sin ``con_hora`` el pie imprime solo la fecha, para las copias en caché."""
     buffer = io.BytesIO()
     pdf = canvas.Canvas(buffer, pagesize=A4, pageCompression=1)
     W, H = A4
@@ -48,7 +49,7 @@ def generar_arqueo_pdf(arqueo, empresa, username, ahora):
 
     y = H - 30
     page_num = [1]
-    print_time = ahora.strftime('%d/%m/%Y %H:%M')
+    print_time = ahora.strftime('%d/%m/%Y %H:%M' if con_hora else '%d/%m/%Y')
 
     totales = arqueo.totales or {}
     no_efectivo = arqueo.no_efectivo or []
@@ -0,0 +1,50 @@
+"""Control de acceso por módulo, declarado en cada blueprint con ``proteger``."""
+from flask import abort, redirect, request, url_for
+from flask_login import current_user
+
+# Página de entrada de cada módulo, en el mismo orden que el menú
+_INICIO = {
+    "dashboard": "dashboard.index",
+    "clientes": "clientes.listado",
+    "cobros": "cobros.listar_clientes",
+    "cobros_informales": "cobros_informales.nuevo",
+    "arqueo": "arqueo.formulario",
+    "conduces": "conduces.formulario",
+    "reportes": "reportes.facturas",
+    "configuracion": "config_admin.usuarios",
+}
+
+
+def pagina_inicio(usuario):
+    for modulo in usuario.modulos_permitidos():
+        return url_for(_INICIO[modulo])
+    return None
+
+
+def verificar_modulo(*modulos):
+    """Corta la petición si el usuario no tiene ninguno de ``modulos``.
+
+    Los anónimos pasan: de ellos se encarga ``login_required``. Sin acceso al
+    dashboard se redirige al primer módulo permitido en lugar de dar 403.
+    """
+    if not current_user.is_authenticated or any(current_user.tiene_permiso(m) for m in modulos):
+        return None
+    inicio = pagina_inicio(current_user) if "dashboard" in modulos else None
+    if inicio:
+        return redirect(inicio)
+    abort(403)
+
+
+def proteger(blueprint, modulo, compartidas=None):
+    """Exige ``modulo`` en todas las vistas de ``blueprint``.
+
+    ``compartidas`` mapea el nombre de una vista a los otros módulos que
+    también la usan, p. ej. la reimpresión de recibos desde reportes. Solo se
+    comparten vistas concretas, nunca un prefijo de URL.
+    """
+    compartidas = compartidas or {}
+
+    @blueprint.before_request
+    def _verificar():
+        vista = request.endpoint.rpartition(".")[2]
+        return verificar_modulo(modulo, *compartidas.get(vista, ()))
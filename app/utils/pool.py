@@ -0,0 +1,123 @@
+"""Opciones del pool de conexiones a PostgreSQL y métricas de su uso.
+
+Cada worker de gunicorn tiene su propio pool de ``DB_POOL_SIZE`` conexiones
+más ``DB_MAX_OVERFLOW`` temporales; el total por instancia es ese número por
+la cantidad de workers y debe caber en el límite del plan de la base.
+``pool_pre_ping`` y ``pool_recycle`` evitan usar conexiones que el servidor
+ya cerró por inactividad.
+
+Con ``DB_PGBOUNCER`` se desactivan los prepared statements de psycopg 3, que
+PgBouncer en modo transacción no soporta, y el ``statement_timeout`` global
+(un parámetro de arranque que PgBouncer rechaza). Los reportes igual acotan
+sus consultas con ``limitar_consultas``, que usa ``SET LOCAL``. Bajo la CLI
+(``flask db upgrade``, ``release``) tampoco se fija: una migración sobre una
+tabla grande puede pasar de ese límite.
+"""
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import Pool
+
+_lock = threading.Lock()
+_metricas = {
+    "conexiones_nuevas": 0,
+    "checkouts": 0,
+    "en_uso": 0,
+    "maximo_en_uso": 0,
+    "invalidadas": 0,
+    "agotado": 0,
+    "retenida_total": 0.0,
+    "retenida_maxima": 0.0,
+}
+
+
+def opciones_motor(config, limitar=True):
+    """``SQLALCHEMY_ENGINE_OPTIONS`` a partir de las variables ``DB_*``.
+
+    Con SQLite (benchmarks, pruebas locales) se dejan los valores por defecto.
+    ``limitar=False`` omite el ``statement_timeout`` de arranque.
+    """
+    if make_url(config["SQLALCHEMY_DATABASE_URI"]).get_backend_name() != "postgresql":
+        return {}
+    opciones = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    connect_args = {}
+    if config["DB_PGBOUNCER"]:
+        connect_args["prepare_threshold"] = None
+    elif limitar and config["DB_STATEMENT_TIMEOUT"]:
+        connect_args["options"] = f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT']}"
+    if connect_args:
+        opciones["connect_args"] = connect_args
+    return opciones
+
+
+def limitar_consultas(sesion, milisegundos=None):
+    """``SET LOCAL statement_timeout`` para la transacción en curso de ``sesion``."""
+    milisegundos = milisegundos or current_app.config["DB_STATEMENT_TIMEOUT_REPORTES"]
+    if milisegundos and sesion.get_bind().dialect.name == "postgresql":
+        sesion.execute(text(f"SET LOCAL statement_timeout = {int(milisegundos)}"))
+
+
+@event.listens_for(Pool, "connect")
+def _al_conectar(conexion, registro):
+    with _lock:
+        _metricas["conexiones_nuevas"] += 1
+
+
+@event.listens_for(Pool, "checkout")
+def _al_tomar(conexion, registro, proxy):
+    registro.info["tomada"] = time.monotonic()
+    with _lock:
+        _metricas["checkouts"] += 1
+        _metricas["en_uso"] += 1
+        _metricas["maximo_en_uso"] = max(_metricas["maximo_en_uso"], _metricas["en_uso"])
+
+
+@event.listens_for(Pool, "checkin")
+def _al_devolver(conexion, registro):
+    tomada = registro.info.pop("tomada", None)
+    if tomada is None:
+        return
+    retenida = time.monotonic() - tomada
+    with _lock:
+        _metricas["en_uso"] -= 1
+        _metricas["retenida_total"] += retenida
+        _metricas["retenida_maxima"] = max(_metricas["retenida_maxima"], retenida)
+
+
+@event.listens_for(Pool, "invalidate")
+def _al_invalidar(conexion, registro, excepcion):
+    with _lock:
+        _metricas["invalidadas"] += 1
+
+
+def registrar_agotamiento():
+    """Llamar cuando un checkout venció ``DB_POOL_TIMEOUT`` esperando conexión."""
+    with _lock:
+        _metricas["agotado"] += 1
+
+
+def estadisticas_pool(engine):
+    """Contadores de este proceso más el estado actual del pool de ``engine``."""
+    with _lock:
+        m = dict(_metricas)
+    devueltas = m["checkouts"] - m["en_uso"]
+    return {
+        "estado": engine.pool.status(),
+        "conexiones_nuevas": m["conexiones_nuevas"],
+        "checkouts": m["checkouts"],
+        "en_uso": m["en_uso"],
+        "maximo_en_uso": m["maximo_en_uso"],
+        "invalidadas": m["invalidadas"],
+        "agotado": m["agotado"],
+        "retenida_media_ms": round(m["retenida_total"] * 1000 / devueltas, 1) if devueltas else 0,
+        "retenida_maxima_ms": round(m["retenida_maxima"] * 1000, 1),
+    }
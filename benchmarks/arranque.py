@@ -0,0 +1,74 @@
+"""Mide el arranque en frío de un worker: ``import wsgi`` en un proceso nuevo.
+
+Uso, desde la raíz del repositorio::
+
+    python benchmarks/arranque.py [--corridas 10] [--perfil]
+
+Cada corrida es un intérprete limpio, como un worker de gunicorn recién
+creado. Informa la mediana y el mínimo, si ReportLab quedó importado y lo
+que cuesta después cargar ``app.utils.pdf`` en el primer PDF. ``--perfil``
+muestra los módulos más caros según ``python -X importtime``.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MEDICION = """
+import sys, time
+inicio = time.perf_counter()
+import wsgi
+arranque = time.perf_counter() - inicio
+reportlab = "reportlab" in sys.modules
+inicio = time.perf_counter()
+import app.utils.pdf, app.utils.pdf_arqueo
+print(arranque, reportlab, time.perf_counter() - inicio)
+"""
+
+
+def _entorno():
+    entorno = dict(os.environ)
+    entorno.setdefault("DATABASE_URL", "sqlite://")
+    return entorno
+
+
+def medir(corridas):
+    tiempos, diferidos = [], []
+    for _ in range(corridas):
+        salida = subprocess.run([sys.executable, "-c", _MEDICION], cwd=RAIZ, env=_entorno(), capture_output=True, text=True, check=True)
+        arranque, reportlab, pdf = salida.stdout.split()[-3:]
+        tiempos.append(float(arranque))
+        diferidos.append(float(pdf))
+    print(f"import wsgi: mediana {statistics.median(tiempos) * 1000:.0f} ms, mínimo {min(tiempos) * 1000:.0f} ms ({corridas} corridas)")
+    print(f"ReportLab importado al arrancar: {'sí' if reportlab == 'True' else 'no'}")
+    print(f"primer PDF (importar app.utils.pdf): mediana {statistics.median(diferidos) * 1000:.0f} ms")
+
+
+def perfil(cantidad=15):
+    """Módulos con más tiempo propio (sin contar sus imports) al importar ``wsgi``."""
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", "import wsgi"], cwd=RAIZ, env=_entorno(), capture_output=True, text=True, check=True)
+    filas = []
+    for linea in salida.stderr.splitlines():
+        if linea.startswith("import time:") and "cumulative" not in linea:
+            propio, _, modulo = linea[len("import time:"):].split("|")
+            filas.append((int(propio), modulo.strip()))
+    print(f"\nMódulos con más tiempo propio (-X importtime, {sum(p for p, _ in filas) / 1000:.0f} ms en total):")
+    for propio, modulo in sorted(filas, reverse=True)[:cantidad]:
+        print(f"  {propio / 1000:>8.1f} ms  {modulo}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corridas", type=int, default=10)
+    parser.add_argument("--perfil", action="store_true")
+    args = parser.parse_args()
+    medir(args.corridas)
+    if args.perfil:
+        perfil()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Documentos y datos sintéticos para los benchmarks de PDF.
+
+Los documentos sueltos son ``SimpleNamespace`` con los atributos que leen los
+renderizadores; los reportes necesitan filas reales, que ``sembrar`` inserta
+en bloque en una base SQLite.
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+EMPRESA = {
+    "nombre": "CLÍNICA DE FRENOS HÉCTOR LÓPEZ SRL",
+    "telefono": "809-575-4401",
+    "rnc": "1-33-08894-2",
+    "direccion": "CALLE 2 NO.5 LOS CIRUELITOS, SANTIAGO R.D",
+    "email": "",
+}
+
+_CLIENTE = SimpleNamespace(nombre="Cliente de Prueba", rnc_cedula="001-0000000-1", saldo_pendiente=Decimal("1500.00"))
+
+
+def pago(lineas=3):
+    detalles = [SimpleNamespace(factura=SimpleNamespace(numero=f"F-{i:05d}"), monto_aplicado=Decimal("100.00")) for i in range(lineas)]
+    return SimpleNamespace(
+        id=1, fecha=datetime(2026, 1, 15, 10, 30), cliente=_CLIENTE, tipo=SimpleNamespace(value="Factura"),
+        forma_pago=SimpleNamespace(value="Efectivo"), banco=None, numero_cheque=None, numero_referencia=None,
+        tipo_tarjeta=None, ultimos_4_digitos=None, numero_autorizacion=None, detalles=detalles,
+        concepto_manual=None, monto_pagado=Decimal(100 * lineas), usuario="cajero",
+    )
+
+
+def cobro_informal(abonos=5):
+    lista = [
+        SimpleNamespace(forma_pago=SimpleNamespace(value="Transferencia"), banco="BHD", numero=f"{i:06d}", monto=Decimal("50.00"), usuario="cajero")
+        for i in range(abonos)
+    ]
+    return SimpleNamespace(
+        id=1, creado_en=datetime(2026, 1, 15), cliente=_CLIENTE, concepto="Servicio de frenos", abonos=lista,
+        monto_total=Decimal("1000.00"), monto_pagado=Decimal(50 * abonos), saldo_pendiente=Decimal(1000 - 50 * abonos),
+        estado=SimpleNamespace(value="Pendiente"),
+    )
+
+
+def conduce():
+    return SimpleNamespace(
+        cliente="Cliente de Prueba", fecha=date(2026, 1, 15), direccion="Av. Principal 123", factura="F-00001",
+        descripcion="Piezas de freno y accesorios " * 6, observaciones="Entregar en horario laboral. " * 4,
+    )
+
+
+def factura():
+    return SimpleNamespace(
+        numero="F-00001", concepto="Cambio de pastillas", monto=Decimal("3500.00"), saldo=Decimal("1500.00"),
+        fecha=date(2026, 1, 15), cliente=_CLIENTE,
+    )
+
+
+def arqueo(filas=300):
+    """Arqueo con ``filas`` cobros no en efectivo y ``filas`` facturas a crédito."""
+    from app.arqueo.routes import calcular_totales
+    tipos = ["Tarjetas", "Transferencias", "Cheques", "Otros"]
+    conteos = {"2000": 10, "1000": 25, "500": 40, "200": 30, "100": 50, "50": 20, "25": 10, "10": 15, "5": 8, "1": 30}
+    no_efectivo = [{"tipo": tipos[i % 4], "concepto": f"Cobro {i}", "monto": 250.0 + i} for i in range(filas)]
+    contado = {clave: {"monto": 15000.0, "desde": "0001", "hasta": "0150", "key": nombre}
+               for clave, nombre in (("sc", "Sin Comprobante"), ("cc", "Con Comprobante"), ("ri", "Recibos de Ingreso"))}
+    credito = [{"tipo": "B01", "numero": f"{i:08d}", "monto": 1200.0 + i} for i in range(filas)]
+    vales = [{"concepto": f"Vale {i}", "monto": 100.0} for i in range(20)]
+    return SimpleNamespace(
+        id=1, fecha=date(2026, 1, 15), cajero="cajero", turno="Mañana", fondo_inicial=Decimal("5000.00"),
+        conteos=conteos, no_efectivo=no_efectivo, facturas_contado=contado, facturas_credito=credito, vales=vales,
+        totales=calcular_totales(conteos, no_efectivo, contado, credito, vales),
+    )
+
+
+def sembrar(db, pagos=10_000, clientes=200, facturas_por_cliente=50):
+    """``pagos`` cobros de una factura cada uno y ``facturas_por_cliente`` facturas pendientes por cliente."""
+    from sqlalchemy import insert
+    from app.models import Cliente, DetallePago, EstadoFactura, Factura, Pago, TipoCobro
+    from app.models.pago import FormaPago
+
+    hoy = date.today()
+    db.session.execute(insert(Cliente), [
+        {"id": c, "nombre": f"Cliente {c:04d}", "telefono": f"809{c:07d}", "direccion": "Santiago", "rnc_cedula": f"RNC{c:06d}",
+         "saldo_a_favor": 0, "saldo_pendiente": 0}
+        for c in range(1, clientes + 1)
+    ])
+    db.session.execute(insert(Factura), [
+        {"id": f, "cliente_id": (f - 1) % clientes + 1, "numero": f"F-{f:06d}", "concepto": "Servicio", "monto": Decimal("500.00"),
+         "saldo": Decimal("500.00") if f > pagos else Decimal("0.00"),
+         "estado": EstadoFactura.PENDIENTE if f > pagos else EstadoFactura.PAGADA, "fecha": hoy - timedelta(days=f % 150)}
+        for f in range(1, pagos + clientes * facturas_por_cliente + 1)
+    ])
+    formas = list(FormaPago)
+    inicio = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db.session.execute(insert(Pago), [
+        {"id": p, "cliente_id": (p - 1) % clientes + 1, "fecha": inicio + timedelta(minutes=7 * p), "usuario": f"cajero{p % 4}",
+         "monto_pagado": Decimal("500.00"), "tipo": TipoCobro.FACTURA, "forma_pago": formas[p % len(formas)]}
+        for p in range(1, pagos + 1)
+    ])
+    db.session.execute(insert(DetallePago), [
+        {"pago_id": p, "factura_id": p, "monto_aplicado": Decimal("500.00")} for p in range(1, pagos + 1)
+    ])
+    db.session.commit()
@@ -0,0 +1,59 @@
+"""Compara recibos y conduces con y sin plantillas en form XObject.
+
+Los documentos sueltos se trazan siempre directo; los forms solo se usan en
+los lotes de ``lote_pdf``, donde cientos de páginas comparten la definición.
+
+Uso, desde la raíz del repositorio::
+
+    python benchmarks/plantillas_pdf.py [--repeticiones 300]
+
+No necesita base de datos: los documentos son los objetos sintéticos de
+``benchmarks/datos.py``.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import pdf  # noqa: E402
+from datos import EMPRESA, conduce as conduce_sintetico, pago as pago_sintetico  # noqa: E402
+
+
+def medir(nombre, funcion, repeticiones, documentos=1, rondas=5):
+    """Mejor de ``rondas`` para que el ruido de la máquina no decida la comparación."""
+    duracion = float("inf")
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            salida = funcion()
+        duracion = min(duracion, time.perf_counter() - inicio)
+    tamano = len(salida.read())
+    print(f"  {nombre:<22} {repeticiones * documentos / duracion:>9.1f} docs/s  {tamano / documentos:>9,.0f} bytes/doc")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=300)
+    args = parser.parse_args()
+
+    pago, conduce = pago_sintetico(), conduce_sintetico()
+    recibos = [(pdf.dibujar_recibo, pago)] * 150
+    conduces = [(pdf.dibujar_conduce, conduce)] * 150
+    lotes = max(args.repeticiones // 50, 2)
+    casos = [
+        ("recibo suelto", lambda: pdf.recibo_pdf(pago, EMPRESA), args.repeticiones),
+        ("conduce suelto", lambda: pdf.conduce_pdf(conduce, EMPRESA), args.repeticiones),
+    ]
+    for usar_formas in (False, True):
+        print("Con form XObject:" if usar_formas else "Sin form XObject (trazado por página):")
+        for caso in casos + [
+            ("lote de 150 recibos", lambda: pdf.lote_pdf(recibos, EMPRESA, usar_formas), lotes, len(recibos)),
+            ("lote de 150 conduces", lambda: pdf.lote_pdf(conduces, EMPRESA, usar_formas), lotes, len(conduces)),
+        ]:
+            medir(*caso)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Mide los renderizadores PDF: documentos por segundo, memoria pico y tamaño.
+
+Uso, desde la raíz del repositorio::
+
+    python benchmarks/renderizadores_pdf.py [--repeticiones 50] [--filas-cobros 10000]
+        [--solo recibo] [--guardar base.json] [--comparar base.json]
+
+Corre sin red ni PostgreSQL: los documentos sueltos son sintéticos y los
+reportes que consultan la base leen una SQLite temporal sembrada por
+``datos.sembrar``. ``--guardar`` escribe los resultados en JSON y
+``--comparar`` los contrasta con una corrida anterior, para ver el efecto de
+un cambio sobre la misma máquina.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import datos  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def _crear_app(ruta_db):
+    from app import create_app
+
+    class ConfigBenchmark(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{ruta_db}"
+        LOGIN_DISABLED = True
+        REPORTES_WORKERS = 0
+
+    return create_app(ConfigBenchmark)
+
+
+def _contenido(salida):
+    """Bytes del PDF, sea un buffer o una respuesta de Flask."""
+    if hasattr(salida, "get_data"):
+        salida.direct_passthrough = False
+        return salida.get_data()
+    return salida.getvalue()
+
+
+def medir(funcion, repeticiones, rondas=3):
+    """Mejor tiempo de ``rondas``; la memoria se mide aparte para no inflar el tiempo."""
+    duracion = float("inf")
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            salida = funcion()
+        duracion = min(duracion, time.perf_counter() - inicio)
+    tamano = len(_contenido(salida))
+    tracemalloc.start()
+    funcion()
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"por_segundo": repeticiones / duracion, "pico_kb": pico / 1024, "bytes": tamano}
+
+
+def casos(app, args):
+    from app.reportes import routes as reportes
+    from app.utils import pdf
+    from app.utils.pdf_arqueo import generar_arqueo_pdf
+
+    empresa = datos.EMPRESA
+    ahora = datetime(2026, 1, 15, 18, 0)
+    arqueo = datos.arqueo(args.filas_arqueo)
+    filtros = dict.fromkeys(("fecha_ini", "fecha_fin", "cliente_q", "usuario_q", "forma_pago", "tipo_cobro"), "")
+    pesados = max(args.repeticiones // 25, 1)
+
+    def antiguedad():
+        with app.test_request_context("/reportes/antiguedad/pdf"):
+            return reportes.antiguedad_pdf()
+
+    recibos = {n: datos.pago(n) for n in (1, 10, 50)}
+    return [
+        *((f"recibo de {n} facturas", lambda p=p: pdf.recibo_pdf(p, empresa), args.repeticiones) for n, p in recibos.items()),
+        ("recibo informal", lambda c=datos.cobro_informal(): pdf.recibo_informal_pdf(c, empresa), args.repeticiones),
+        ("conduce", lambda c=datos.conduce(): pdf.conduce_pdf(c, empresa), args.repeticiones),
+        ("factura", lambda f=datos.factura(): pdf.factura_pdf(f, empresa, "cajero", ahora.date()), args.repeticiones),
+        (f"arqueo {args.filas_arqueo}+{args.filas_arqueo} filas", lambda: generar_arqueo_pdf(arqueo, empresa, "cajero", ahora), pesados),
+        (f"cobros {args.filas_cobros} filas", lambda: reportes._cobros_pdf(filtros, ("bench", True), ahora), 1),
+        ("estado de cuenta", lambda: reportes._estado_cuenta_pdf(1, ahora), args.repeticiones),
+        ("antigüedad de saldos", antiguedad, pesados),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticiones", type=int, default=50, help="renders por ronda de los documentos livianos")
+    parser.add_argument("--filas-cobros", type=int, default=10_000)
+    parser.add_argument("--filas-arqueo", type=int, default=300)
+    parser.add_argument("--solo", default="", help="corre solo los casos que contienen este texto")
+    parser.add_argument("--guardar", help="archivo JSON donde escribir los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior")
+    args = parser.parse_args()
+
+    anterior = {}
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            anterior = json.load(archivo)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        app = _crear_app(os.path.join(carpeta, "benchmark.db"))
+        with app.app_context():
+            from app.extensions import db
+            db.create_all()
+            print(f"Sembrando {args.filas_cobros} cobros en SQLite…")
+            datos.sembrar(db, pagos=args.filas_cobros)
+
+            resultados = {}
+            print(f"{'caso':<28} {'docs/s':>10} {'pico KB':>10} {'bytes':>11}")
+            for nombre, funcion, repeticiones in casos(app, args):
+                if args.solo not in nombre:
+                    continue
+                r = resultados[nombre] = medir(funcion, repeticiones)
+                db.session.remove()
+                linea = f"{nombre:<28} {r['por_segundo']:>10.1f} {r['pico_kb']:>10,.0f} {r['bytes']:>11,}"
+                if nombre in anterior:
+                    linea += f"   x{r['por_segundo'] / anterior[nombre]['por_segundo']:.2f} vel."
+                print(linea)
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,11 +14,42 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "change-this-secret-in-production")
     SQLALCHEMY_DATABASE_URI = _db_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "280"))
+    DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+    DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0") == "1"
+    DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "30000"))
+    DB_STATEMENT_TIMEOUT_REPORTES = int(os.getenv("DB_STATEMENT_TIMEOUT_REPORTES", "120000"))
     COMPANY_NAME = os.getenv("COMPANY_NAME", "CLÍNICA DE FRENOS HÉCTOR LÓPEZ SRL")
     COMPANY_PHONE = os.getenv("COMPANY_PHONE", "809-575-4401")
     COMPANY_RNC = os.getenv("COMPANY_RNC", "1-33-08894-2")
     COMPANY_ADDRESS = os.getenv("COMPANY_ADDRESS", "CALLE 2 NO.5 LOS CIRUELITOS, SANTIAGO R.D")
     COMPANY_EMAIL = os.getenv("COMPANY_EMAIL", "")
+    BUSINESS_TZ = os.getenv("BUSINESS_TZ", "America/Santo_Domingo")
+    DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+    BUSQUEDA_CACHE_SIZE = int(os.getenv("BUSQUEDA_CACHE_SIZE", "512"))
+    BUSQUEDA_CACHE_TTL = int(os.getenv("BUSQUEDA_CACHE_TTL", "60"))
+    FIFO_CACHE_SIZE = int(os.getenv("FIFO_CACHE_SIZE", "256"))
+    FIFO_CACHE_TTL = int(os.getenv("FIFO_CACHE_TTL", "30"))
+    PERMISOS_CACHE_SIZE = int(os.getenv("PERMISOS_CACHE_SIZE", "256"))
+    PERMISOS_CACHE_TTL = int(os.getenv("PERMISOS_CACHE_TTL", "600"))
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    BCRYPT_HILOS = int(os.getenv("BCRYPT_HILOS", "2"))
+    BCRYPT_EN_ESPERA = int(os.getenv("BCRYPT_EN_ESPERA", "2"))
+    LOGIN_MAX_INTENTOS = int(os.getenv("LOGIN_MAX_INTENTOS", "5"))
+    LOGIN_MAX_INTENTOS_USUARIO = int(os.getenv("LOGIN_MAX_INTENTOS_USUARIO", "50"))
+    LOGIN_VENTANA = int(os.getenv("LOGIN_VENTANA", "300"))
+    PROXY_SALTOS = int(os.getenv("PROXY_SALTOS", "1"))
+    IDENTIDAD_TTL = int(os.getenv("IDENTIDAD_TTL", "30"))
+    PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "")
+    PDF_CACHE_MAX_MB = int(os.getenv("PDF_CACHE_MAX_MB", "200"))
+    REPORTES_DIR = os.getenv("REPORTES_DIR", "")
+    REPORTES_WORKERS = int(os.getenv("REPORTES_WORKERS", "1"))
+    REPORTES_ESPERA = float(os.getenv("REPORTES_ESPERA", "3"))
+    REPORTES_EXPIRACION = int(os.getenv("REPORTES_EXPIRACION", "60"))
+    LOTE_IMPRESION_MAX = int(os.getenv("LOTE_IMPRESION_MAX", "500"))
 
 
 class DevelopmentConfig(Config):
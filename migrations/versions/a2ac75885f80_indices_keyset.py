@@ -0,0 +1,42 @@
+"""indices compuestos para paginación keyset
+
+Revision ID: a2ac75885f80
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2ac75885f80'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('pagos', schema=None) as batch_op:
+        batch_op.create_index('ix_pagos_fecha_id', ['fecha', 'id'], unique=False)
+    with op.batch_alter_table('facturas', schema=None) as batch_op:
+        batch_op.create_index('ix_facturas_fecha_id', ['fecha', 'id'], unique=False)
+    with op.batch_alter_table('cobros_informales', schema=None) as batch_op:
+        batch_op.create_index('ix_cobros_informales_creado_en_id', ['creado_en', 'id'], unique=False)
+    with op.batch_alter_table('arqueos', schema=None) as batch_op:
+        batch_op.create_index('ix_arqueos_fecha_id', ['fecha', 'id'], unique=False)
+    with op.batch_alter_table('clientes', schema=None) as batch_op:
+        batch_op.create_index('ix_clientes_nombre_id', ['nombre', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('clientes', schema=None) as batch_op:
+        batch_op.drop_index('ix_clientes_nombre_id')
+    with op.batch_alter_table('arqueos', schema=None) as batch_op:
+        batch_op.drop_index('ix_arqueos_fecha_id')
+    with op.batch_alter_table('cobros_informales', schema=None) as batch_op:
+        batch_op.drop_index('ix_cobros_informales_creado_en_id')
+    with op.batch_alter_table('facturas', schema=None) as batch_op:
+        batch_op.drop_index('ix_facturas_fecha_id')
+    with op.batch_alter_table('pagos', schema=None) as batch_op:
+        batch_op.drop_index('ix_pagos_fecha_id')
@@ -0,0 +1,41 @@
+"""busqueda trigram sin acentos en clientes
+
+Revision ID: b7e41c09d2a3
+Revises: a2ac75885f80
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e41c09d2a3'
+down_revision = 'a2ac75885f80'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() es STABLE; el contenedor IMMUTABLE permite indexar la expresión
+    op.execute(
+        "CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS "
+        "$$SELECT public.unaccent('public.unaccent'::regdictionary, $1)$$"
+    )
+    op.execute("CREATE INDEX ix_clientes_nombre_trgm ON clientes USING gin (f_unaccent(nombre) gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_clientes_telefono_trgm ON clientes USING gin (telefono gin_trgm_ops)")
+    op.execute("CREATE INDEX ix_clientes_rnc_cedula_trgm ON clientes USING gin (rnc_cedula gin_trgm_ops)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_clientes_rnc_cedula_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_clientes_telefono_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_clientes_nombre_trgm")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
@@ -0,0 +1,31 @@
+"""saldo pendiente desnormalizado en clientes
+
+Revision ID: c3d8f1a2b6e4
+Revises: b7e41c09d2a3
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d8f1a2b6e4'
+down_revision = 'b7e41c09d2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('clientes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('saldo_pendiente', sa.Numeric(precision=12, scale=2), server_default='0', nullable=False))
+
+    op.execute(
+        "UPDATE clientes SET saldo_pendiente = "
+        "(SELECT COALESCE(SUM(facturas.saldo), 0) FROM facturas WHERE facturas.cliente_id = clientes.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('clientes', schema=None) as batch_op:
+        batch_op.drop_column('saldo_pendiente')
@@ -0,0 +1,36 @@
+"""resumen de cartera por cliente
+
+Revision ID: d4a7e2c9f015
+Revises: c3d8f1a2b6e4
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7e2c9f015'
+down_revision = 'c3d8f1a2b6e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('resumen_cartera',
+    sa.Column('cliente_id', sa.Integer(), nullable=False),
+    sa.Column('facturas_pendientes', sa.Integer(), nullable=False),
+    sa.Column('total_pendiente', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('fecha_mas_antigua', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['cliente_id'], ['clientes.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cliente_id')
+    )
+    op.execute(
+        "INSERT INTO resumen_cartera (cliente_id, facturas_pendientes, total_pendiente, fecha_mas_antigua) "
+        "SELECT cliente_id, COUNT(id), SUM(saldo), MIN(fecha) FROM facturas "
+        "WHERE estado != 'PAGADA' GROUP BY cliente_id"
+    )
+
+
+def downgrade():
+    op.drop_table('resumen_cartera')
@@ -0,0 +1,31 @@
+"""indice parcial de facturas pendientes
+
+Revision ID: e5b9c3d1a7f2
+Revises: d4a7e2c9f015
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9c3d1a7f2'
+down_revision = 'd4a7e2c9f015'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # El enum se guarda por nombre: 'PAGADA', no 'Pagada'
+    with op.batch_alter_table('facturas', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_facturas_pendientes_cliente_fecha', ['cliente_id', 'fecha'], unique=False,
+            postgresql_where=sa.text("estado <> 'PAGADA'"), postgresql_include=['saldo'],
+            sqlite_where=sa.text("estado <> 'PAGADA'"),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('facturas', schema=None) as batch_op:
+        batch_op.drop_index('ix_facturas_pendientes_cliente_fecha')
@@ -0,0 +1,26 @@
+"""permisos_version en usuarios
+
+Revision ID: f2c6a8e0b4d1
+Revises: e5b9c3d1a7f2
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6a8e0b4d1'
+down_revision = 'e5b9c3d1a7f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('permisos_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade():
+    with op.batch_alter_table('usuarios', schema=None) as batch_op:
+        batch_op.drop_column('permisos_version')
@@ -0,0 +1,135 @@
+"""Fixtures comunes: una app sobre SQLite temporal y un cliente con sesión de administrador."""
+import os
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from config import Config  # noqa: E402
+
+
+def _config(uri, carpeta):
+    class ConfigPruebas(Config):
+        SQLALCHEMY_DATABASE_URI = uri
+        TESTING = True
+        BCRYPT_ROUNDS = 4
+        REPORTES_WORKERS = 0
+        PDF_CACHE_DIR = str(carpeta / "pdf")
+        REPORTES_DIR = str(carpeta / "reportes")
+
+    return ConfigPruebas
+
+
+def _vaciar_caches():
+    """Las cachés viven por proceso y cada prueba reusa ids desde 1 en una base nueva."""
+    from app.cobros import fifo
+    from app.dashboard import metricas
+    from app.models import usuario
+    from app.utils import busqueda, claves, identidad
+
+    for cache in (fifo._instantaneas, usuario._permisos, busqueda._cache, identidad._vigentes):
+        cache.invalidar()
+    metricas.invalidar_metricas()
+    claves._fallos.clear()
+
+
+def _crear(uri, carpeta):
+    from app import create_app
+    from app.extensions import db
+
+    app = create_app(_config(uri, carpeta))
+    _vaciar_caches()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = _crear(f"sqlite:///{tmp_path / 'pruebas.db'}", tmp_path)
+    yield app
+    with app.app_context():
+        from app.extensions import db
+        db.engine.dispose()
+
+
+@pytest.fixture
+def app_postgres(tmp_path):
+    """App sobre la base de ``TEST_DATABASE_URL``; sus tablas se borran y se recrean."""
+    uri = os.getenv("TEST_DATABASE_URL", "")
+    if not uri:
+        pytest.skip("TEST_DATABASE_URL no está definida")
+    uri = uri.replace("postgres://", "postgresql://", 1).replace("postgresql://", "postgresql+psycopg://", 1)
+    app = _crear(uri, tmp_path)
+    yield app
+    with app.app_context():
+        from app.extensions import db
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def crear_usuario(username, clave="clave", admin=False, modulos=()):
+    from app.extensions import db
+    from app.models import Permiso, Usuario
+
+    usuario = Usuario(nombre_completo=username.title(), username=username, is_admin=admin)
+    usuario.set_password(clave)
+    db.session.add(usuario)
+    db.session.flush()
+    for modulo in modulos:
+        db.session.add(Permiso(usuario_id=usuario.id, modulo=modulo))
+    db.session.commit()
+    return usuario.id
+
+
+def crear_cliente(nombre="Cliente", rnc_cedula=None, facturas=()):
+    """Cliente con una factura pendiente por cada monto de ``facturas``."""
+    from app.extensions import db
+    from app.models import Cliente, Factura
+
+    cliente = Cliente(nombre=nombre, telefono="8090000000", direccion="Santiago", rnc_cedula=rnc_cedula,
+                      saldo_pendiente=sum(Decimal(monto) for monto in facturas))
+    db.session.add(cliente)
+    for i, monto in enumerate(facturas, 1):
+        db.session.add(Factura(cliente=cliente, numero=f"{nombre[:3].upper()}-{i:04d}", concepto="Servicio",
+                               monto=Decimal(monto), saldo=Decimal(monto), fecha=date(2026, 1, i)))
+    db.session.commit()
+    return cliente.id
+
+
+def iniciar_sesion(app, usuario_id, clave="clave"):
+    cliente = app.test_client()
+    respuesta = cliente.post("/login", data={"user_id": str(usuario_id), "password": clave})
+    assert respuesta.status_code == 302
+    return cliente
+
+
+@pytest.fixture
+def admin(app):
+    with app.app_context():
+        usuario_id = crear_usuario("admin", admin=True)
+    return iniciar_sesion(app, usuario_id)
+
+
+@contextmanager
+def contar_consultas():
+    """Sentencias SQL que ejecuta el engine de la app actual dentro del bloque."""
+    from sqlalchemy import event
+
+    from app.extensions import db
+
+    sentencias = []
+
+    def contar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", contar)
+    try:
+        yield sentencias
+    finally:
+        event.remove(db.engine, "before_cursor_execute", contar)
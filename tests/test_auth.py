@@ -0,0 +1,47 @@
+from tests.conftest import crear_usuario
+
+BLOQUEADO = "Demasiados intentos"
+
+
+def _fallar(cliente, usuario_id, veces, ip="10.0.0.1"):
+    for _ in range(veces):
+        cliente.post("/login", data={"user_id": usuario_id, "password": "mala"}, headers={"X-Forwarded-For": ip})
+
+
+def _entrar(cliente, usuario_id, ip="10.0.0.1"):
+    return cliente.post("/login", data={"user_id": usuario_id, "password": "clave"}, headers={"X-Forwarded-For": ip})
+
+
+def test_bloqueo_por_usuario_e_ip(app):
+    with app.app_context():
+        cajero = crear_usuario("cajero")
+        otro = crear_usuario("otro")
+    cliente = app.test_client()
+    _fallar(cliente, cajero, app.config["LOGIN_MAX_INTENTOS"])
+
+    assert BLOQUEADO in _entrar(cliente, cajero).get_data(as_text=True)
+    # Otra caja detrás del mismo balanceador tiene su propia IP de cliente
+    assert _entrar(app.test_client(), cajero, ip="10.0.0.2").status_code == 302
+    assert _entrar(cliente, otro).status_code == 302
+
+
+def test_respaldo_por_usuario_frena_ataques_desde_muchas_ips(app):
+    app.config["LOGIN_MAX_INTENTOS_USUARIO"] = 6
+    with app.app_context():
+        cajero = crear_usuario("cajero")
+    cliente = app.test_client()
+    for i in range(3):
+        _fallar(cliente, cajero, 2, ip=f"10.0.1.{i}")
+
+    assert BLOQUEADO in _entrar(app.test_client(), cajero, ip="10.0.2.1").get_data(as_text=True)
+
+
+def test_rehash_al_cambiar_el_costo(app):
+    with app.app_context():
+        cajero = crear_usuario("cajero")
+    app.config["BCRYPT_ROUNDS"] = 5
+    assert _entrar(app.test_client(), cajero).status_code == 302
+    with app.app_context():
+        from app.extensions import db
+        from app.models import Usuario
+        assert db.session.get(Usuario, cajero).password_hash.startswith("$2b$05$")
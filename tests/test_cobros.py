@@ -0,0 +1,66 @@
+import io
+import threading
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Cliente, DetallePago, Factura, Pago
+from tests.conftest import crear_cliente, crear_usuario, iniciar_sesion
+
+
+@pytest.mark.postgres
+def test_cobros_concurrentes_no_aplican_dos_veces_el_mismo_saldo(app_postgres):
+    app, hilos = app_postgres, 5
+    with app.app_context():
+        usuario_id = crear_usuario("cajero", admin=True)
+        cliente_id = crear_cliente("Concurrente", facturas=("100", "100", "100"))
+    sesiones = [iniciar_sesion(app, usuario_id) for _ in range(hilos)]
+    barrera = threading.Barrier(hilos)
+    estados = []
+
+    def cobrar(sesion):
+        barrera.wait()
+        respuesta = sesion.post("/cobros/", data={
+            "cliente_id": cliente_id, "monto_recibido": "70", "forma_pago": "Efectivo", "excedente_manejo": "devolver",
+        })
+        estados.append(respuesta.status_code)
+
+    trabajadores = [threading.Thread(target=cobrar, args=(s,)) for s in sesiones]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+
+    # 5 x 70 superan los 300 pendientes: el último cobro aplica solo los 20 que quedan
+    assert estados == [200] * hilos
+    with app.app_context():
+        aplicado = db.session.scalar(select(func.sum(DetallePago.monto_aplicado)))
+        assert aplicado == Decimal("300.00")
+        assert db.session.scalar(select(func.sum(Pago.monto_pagado))) == Decimal("300.00")
+        assert db.session.scalar(select(func.min(Factura.saldo))) == Decimal("0.00")
+        assert db.session.get(Cliente, cliente_id).saldo_pendiente == Decimal("0.00")
+
+
+@pytest.mark.parametrize("cuerpo", [{"json": []}, {"data": {"archivo": (io.BytesIO(b"cliente_id,monto\n"), "lote.csv")}}])
+def test_lote_vacio_se_rechaza(app, admin, cuerpo):
+    respuesta = admin.post("/cobros/lote", **cuerpo)
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()["error"] == "El lote está vacío."
+
+
+def test_lote_distingue_id_de_rnc(app, admin):
+    with app.app_context():
+        por_id = crear_cliente("Por Id", facturas=("100",))
+        por_rnc = crear_cliente("Por Rnc", rnc_cedula=str(por_id), facturas=("100",))
+
+    respuesta = admin.post("/cobros/lote", query_string={"simular": 1}, json=[
+        {"cliente_id": por_id, "monto": "10"},
+        {"rnc_cedula": str(por_id), "monto": "20"},
+    ])
+    assert [c["cliente_id"] for c in respuesta.get_json()["cobros"]] == [por_id, por_rnc]
+
+    respuesta = admin.post("/cobros/lote", json=[{"cliente_id": por_id, "rnc_cedula": str(por_id), "monto": "10"}])
+    assert respuesta.status_code == 400
+    assert respuesta.get_json()["errores"] == [{"linea": 1, "error": "Indique cliente_id o rnc_cedula, no ambos."}]
@@ -0,0 +1,43 @@
+from tests.conftest import contar_consultas, crear_usuario, iniciar_sesion
+
+
+def _cajero(app, modulos=("conduces",)):
+    with app.app_context():
+        usuario_id = crear_usuario("cajero", modulos=modulos)
+    return usuario_id, iniciar_sesion(app, usuario_id)
+
+
+def _fuera_de_sesion(respuesta):
+    return respuesta.status_code == 302 and respuesta.headers["Location"].startswith("/login")
+
+
+def test_usuario_desactivado_pierde_la_sesion(app, admin):
+    usuario_id, cajero = _cajero(app)
+    assert cajero.get("/conduces/").status_code == 200
+    admin.post(f"/configuracion/usuarios/{usuario_id}/toggle")
+    assert _fuera_de_sesion(cajero.get("/conduces/"))
+
+
+def test_usuario_eliminado_pierde_la_sesion(app, admin):
+    usuario_id, cajero = _cajero(app)
+    assert cajero.get("/conduces/").status_code == 200
+    admin.post(f"/configuracion/usuarios/{usuario_id}/eliminar")
+    assert _fuera_de_sesion(cajero.get("/conduces/"))
+
+
+def test_cambio_de_modulos_se_aplica_en_la_siguiente_peticion(app, admin):
+    usuario_id, cajero = _cajero(app)
+    assert cajero.get("/conduces/").status_code == 200
+    admin.post(f"/configuracion/usuarios/{usuario_id}/editar", data={
+        "nombre_completo": "Cajero", "is_active": "on", "modulos": ["cobros"],
+    })
+    assert cajero.get("/conduces/").status_code == 403
+    assert cajero.get("/cobros/").status_code == 200
+
+
+def test_identidad_en_cache_no_consulta_usuarios(app):
+    _, cajero = _cajero(app)
+    cajero.get("/conduces/")
+    with app.app_context(), contar_consultas() as sentencias:
+        assert cajero.get("/conduces/").status_code == 200
+    assert not [s for s in sentencias if "usuarios" in s]
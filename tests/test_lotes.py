@@ -0,0 +1,67 @@
+import re
+from datetime import date
+from decimal import Decimal
+
+from app.extensions import db
+from app.models import AbonoCobroInformal, CobroInformal, Conduce, FormaPago, Pago, TipoCobro
+from app.models.pago import FormaPago as FormaPagoCobro
+from tests.conftest import crear_cliente, crear_usuario, iniciar_sesion
+
+
+def _paginas(respuesta):
+    assert respuesta.status_code == 200 and respuesta.mimetype == "application/pdf"
+    return len(re.findall(rb"/Type /Page\b(?!s)", respuesta.get_data()))
+
+
+def _recibos(app):
+    """Dos recibos de factura (``cajero`` y ``otro``) y uno informal de ``cajero``; cada uno ocupa dos páginas."""
+    with app.app_context():
+        cliente_id = crear_cliente("Lote", facturas=("100",))
+        pagos = [Pago(cliente_id=cliente_id, usuario=u, monto_pagado=Decimal("10"), tipo=TipoCobro.FACTURA,
+                      forma_pago=FormaPagoCobro.EFECTIVO) for u in ("cajero", "otro")]
+        informal = CobroInformal(cliente_id=cliente_id, concepto="Servicio", monto_total=Decimal("50"), saldo_pendiente=Decimal("40"))
+        informal.abonos.append(AbonoCobroInformal(monto=Decimal("10"), forma_pago=FormaPago.EFECTIVO, usuario="cajero"))
+        db.session.add_all([*pagos, informal])
+        db.session.commit()
+        return [p.id for p in pagos], informal.id
+
+
+def test_lote_de_recibos_con_seleccion_mixta(app, admin):
+    (pago_id, _), informal_id = _recibos(app)
+    respuesta = admin.get("/reportes/recibos/lote.pdf", query_string={"sel": [str(pago_id), f"inf-{informal_id}"]})
+    assert _paginas(respuesta) == 4
+
+
+def test_lote_de_recibos_de_un_cajero_solo_trae_los_suyos(app):
+    (_, ajeno), _ = _recibos(app)
+    with app.app_context():
+        cajero = iniciar_sesion(app, crear_usuario("cajero", modulos=("reportes",)))
+    assert _paginas(cajero.get("/reportes/recibos/lote.pdf")) == 4
+    respuesta = cajero.get("/reportes/recibos/lote.pdf", query_string={"sel": str(ajeno)})
+    assert respuesta.status_code == 302 and respuesta.headers["Location"].startswith("/reportes/recibos")
+
+
+def test_lote_de_recibos_que_supera_el_maximo(app, admin):
+    _recibos(app)
+    app.config["LOTE_IMPRESION_MAX"] = 2
+    respuesta = admin.get("/reportes/recibos/lote.pdf", follow_redirects=True)
+    assert "El lote supera 2 recibos" in respuesta.get_data(as_text=True)
+
+
+def test_lote_de_conduces_con_fecha_invalida(app, admin):
+    respuesta = admin.get("/conduces/lote.pdf", query_string={"fecha_ini": "mala"})
+    assert respuesta.status_code == 302 and respuesta.headers["Location"] == "/conduces/"
+    assert admin.get("/reportes/recibos/lote.pdf", query_string={"fecha_fin": "mala"}).status_code == 302
+
+
+def test_lote_de_conduces_por_seleccion_y_maximo(app, admin):
+    with app.app_context():
+        conduces = [Conduce(fecha=date(2026, 1, i), cliente=f"Cliente {i}", direccion="Santiago", descripcion="Piezas")
+                    for i in (1, 2, 3)]
+        db.session.add_all(conduces)
+        db.session.commit()
+        ids = [c.id for c in conduces]
+    assert _paginas(admin.get("/conduces/lote.pdf", query_string={"sel": [str(i) for i in ids[:2]]})) == 2
+    app.config["LOTE_IMPRESION_MAX"] = 2
+    respuesta = admin.get("/conduces/lote.pdf", follow_redirects=True)
+    assert "El lote supera 2 conduces" in respuesta.get_data(as_text=True)
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import Cliente, Pago
+from app.utils.paginacion import codificar_cursor, decodificar_cursor
+from tests.conftest import crear_cliente
+
+
+def _token(valores):
+    return base64.urlsafe_b64encode(json.dumps(valores).encode()).decode()
+
+
+def test_cursor_valido_ida_y_vuelta():
+    fecha = datetime(2026, 1, 5, 10, 30, tzinfo=timezone.utc)
+    assert decodificar_cursor(codificar_cursor([fecha, 7]), [Pago.fecha, Pago.id]) == (fecha, 7)
+
+
+@pytest.mark.parametrize("valores", [
+    {"t": "2026-01-05T10:30:00", "d": "2026-01-05"},
+    ["2026-01-05", 7],
+    [{"d": "2026-01-05"}, 7],
+    [{"t": "2026-01-05T10:30:00"}, "7"],
+    [{"t": "2026-01-05T10:30:00"}, True],
+    [{"t": "2026-01-05T10:30:00"}],
+])
+def test_cursor_manipulado_vuelve_a_la_primera_pagina(valores):
+    assert decodificar_cursor(_token(valores), [Pago.fecha, Pago.id]) is None
+
+
+def test_listado_con_cursor_de_otro_tipo_no_falla(app, admin):
+    with app.app_context():
+        crear_cliente("Ana")
+    respuesta = admin.get("/clientes/", query_string={"cursor": _token([5, "x"])})
+    assert respuesta.status_code == 200 and "Ana" in respuesta.get_data(as_text=True)
+    assert decodificar_cursor(_token(["Ana", 1]), [Cliente.nombre, Cliente.id]) == ("Ana", 1)
@@ -0,0 +1,53 @@
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import CobroInformal, Usuario
+from tests.conftest import crear_cliente, crear_usuario, iniciar_sesion
+
+
+def _con_modulos(app, *modulos):
+    with app.app_context():
+        usuario_id = crear_usuario("_".join(modulos) or "sin_modulos", modulos=modulos)
+    return iniciar_sesion(app, usuario_id)
+
+
+def test_reportes_reimprime_recibos_de_otros_modulos(app, admin):
+    with app.app_context():
+        cliente_id = crear_cliente("Recibos", facturas=("100",))
+        db.session.add(CobroInformal(cliente_id=cliente_id, concepto="Servicio", monto_total=Decimal("50"), saldo_pendiente=Decimal("50")))
+        db.session.commit()
+    pago_id = admin.post("/cobros/", data={"cliente_id": cliente_id, "monto_recibido": "100"}).get_json()["pago_id"]
+
+    reportes = _con_modulos(app, "reportes")
+    assert reportes.get(f"/cobros/{pago_id}/recibo.pdf").status_code == 200
+    assert reportes.get("/cobros-informales/1/recibo.pdf").status_code == 200
+    assert reportes.get("/cobros/").status_code == 403
+    assert reportes.get("/cobros-informales/1").status_code == 403
+
+
+def test_api_de_clientes_compartida_solo_para_lectura(app):
+    cajero = _con_modulos(app, "cobros_informales")
+    assert cajero.get("/clientes/api/buscar", query_string={"q": "ab"}).status_code == 200
+    assert cajero.post("/clientes/api/crear", data={"nombre": "Nuevo"}).status_code == 403
+    assert _con_modulos(app, "conduces").get("/clientes/api/buscar", query_string={"q": "ab"}).status_code == 403
+
+
+def test_sin_dashboard_redirige_al_primer_modulo(app):
+    respuesta = _con_modulos(app, "cobros").get("/")
+    assert respuesta.status_code == 302
+    assert respuesta.headers["Location"] == "/cobros/"
+
+
+def test_ediciones_simultaneas_obtienen_versiones_distintas(app):
+    with app.app_context():
+        usuario_id = crear_usuario("cajero", modulos=("cobros",))
+        primera, segunda = Session(db.engine), Session(db.engine)
+        a, b = primera.get(Usuario, usuario_id), segunda.get(Usuario, usuario_id)
+        assert a.permisos_version == b.permisos_version == 0
+        for sesion, usuario in ((primera, a), (segunda, b)):
+            usuario.invalidar_permisos()
+            sesion.commit()
+            sesion.close()
+        assert db.session.get(Usuario, usuario_id).permisos_version == 2
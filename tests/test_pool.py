@@ -0,0 +1,19 @@
+from config import Config
+from app.utils.pool import opciones_motor
+
+
+def _config(**extra):
+    config = {k: getattr(Config, k) for k in dir(Config) if k.startswith("DB_")}
+    config.update(SQLALCHEMY_DATABASE_URI="postgresql+psycopg://u:c@localhost/arqueo", DB_PGBOUNCER=False,
+                  DB_STATEMENT_TIMEOUT=30000)
+    config.update(extra)
+    return config
+
+
+def test_statement_timeout_solo_fuera_de_la_cli():
+    assert opciones_motor(_config())["connect_args"] == {"options": "-c statement_timeout=30000"}
+    assert "connect_args" not in opciones_motor(_config(), limitar=False)
+
+
+def test_pgbouncer_sin_timeout_de_arranque():
+    assert opciones_motor(_config(DB_PGBOUNCER=True))["connect_args"] == {"prepare_threshold": None}
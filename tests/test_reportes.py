@@ -0,0 +1,91 @@
+import io
+import zipfile
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import insert
+
+from app.extensions import db
+from app.models import Cliente, DetallePago, EstadoFactura, Factura, Pago, TipoCobro
+from app.models.pago import FormaPago
+from tests.conftest import contar_consultas
+
+N = 30
+FILTROS = dict.fromkeys(("fecha_ini", "fecha_fin", "cliente_q", "usuario_q", "forma_pago", "tipo_cobro"), "")
+
+
+def _sembrar(pagos, clientes=5):
+    """``pagos`` cobros de una factura cada uno, repartidos entre ``clientes``."""
+    db.session.execute(insert(Cliente), [
+        {"id": c, "nombre": f"Cliente {c}", "telefono": "809", "direccion": "Santiago", "saldo_a_favor": 0, "saldo_pendiente": 0}
+        for c in range(1, clientes + 1)
+    ])
+    db.session.execute(insert(Factura), [
+        {"id": p, "cliente_id": (p - 1) % clientes + 1, "numero": f"F-{p:05d}", "concepto": "Servicio",
+         "monto": Decimal("100.00"), "saldo": Decimal("0.00"), "estado": EstadoFactura.PAGADA, "fecha": datetime(2026, 1, 1).date()}
+        for p in range(1, pagos + 1)
+    ])
+    inicio = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    db.session.execute(insert(Pago), [
+        {"id": p, "cliente_id": (p - 1) % clientes + 1, "fecha": inicio + timedelta(minutes=p), "usuario": "cajero",
+         "monto_pagado": Decimal("100.00"), "tipo": TipoCobro.FACTURA, "forma_pago": FormaPago.EFECTIVO}
+        for p in range(1, pagos + 1)
+    ])
+    db.session.execute(insert(DetallePago), [
+        {"pago_id": p, "factura_id": p, "monto_aplicado": Decimal("100.00")} for p in range(1, pagos + 1)
+    ])
+    db.session.commit()
+
+
+def _consultas_pdf(app, pagos):
+    from app.reportes.routes import _cobros_pdf
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        _sembrar(pagos)
+        with contar_consultas() as sentencias:
+            _cobros_pdf(FILTROS, ("admin", True), datetime(2026, 2, 1))
+        db.session.remove()
+    return len(sentencias)
+
+
+def _consultas_exportacion(app, cliente, pagos, formato):
+    with app.app_context():
+        Pago.query.delete()
+        DetallePago.query.delete()
+        Factura.query.delete()
+        Cliente.query.delete()
+        db.session.commit()
+        _sembrar(pagos)
+        # La primera petición tras el login revalida la identidad; se cuenta la segunda
+        for _ in range(2):
+            with contar_consultas() as sentencias:
+                respuesta = cliente.get("/reportes/cobros/excel", query_string={"formato": formato})
+                contenido = respuesta.get_data()
+                respuesta.close()
+    assert respuesta.status_code == 200 and contenido
+    return len(sentencias)
+
+
+def test_pdf_de_cobros_no_hace_consultas_por_fila(app):
+    assert _consultas_pdf(app, N) == _consultas_pdf(app, 10 * N)
+
+
+@pytest.mark.parametrize("formato", ["csv", "xlsx"])
+def test_exportacion_de_cobros_no_hace_consultas_por_fila(app, admin, formato):
+    assert _consultas_exportacion(app, admin, N, formato) == _consultas_exportacion(app, admin, 10 * N, formato)
+
+
+def test_xlsx_escribe_como_texto_lo_que_empieza_con_igual(app, admin):
+    nombre = '=HYPERLINK("x")'
+    with app.app_context():
+        _sembrar(1, clientes=1)
+        db.session.get(Cliente, 1).nombre = nombre
+        db.session.commit()
+    respuesta = admin.get("/reportes/cobros/excel", query_string={"formato": "xlsx"})
+    with zipfile.ZipFile(io.BytesIO(respuesta.get_data())) as libro:
+        hoja = libro.read("xl/worksheets/sheet1.xml").decode()
+    assert "<f>" not in hoja
+    assert f"<t>{nombre}</t>" in hoja